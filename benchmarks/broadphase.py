@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark of sweep-and-prune broadphase of asteroids
+
+Asteroids of all levels fly in a box and bounce off its edges and each other.
+Time of one tick (move and bounce) is printed for growing number of
+asteroids. The box is widened with the number of asteroids, so the density
+stays the same, and time per asteroid should stay nearly constant.
+
+Run from the root of the repository:
+    python -m benchmarks.broadphase
+
+"""
+
+import os
+import random
+import timeit
+import pygame as pg
+
+from data import prepare, tools
+from data.components import broadphase, components, ecs
+
+COUNTS = (250, 500, 1000, 2000, 4000)
+TICKS = 50
+SIZES = (8, 16, 32)
+SPEED = 180
+
+
+def populate(number):
+    world = ecs.World()
+    sweep = broadphase.SweepAndPrune()
+    width = prepare.SCREEN_SIZE[0] * number // COUNTS[0]
+    box = pg.Rect(0, 0, width, prepare.SCREEN_SIZE[1])
+    for i in range(number):
+        size = random.choice(SIZES)
+        position = (random.uniform(0, box.width),
+                    random.uniform(0, box.height))
+        asteroid = components._MovingSprite(pg.Surface((size, size)),
+                                            position)
+        asteroid.move_rect = box
+        asteroid.accelerate(random.uniform(0, 360), SPEED)
+        world.add(asteroid, (ecs.TRANSFORM, ecs.VELOCITY))
+        sweep.add(asteroid)
+    return world, sweep
+
+
+def main():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    random.seed(0)
+    print('{:>8} {:>12} {:>14} {:>8}'.format('count', 'tick [ms]',
+                                             'per item [us]', 'pairs'))
+    for number in COUNTS:
+        world, sweep = populate(number)
+        bounced = 0
+
+        def tick():
+            nonlocal bounced
+            world.step(tools.TIME_STEP)
+            bounced += sweep.bounce()
+
+        tick()
+        seconds = timeit.timeit(tick, number=TICKS) / TICKS
+        print('{:8} {:12.3f} {:14.3f} {:8.1f}'.format(
+                number, seconds * 1e3, seconds * 1e6 / number,
+                bounced / (TICKS + 1)))
+
+
+if __name__ == '__main__':
+    main()
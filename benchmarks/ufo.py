@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark of decisions of UFOs
+
+UFOs fly among asteroids of the second level on the game screen. Time spent
+by decisions of UFOs (`UfoGroup.think`) in one tick is printed for growing
+number of asteroids, next to time of the rest of the tick (move and bounce).
+Decisions are limited by `ufo.AI_BUDGET`, so their time should stay small
+and nearly constant.
+
+Run from the root of the repository:
+    python -m benchmarks.ufo
+
+"""
+
+import os
+import random
+import timeit
+import pygame as pg
+
+from data import prepare, scheduler, tools
+from data.components import asteroids, ecs, ship, ufo
+
+COUNTS = (100, 200, 400, 800)
+UFOS = 3
+TICKS = 200
+
+
+def populate(number):
+    timers = scheduler.Scheduler()
+    world = ecs.World()
+    rocks = asteroids.AsteroidsGroup(world)
+    area = prepare.SCREEN_RECT
+    for i in range(number):
+        position = (random.uniform(area.left, area.right),
+                    random.uniform(area.top, area.bottom))
+        rock = asteroids.Asteroid(2, position, rocks.fragment_asteroid)
+        rock.x, rock.y = position
+        rock.update_rect()
+        rocks.add(rock)
+    player = ship.Ship(timers, world)
+    ship.PlayerGroup(world).add(player)
+    ufos = ufo.UfoGroup(timers, rocks, world)
+    ufos.watch(player)
+    for i in range(UFOS):
+        ufos.spawn()
+    return timers, world, rocks, ufos
+
+
+def main():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    random.seed(0)
+    prepare.GTX = {'asteroid': pg.Surface((64, 64)),
+                   'ship': pg.Surface((16, 16))}
+    print('{:>8} {:>12} {:>12} {:>10}'.format(
+            'count', 'tick [ms]', 'think [ms]', 'examined'))
+    for number in COUNTS:
+        timers, world, rocks, ufos = populate(number)
+        examined = 0
+
+        def step():
+            timers.advance(0)
+            world.step(tools.TIME_STEP)
+            rocks.bounce()
+
+        def think():
+            nonlocal examined
+            examined += ufos.think()
+
+        ticked = thought = 0.0
+        for i in range(TICKS):
+            ticked += timeit.timeit(step, number=1)
+            thought += timeit.timeit(think, number=1)
+        print('{:8} {:12.3f} {:12.3f} {:10.1f}'.format(
+                number, ticked * 1e3 / TICKS, thought * 1e3 / TICKS,
+                examined / TICKS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Tracking of python allocations per frame and per phase of the frame
+
+Tracking is based on `tracemalloc`. Memory is snapshotted before and after
+every phase (update and draw of the active state of the top-level state
+machine, like `Game.update`, see `phase`) and the difference is attributed
+to source lines and to classes that contain them. Blocks allocated and freed
+inside the phase, like a tuple made every tick, don't show in the
+difference, so lines executed in the phase are also traced by
+`sys.settrace` and the rise of traced memory on every executed line is
+attributed to the line. Objects reused from free lists of the interpreter
+(small tuples, floats) are not allocated, so they are not seen at all.
+
+Tracking slows the program down a lot, so it is enabled only on request,
+see `prepare.TRACE_ALLOCATIONS`.
+
+Attributes:
+    TRACEBACK_LIMIT (int): number of frames stored for every allocation
+    tracker (AllocationTracker): tracker of the current run, None if tracking
+        is disabled
+
+"""
+
+import ast
+import collections
+import contextlib
+import linecache
+import os
+import sys
+import tracemalloc
+
+TRACEBACK_LIMIT = 1
+
+tracker = None
+
+_NO_PHASE = contextlib.nullcontext()
+
+
+class AllocationTracker:
+    """
+    Allocations of phases summed over frames
+
+    Args:
+        top (int): number of source lines and classes in the report
+
+    Attributes:
+        frames (int): number of finished frames
+        blocks (collections.Counter): allocated blocks keyed by (phase, file,
+            line)
+        size (collections.Counter): allocated bytes keyed by (phase, file,
+            line)
+        transient (collections.Counter): bytes allocated on executed lines,
+            also those freed before the end of the phase, keyed by (phase,
+            file, line)
+        peaks (collections.Counter): sums of peaks of traced memory above the
+            start of the phase, keyed by phase
+
+    """
+    def __init__(self, top=10):
+        self.top = top
+        self.frames = 0
+        self.blocks = collections.Counter()
+        self.size = collections.Counter()
+        self.transient = collections.Counter()
+        self.peaks = collections.Counter()
+        self._depth = 0
+        self._classes = {}
+        self._filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                         tracemalloc.Filter(False, __file__),
+                         tracemalloc.Filter(False, linecache.__file__)]
+        self._skipped = {tracemalloc.__file__, __file__, linecache.__file__,
+                         contextlib.__file__}
+        self._name = None
+        self._line = None
+        self._base = 0
+        self._peak = 0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager that attributes allocations inside to phase `name`,
+        tuple (state name, step)
+
+        Nested phases are counted in the outer one.
+        """
+        self._depth += 1
+        if self._depth > 1:
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        before = tracemalloc.take_snapshot().filter_traces(self._filters)
+        self._name, self._line = name, None
+        tracemalloc.reset_peak()
+        start = self._peak = self._base = tracemalloc.get_traced_memory()[0]
+        previous = sys.gettrace()
+        sys.settrace(self._trace)
+        try:
+            yield
+        finally:
+            sys.settrace(previous)
+            self._trace(None, 'end', None)
+            after = tracemalloc.take_snapshot().filter_traces(self._filters)
+            self._depth -= 1
+            self.peaks[name] += self._peak - start
+            for stat in after.compare_to(before, 'lineno'):
+                if stat.size_diff > 0:
+                    frame = stat.traceback[0]
+                    key = (name, frame.filename, frame.lineno)
+                    self.blocks[key] += max(0, stat.count_diff)
+                    self.size[key] += stat.size_diff
+
+    def _trace(self, frame, event, arg):
+        """
+        Attribute rise of traced memory since the previous event to the
+        line that was executed, then start measuring the line of `frame`
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        self._peak = max(self._peak, peak)
+        if self._line is not None and peak > self._base:
+            self.transient[self._line] += peak - self._base
+        if event == 'return':
+            frame = frame.f_back
+        trace = None
+        self._line = None
+        if (frame is not None and
+                frame.f_code.co_filename not in self._skipped):
+            self._line = (self._name, frame.f_code.co_filename,
+                          frame.f_lineno)
+            trace = self._trace
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+        return trace
+
+    def end_frame(self):
+        """
+        Count finished frame
+        """
+        self.frames += 1
+
+    def owner(self, filename, lineno):
+        """
+        Return name of the innermost class that contains given line
+
+        Returns:
+            str: name of the class or of the module, if line is out of classes
+
+        """
+        if filename not in self._classes:
+            self._classes[filename] = _class_ranges(filename)
+        owner = os.path.basename(filename)
+        start = 0
+        for first, last, name in self._classes[filename]:
+            if first <= lineno <= last and first > start:
+                owner, start = name, first
+        return owner
+
+    def report(self):
+        """
+        Return top allocating lines and classes per frame as text
+        """
+        frames = max(1, self.frames)
+        lines = ['allocations per frame ({} frames)'.format(self.frames)]
+        for name, peak in sorted(self.peaks.items()):
+            lines.append('  {} {}: peak {:.0f} B'.format(*name,
+                                                         peak / frames))
+
+        lines.append('top lines (kept blocks, kept bytes, allocated bytes)')
+        for key, allocated in self.transient.most_common(self.top):
+            (state, step), filename, lineno = key
+            lines.append('{:>10.1f} {:>10.0f} {:>10.0f}  {} {} {}:{}  {}'
+                         .format(self.blocks[key] / frames,
+                                 self.size[key] / frames, allocated / frames,
+                                 state, step, os.path.relpath(filename),
+                                 lineno,
+                                 linecache.getline(filename, lineno).strip()))
+
+        by_owner = collections.Counter()
+        blocks_by_owner = collections.Counter()
+        allocated_by_owner = collections.Counter()
+        for key, size in self.size.items():
+            owner = self.owner(key[1], key[2])
+            by_owner[owner] += size
+            blocks_by_owner[owner] += self.blocks[key]
+        for key, allocated in self.transient.items():
+            allocated_by_owner[self.owner(key[1], key[2])] += allocated
+        lines.append('top classes (kept blocks, kept bytes, allocated bytes)')
+        for owner, allocated in allocated_by_owner.most_common(self.top):
+            lines.append('{:>10.1f} {:>10.0f} {:>10.0f}  {}'.format(
+                    blocks_by_owner[owner] / frames, by_owner[owner] / frames,
+                    allocated / frames, owner))
+        return '\n'.join(lines)
+
+
+def _class_ranges(filename):
+    """
+    Return (first line, last line, name) of all classes in python file
+    """
+    try:
+        with open(filename) as source:
+            tree = ast.parse(source.read())
+    except (OSError, SyntaxError, ValueError):
+        return []
+    return [(node.lineno, node.end_lineno, node.name)
+            for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]
+
+
+def enable(top=10):
+    """
+    Start tracing allocations
+
+    Args:
+        top (int): see `AllocationTracker`
+
+    Returns:
+        AllocationTracker: the new tracker
+
+    """
+    global tracker
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEBACK_LIMIT)
+    tracker = AllocationTracker(top)
+    return tracker
+
+
+def disable():
+    """
+    Stop tracing allocations and drop the tracker
+    """
+    global tracker
+    tracker = None
+    tracemalloc.stop()
+
+
+def phase(name):
+    """
+    Return context manager of phase `name`, it does nothing if tracking is
+    disabled
+
+    Args:
+        name (:obj:`tuple` of :obj:`str`): state name and step, like
+            ('GAME', 'update')
+
+    """
+    if tracker is None:
+        return _NO_PHASE
+    return tracker.phase(name)
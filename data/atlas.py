@@ -0,0 +1,179 @@
+"""
+Texture atlas of sprite images and their pre-baked variants
+
+Images (including rotated and recolored variants) are packed at load time
+into a few large pages in the display format. Sprite then refers to a
+`Region`, the page and area of its image on it, and it is drawn by blitting
+the area of the page (see `components._MovingSprite.update_image`). All
+sprites share the pages, so variants are not created per sprite and blits
+read from a few pieces of memory.
+
+Modules of components provide functions returning dicts of images to bake,
+`build` packs them into an atlas. Opaque images are packed into separate
+pages without alpha, so they are blitted without blending.
+
+Attributes:
+    PAGE_SIZE (:obj:`tuple` of :obj:`int`): size of one page
+    PADDING (int): space between packed images, it keeps neighbours apart
+        also on pages scaled down for smaller display, see `surfaces.scale`
+    current (Atlas): atlas of the program, None if atlas is not built. Then
+        sprites create their images themselves
+
+"""
+
+import collections
+
+import pygame as pg
+
+from data import surfaces
+
+PAGE_SIZE = (1024, 1024)
+PADDING = 2
+
+current = None
+
+
+class Region(collections.namedtuple('Region', ['page', 'area', 'surface'])):
+    """
+    Image in the atlas
+
+    Args:
+        page (pygame.Surface): page with the image
+        area (pygame.Rect): area of the image on the page
+        surface (pygame.Surface): subsurface of the page with the image, it
+            shares pixels with the page
+
+    """
+    __slots__ = ()
+
+
+class Atlas:
+    """
+    Pages with packed images
+
+    Images are packed in shelves, rows of images ordered by height from the
+    highest.
+
+    Args:
+        page_size (:obj:`tuple` of :obj:`int`): size of one page
+
+    Attributes:
+        pages (:obj:`list` of :obj:`pygame.Surface`): pages in the display
+            format, with per-pixel alpha unless they hold opaque images
+        regions (:obj:`dict`): regions keyed by image keys
+
+    """
+    def __init__(self, page_size=PAGE_SIZE):
+        self.page_size = page_size
+        self.pages = []
+        self.regions = {}
+
+    def __len__(self):
+        return len(self.regions)
+
+    def __contains__(self, key):
+        return key in self.regions
+
+    def __getitem__(self, key):
+        return self.regions[key]
+
+    @property
+    def size(self):
+        """
+        int: number of pixels of all pages
+        """
+        return sum(page.get_width() * page.get_height() for page in self.pages)
+
+    def pack(self, images, alpha=True):
+        """
+        Copy images into new pages
+
+        Image larger than page gets its own page.
+
+        Args:
+            images (:obj:`dict`): surfaces keyed by image keys
+            alpha (bool): if False, pages don't have alpha and images are
+                copied without their transparency
+
+        """
+        width, height = self.page_size
+        order = sorted(images, key=lambda key: -images[key].get_height())
+        places = []
+        page = x = y = shelf = 0
+        for key in order:
+            w, h = images[key].get_size()
+            if x and x + w > width:
+                x, y, shelf = 0, y + shelf + PADDING, 0
+            if y and y + h > height:
+                page, x, y, shelf = page + 1, 0, 0, 0
+            places.append((key, page, x, y))
+            x += w + PADDING
+            shelf = max(shelf, h)
+
+        sizes = collections.defaultdict(lambda: [0, 0])
+        for key, page, x, y in places:
+            size = sizes[page]
+            size[0] = max(size[0], x + images[key].get_width())
+            size[1] = max(size[1], y + images[key].get_height())
+        first = len(self.pages)
+        self.pages.extend(surfaces.new(sizes[page], alpha=alpha,
+                                       owner='Atlas', purpose='page')
+                          for page in range(len(sizes)))
+
+        for key, page, x, y in places:
+            page = self.pages[first + page]
+            area = pg.Rect((x, y), images[key].get_size())
+            if alpha:
+                page.blit(_with_alpha(images[key]), area,
+                          special_flags=pg.BLEND_RGBA_MAX)
+            else:
+                page.blit(images[key], area)
+            self.regions[key] = Region(page, area, page.subsurface(area))
+
+
+def _with_alpha(image):
+    """
+    Return image with per-pixel alpha, colorkey becomes transparent
+    """
+    if image.get_flags() & pg.SRCALPHA:
+        return image
+    copy = pg.Surface(image.get_size(), pg.SRCALPHA)
+    copy.blit(image, (0, 0))
+    return copy
+
+
+def build(*bakers, opaque=()):
+    """
+    Create atlas
+
+    Args:
+        *bakers (function): functions without arguments that return dicts of
+            images keyed by image keys
+        opaque (:obj:`tuple` of :obj:`function`): bakers of opaque images,
+            they are packed into pages without alpha
+
+    Returns:
+        Atlas: atlas with images of all bakers
+
+    """
+    atlas = Atlas()
+    for packed, alpha in ((bakers, True), (opaque, False)):
+        images = {}
+        for baker in packed:
+            images.update(baker())
+        if images:
+            atlas.pack(images, alpha)
+    return atlas
+
+
+def lookup(key):
+    """
+    Return region of the image from `current` atlas
+
+    Returns:
+        Region: region, None if atlas is not built or it lacks the image
+
+    """
+    if current is None:
+        return None
+    return current.regions.get(key)
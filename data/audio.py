@@ -0,0 +1,226 @@
+"""
+Sound effects played through a pool of reserved channels and streamed music
+
+Sound effects are short, they are decoded at start (see `prepare.SFX`).
+Music is long, so it is streamed by `pygame.mixer.music` from its file.
+
+Effects are not played when they are triggered. `play` only records the
+trigger and `AudioEngine.flush` starts all recorded sounds once per tick.
+Identical triggers of the same tick are merged into one voice, so a burst
+of fragmented asteroids plays one sound, not one sound per asteroid. Each
+sound has a limit of voices playing at once (see `VOICES`). When all
+channels of the pool are busy, the voice of the lowest priority is stolen,
+but only by a sound of higher priority.
+
+When the mixer is not available (for example without audio device), `engine`
+is None and `play` and `music` do nothing.
+
+Attributes:
+    CHANNELS (int): number of channels reserved for the pool
+    VOICES (dict): (voice limit, priority, restart) of sounds keyed by their
+        names. If `restart` is True, sound at its limit restarts its oldest
+        voice, otherwise new trigger is dropped until a voice ends
+    DEFAULT_VOICE (tuple): limits of sounds missing in `VOICES`
+    MUSIC_VOLUME (float): volume of music
+    MUSIC_FADE (int): fade in and fade out of music in milliseconds
+    LASER, BREAK, THRUST, EXPLOSION, MENU (str): names of sounds of game
+        events
+    engine (AudioEngine): engine of the current run, None if the mixer is
+        not available
+
+"""
+
+import itertools
+
+import pygame as pg
+
+CHANNELS = 8
+LASER = 'laze'
+BREAK = 'boing'
+THRUST = 'whoosh'
+EXPLOSION = 'chimed'
+MENU = 'dj-chronos__menu-nav-2'
+VOICES = {
+        LASER: (3, 2, True),
+        BREAK: (2, 1, True),
+        THRUST: (1, 0, False),
+        EXPLOSION: (2, 3, True),
+        MENU: (1, 3, True),
+}
+DEFAULT_VOICE = (1, 1, True)
+MUSIC_VOLUME = 0.5
+MUSIC_FADE = 1000
+
+engine = None
+
+
+class AudioEngine:
+    """
+    Pool of channels that plays sound effects triggered during a tick
+
+    Args:
+        sounds (dict): sounds keyed by their names
+        channels (list): channels of the pool, objects with `play`,
+            `set_volume`, `get_busy` and `stop` methods like
+            `pygame.mixer.Channel`
+        tracks (dict): paths to music files keyed by their names
+
+    Attributes:
+        pending (dict): volumes of sounds triggered since the last `flush`,
+            keyed by names of the sounds
+        voices (dict): (name, priority, order) of the last sound started on
+            each channel, keyed by channels
+        dropped (int): number of triggers that did not get a channel
+        track (str): path of the streamed music, None if music is stopped
+
+    """
+    def __init__(self, sounds, channels, tracks=None):
+        self.sounds = sounds
+        self.channels = channels
+        self.tracks = tracks or {}
+        self.pending = {}
+        self.voices = {}
+        self.dropped = 0
+        self.track = None
+        self._order = itertools.count()
+
+    def play(self, name, volume=1.0):
+        """
+        Trigger sound, it starts at the next `flush`
+
+        Triggers of the same sound are merged, the loudest volume is used.
+        """
+        if name in self.sounds:
+            self.pending[name] = max(volume, self.pending.get(name, 0.0))
+
+    def flush(self):
+        """
+        Start all triggered sounds on channels of the pool
+
+        Returns:
+            int: number of started voices
+
+        """
+        if not self.pending:
+            return 0
+        started = 0
+        for name, volume in self.pending.items():
+            channel = self._channel_for(name)
+            if channel is None:
+                self.dropped += 1
+                continue
+            channel.play(self.sounds[name])
+            channel.set_volume(volume)
+            priority = VOICES.get(name, DEFAULT_VOICE)[1]
+            self.voices[channel] = (name, priority, next(self._order))
+            started += 1
+        self.pending.clear()
+        return started
+
+    def _channel_for(self, name):
+        """
+        Return channel for the new voice of the sound, None if it should not
+        be played
+        """
+        limit, priority, restart = VOICES.get(name, DEFAULT_VOICE)
+        free = None
+        own = []
+        lowest = None
+        for channel in self.channels:
+            if not channel.get_busy():
+                if free is None:
+                    free = channel
+                continue
+            voice = self.voices.get(channel)
+            if voice is None:
+                continue
+            if voice[0] == name:
+                own.append((voice[2], channel))
+            if lowest is None or voice[1:] < self.voices[lowest][1:]:
+                lowest = channel
+
+        if len(own) >= limit:
+            return min(own)[1] if restart else None
+        if free is not None:
+            return free
+        if lowest is not None and self.voices[lowest][1] < priority:
+            lowest.stop()
+            return lowest
+        return None
+
+    def music(self, name, volume=MUSIC_VOLUME):
+        """
+        Stream music in loop, it is restarted only if it changed
+
+        Args:
+            name (str): name of the music in `tracks`
+
+        """
+        path = self.tracks.get(name)
+        if path is None or path == self.track:
+            return
+        pg.mixer.music.load(path)
+        pg.mixer.music.set_volume(volume)
+        pg.mixer.music.play(-1, fade_ms=MUSIC_FADE)
+        self.track = path
+
+    def stop_music(self):
+        """
+        Fade out streamed music
+        """
+        if self.track is not None:
+            pg.mixer.music.fadeout(MUSIC_FADE)
+            self.track = None
+
+
+def enable(sounds, tracks, channels=CHANNELS):
+    """
+    Reserve channels for effects and create `engine`
+
+    Args:
+        sounds (dict): sounds keyed by their names
+        tracks (dict): paths to music files keyed by their names
+        channels (int): number of reserved channels
+
+    Returns:
+        AudioEngine: the new engine, None if the mixer is not initialized
+
+    """
+    global engine
+    if not pg.mixer.get_init():
+        engine = None
+        return None
+    if pg.mixer.get_num_channels() < channels:
+        pg.mixer.set_num_channels(channels)
+    pg.mixer.set_reserved(channels)
+    engine = AudioEngine(sounds, [pg.mixer.Channel(index)
+                                  for index in range(channels)], tracks)
+    return engine
+
+
+def disable():
+    """
+    Stop all sounds and drop the engine
+    """
+    global engine
+    if engine is not None:
+        engine.stop_music()
+        for channel in engine.channels:
+            channel.stop()
+    engine = None
+
+
+def play(name, volume=1.0):
+    """
+    Trigger sound effect `name` if audio is enabled, see `AudioEngine.play`
+    """
+    if engine is not None:
+        engine.play(name, volume)
+
+
+def music(name):
+    """
+    Stream music `name` if audio is enabled, see `AudioEngine.music`
+    """
+    if engine is not None:
+        engine.music(name)
@@ -4,12 +4,20 @@ Module implying asteroids
 Args:
     FRAGMENTS (:obj:`tuple` of :obj:`int`): set minimum and maximum fragments
         when asteroid fragmentation occur
-    SPEED (:obj:`tuple` of :obj:`int`): set minumum and maximum speed for
-        asteroids level 1. Higher level asteroids just add bonus speed to this
-        velocity.
+    SPEED (:obj:`tuple` of :obj:`int`): set minumum and maximum speed (in
+        pixels per second) for asteroids level 1. Higher level asteroids just
+        add bonus speed to this velocity.
+    LEVEL_SPEED_BONUS (int): speed (in pixels per second) added for each
+        level of the asteroid
     DEGREE_DEADZONE (int): specify span round 0°, 90°, 180° 270° angle that
         the asteroid can not have. If `DEGREE_DEADZONE` is 10, asteroid
         velocity angle cannot be (-10; 10), (80; 100), (170; 190), (260; 280)
+    LAYER (int): render layer of asteroids
+    COLLIDER (:obj:`tuple`): collider table of asteroids
+    RADIUS (int): radius of vector asteroid of level 1, it is halved with
+        each level
+    COLOR (:obj:`tuple` of :obj:`int`): color of outlines of vector
+        asteroids
 
 """
 
@@ -17,29 +25,104 @@ import math
 import random
 import pygame as pg
 
-from . import components
-from .. import prepare
+from . import broadphase, components, ecs
+from .. import atlas, prepare, surfaces, tracing
+
+try:
+    from . import polygons
+except ImportError:  # NumPy is missing, only bitmap asteroids are available
+    polygons = None
 
 FRAGMENTS = (2, 4)
-SPEED = (2, 3)
+SPEED = (120, 180)
+LEVEL_SPEED_BONUS = 60
 DEGREE_DEADZONE = 20
+LAYER = 3
+COLLIDER = ecs.collider('asteroids')
+RADIUS = 80
+COLOR = (200, 190, 170)
 
 
-class AsteroidsGroup(pg.sprite.RenderPlain):
+class AsteroidsGroup(ecs.EntityGroup):
     """
     Group cantains all asteroids. Also provide some useful methods.
 
+    Asteroids bounce off each other, overlapping pairs are found by
+    sweep-and-prune broadphase that is kept in sync with the group. The
+    broadphase also answers spatial queries about asteroids.
+
+    Vector asteroids (see `VectorAsteroid`) are not in render table of the
+    world, they are drawn by `draw_outlines`.
+
+    Args:
+        world (ecs.World): world that moves and draws asteroids
+        wrap (bool): if True, asteroids wrap around the screen edges instead
+            of bouncing off them
+        vector (bool): if True, asteroids are `VectorAsteroid`. It is
+            ignored without NumPy
+
     Attributes:
         round_level (int): current game level
         asteroids_number (int): tells how much asteroids were created this
             round
+        broadphase (broadphase.SweepAndPrune): members ordered for finding
+            colliding asteroids
 
     """
-    def __init__(self):
-        super().__init__(list())
+    COMPONENTS = (ecs.TRANSFORM, ecs.VELOCITY, ecs.render(LAYER), COLLIDER)
+
+    def __init__(self, world=None, wrap=False, vector=False):
+        self.broadphase = broadphase.SweepAndPrune()
+        super().__init__(world, wrap)
+        self.vector = vector and polygons is not None
+        if self.vector:
+            self.components = tuple(component for component
+                                    in self.components
+                                    if component != ecs.render(LAYER))
         self.round_level = 0
         self.asteroids_number = 0
 
+    def add_internal(self, sprite, *args):
+        super().add_internal(sprite, *args)
+        self.broadphase.add(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.broadphase.remove(sprite)
+
+    def bounce(self):
+        """
+        Bounce colliding asteroids off each other
+
+        Returns:
+            int: number of bounced pairs
+
+        """
+        return self.broadphase.bounce()
+
+    def candidates(self, x, radius):
+        """
+        Return number of asteroids examined by `within` query at `x`
+        """
+        return self.broadphase.candidates(x, radius)
+
+    def within(self, x, y, radius):
+        """
+        Return asteroids closer than `radius` to the point
+
+        See `broadphase.SweepAndPrune.within`, the index is sorted by
+        `bounce` every tick.
+        """
+        return self.broadphase.within(x, y, radius)
+
+    def nearest(self, x, y, limit=math.inf):
+        """
+        Return the nearest asteroid and distance to it
+
+        See `broadphase.SweepAndPrune.nearest`.
+        """
+        return self.broadphase.nearest(x, y, limit)
+
     def create_asteroids(self, number, level, pos=prepare.SCREEN_RECT.center):
         """
         Create asteroids
@@ -53,7 +136,23 @@ class AsteroidsGroup(pg.sprite.RenderPlain):
 
         """
         for i in range(number):
-            self.add(Asteroid(level, pos, self.fragment_asteroid))
+            self.add(self.new_asteroid(level, pos))
+
+    def new_asteroid(self, level, position, outline=None):
+        """
+        Return new asteroid of the kind of the group, it is not added
+
+        Args:
+            level (int): level of the asteroid
+            position (:obj:`tuple`of :obj:`int`): position of the asteroid
+            outline (numpy.ndarray): outline of vector asteroid, random by
+                default
+
+        """
+        if self.vector:
+            return VectorAsteroid(level, position, self.fragment_asteroid,
+                                  self.wrap, outline)
+        return Asteroid(level, position, self.fragment_asteroid, self.wrap)
 
     def next_level(self):
         """
@@ -63,6 +162,7 @@ class AsteroidsGroup(pg.sprite.RenderPlain):
         self.asteroids_number += 1
         self.create_asteroids(self.asteroids_number, 1)
 
+    @tracing.traced
     def fragment_asteroid(self, asteroid):
         """
         Fragment given asteroids or erase them
@@ -76,7 +176,34 @@ class AsteroidsGroup(pg.sprite.RenderPlain):
         fragments = random.randint(*FRAGMENTS)
         level = asteroid.level + 1
         position = asteroid.get_position()
-        self.create_asteroids(fragments, level, position)
+        if not self.vector:
+            self.create_asteroids(fragments, level, position)
+            return
+        x, y = position
+        for outline, (dx, dy) in polygons.split(asteroid.outline, fragments):
+            self.add(self.new_asteroid(level, (x + dx, y + dy), outline))
+
+    def draw_outlines(self, surface):
+        """
+        Draw vector asteroids, nothing is drawn in group of bitmap asteroids
+
+        Asteroids that overlap a wrapped edge are drawn also on the opposite
+        side.
+        """
+        if not self.vector:
+            return
+        outlines = []
+        centers = []
+        for asteroid in self:
+            outlines.append(asteroid.outline)
+            centers.append((asteroid.x, asteroid.y))
+        if self.world is not None:
+            for asteroid, rects in self.world.straddling().items():
+                if asteroid in self:
+                    for rect in rects:
+                        outlines.append(asteroid.outline)
+                        centers.append(asteroid.position_at(rect))
+        polygons.draw(surface, COLOR, outlines, centers)
 
 
 class Asteroid(components._MovingSprite):
@@ -92,6 +219,7 @@ class Asteroid(components._MovingSprite):
         kill_callback (function): function that is called when asteroid's
             `kill` method was called and asteroids's level is not the highest
             one. The method should take care about fragmentation.
+        wrap (bool): if True, asteroid wraps around the screen edges
 
     Attributes:
         size (:obj:`tuple` of :obj:`int`): width and height of the asteroid
@@ -99,17 +227,14 @@ class Asteroid(components._MovingSprite):
         dy (float): speed in x direction
 
     """
-    def __init__(self, level, position, kill_callback):
-        super().__init__('asteroid', position)
-        old_size = self.original.get_size()
+    def __init__(self, level, position, kill_callback, wrap=False):
         self.level = level
+        super().__init__('asteroid', position)
+        self.wrap = wrap
+        self.set_shape()
+        self.size = list(self.rect.size)
 
-        scale = math.pow(2, self.level - 1)
-        self.size = list(map(int, (size / scale for size in old_size)))
-        original = pg.transform.scale(self.original, self.size)
-        self.set_original(original)
-
-        speed = random.randint(*SPEED) + self.level
+        speed = random.randint(*SPEED) + self.level * LEVEL_SPEED_BONUS
         direction = random.randint(DEGREE_DEADZONE, 90 - DEGREE_DEADZONE)
         direction += 90 * random.randint(0, 3)
         self.dx = speed * math.cos(math.radians(direction))
@@ -119,14 +244,43 @@ class Asteroid(components._MovingSprite):
             self.set_initial_position()
         self.kill_callback = kill_callback
 
+    def set_shape(self):
+        """
+        Set image of the level
+        """
+        region = atlas.lookup(('asteroid', self.level))
+        self.set_original(scaled_image(self.level) if region is None
+                          else region.surface)
+
+    def region(self):
+        return atlas.lookup(('asteroid', self.level))
+
+    def position_at(self, rect):
+        """
+        Return position of the asteroid moved with its `rect` to `rect`
+        """
+        return (self.x + rect.x - self.rect.x, self.y + rect.y - self.rect.y)
+
     def set_initial_position(self):
         """
         Set asteroids initial position out of the screen
 
         Asteroids with level one are directly created, they wasn't created
         during fragmentation proccess. To evade just ugly appears in one frame,
-        this method set initial position out of the screen.
+        this method set initial position out of the screen. Wrapped asteroid
+        is placed on the screen edge instead, so it appears on both sides.
         """
+        if self.wrap:
+            area = self.move_rect
+            if random.randint(0, 1):
+                self.x = area.left
+                self.y = random.randint(area.top, area.bottom)
+            else:
+                self.x = random.randint(area.left, area.right)
+                self.y = area.top
+            self.update_rect()
+            return
+
         self.x -= math.copysign(self.x + self.size[0], self.dx)
         self.y += math.copysign(self.y + self.size[1], self.dy)
 
@@ -146,3 +300,99 @@ class Asteroid(components._MovingSprite):
         if self.level < prepare.ASTEROIDS['level']:
             self.kill_callback(self)
         components._MovingSprite.kill(self)
+
+
+class VectorAsteroid(Asteroid):
+    """
+    Asteroid drawn as outline of polygon, without image
+
+    Its rect is square around the bounding circle of the outline. Rects
+    are only broadphase of collisions, `touches` tests convex hulls.
+
+    Args:
+        level (int): see `Asteroid`
+        position (:obj:`tuple`of :obj:`int`): see `Asteroid`
+        kill_callback (function): see `Asteroid`
+        wrap (bool): see `Asteroid`
+        outline (numpy.ndarray): outline relative to the position, random
+            outline of radius `RADIUS` halved with each level by default
+
+    Attributes:
+        outline (numpy.ndarray): star-shaped outline, see `polygons`
+        hull (numpy.ndarray): convex hull of `outline`
+        bounding (float): radius of circle around the position containing
+            the outline
+
+    """
+    def __init__(self, level, position, kill_callback, wrap=False,
+                 outline=None):
+        if outline is None:
+            outline = polygons.generate(RADIUS / 2 ** (level - 1))
+        self.outline = outline
+        self.hull = polygons.hull(outline)
+        self.bounding = polygons.bounding_radius(outline)
+        super().__init__(level, position, kill_callback, wrap)
+
+    def set_shape(self):
+        self.update_image()
+
+    def region(self):
+        return None
+
+    def update_image(self):
+        """
+        Set `rect` around the bounding circle, there is no image
+        """
+        size = 2 * math.ceil(self.bounding)
+        self.rect = pg.Rect(0, 0, size, size)
+        self.rect.center = self.get_position()
+        self.image_changed, self.color_changed = False, False
+
+    @property
+    def radius(self):
+        """
+        float: radius of the bounding circle
+        """
+        return self.bounding
+
+    def touches(self, rect, other, other_rect):
+        """
+        Narrowphase test of pair whose rects overlap
+
+        Hulls of vector asteroids are tested by separating axis theorem,
+        other entities are tested as their rects.
+
+        Args:
+            rect (pygame.Rect): `rect` or ghost rect of this asteroid
+            other (components._MovingSprite): the other entity
+            other_rect (pygame.Rect): rect or ghost rect of `other`
+
+        Returns:
+            bool: True if the entities touch
+
+        """
+        mine = self.hull + self.position_at(rect)
+        if isinstance(other, VectorAsteroid):
+            theirs = other.hull + other.position_at(other_rect)
+        else:
+            theirs = polygons.rect_polygon(other_rect)
+        return polygons.overlap(mine, theirs)
+
+
+def scaled_image(level):
+    """
+    Return asteroid image of given level, it is halved with each level
+    """
+    image = prepare.GTX['asteroid']
+    scale = math.pow(2, level - 1)
+    size = [int(size / scale) for size in image.get_size()]
+    return surfaces.track(pg.transform.scale(image, size), 'Asteroid',
+                          'scaled')
+
+
+def atlas_images():
+    """
+    Return images of asteroids of all levels to be baked into atlas
+    """
+    return {('asteroid', level): scaled_image(level)
+            for level in range(1, prepare.ASTEROIDS['level'] + 1)}
@@ -0,0 +1,90 @@
+"""
+Heuristic pilot that plays the game without keyboard
+
+The pilot turns the ship toward the point where the nearest target (asteroid
+or UFO) will be hit by a laser (see `ufo.intercept`), shoots when the ship
+points at it and thrusts toward distant targets. It has no random numbers
+and no state besides the shooting cooldown, so a game played by it follows
+the seed of the game like a replay.
+
+Attributes:
+    AIM_TOLERANCE (float): the ship fires when its direction differs from
+        the direction to the target by fewer degrees
+    TURN_DEADZONE (float): the ship keeps its direction when it differs
+        from the direction to the target by fewer degrees
+    FIRE_INTERVAL (int): number of updates between shots
+    THRUST_DISTANCE (float): the ship thrusts toward targets farther than
+        this number of pixels
+    CRUISE_SPEED (float): the ship does not thrust faster than this speed
+        in pixels per second
+
+"""
+
+import math
+
+from . import ufo
+from .. import inputs, prepare
+
+AIM_TOLERANCE = 6
+TURN_DEADZONE = 2
+FIRE_INTERVAL = 8
+THRUST_DISTANCE = 350
+CRUISE_SPEED = 250
+
+
+class Autopilot:
+    """
+    Pilot aiming at the nearest asteroid or UFO
+
+    Args:
+        asteroids (asteroids.AsteroidsGroup): asteroids of the game
+        ufos (ufo.UfoGroup): UFOs of the game, optional
+
+    Attributes:
+        cooldown (int): number of updates before the next shot
+
+    """
+    def __init__(self, asteroids, ufos=None):
+        self.asteroids = asteroids
+        self.ufos = ufos
+        self.cooldown = 0
+
+    def target(self, ship):
+        """
+        Return the nearest target and distance to it
+
+        Returns:
+            tuple: (target, distance), target is None if there is none
+
+        """
+        target, distance = self.asteroids.nearest(ship.x, ship.y)
+        for saucer in self.ufos or ():
+            gap = math.hypot(saucer.x - ship.x, saucer.y - ship.y)
+            if gap < distance:
+                target, distance = saucer, gap
+        return target, distance
+
+    def command(self, ship):
+        """
+        Return command that aims, shoots and closes in on the target
+        """
+        if self.cooldown:
+            self.cooldown -= 1
+        target, distance = self.target(ship)
+        if target is None:
+            return inputs.IDLE
+        bearing = ufo.intercept(ship, target, prepare.LASER['speed'])
+        error = (bearing - ship.rotation + 180) % 360 - 180
+
+        turn = 0
+        if error > TURN_DEADZONE:
+            turn = ship.LEFT
+        elif error < -TURN_DEADZONE:
+            turn = ship.RIGHT
+        fire = abs(error) < AIM_TOLERANCE and not self.cooldown
+        if fire:
+            self.cooldown = FIRE_INTERVAL
+        thrust = (abs(error) < AIM_TOLERANCE and
+                  distance > THRUST_DISTANCE and
+                  math.hypot(ship.dx, ship.dy) < CRUISE_SPEED)
+        return inputs.Command(turn, thrust, fire)
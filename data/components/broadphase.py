@@ -0,0 +1,250 @@
+"""
+Sweep-and-prune broadphase and elastic bounces of circular entities
+
+`SweepAndPrune` keeps its members in a list ordered by the left edge of their
+rects. The list persists between frames and entities move only a little each
+tick, so the list is almost sorted and sorting it again costs roughly linear
+time (`list.sort` detects the sorted runs). Sweeping the ordered list then
+reports pairs whose rects overlap, without testing every pair.
+
+The same ordered list answers spatial queries (`within` and `nearest`),
+only members in a narrow band of left edges around the query point are
+tested. Queries see positions of the last sorting, members move only a few
+pixels each tick, so queries made in the same tick as `pairs` are exact
+enough for steering and aiming.
+
+Members need `rect`, `x`, `y`, `dx`, `dy` and `radius` attributes (see
+`components._MovingSprite`).
+
+"""
+
+import bisect
+import math
+import operator
+
+from . import components
+
+_left = operator.attrgetter('rect.left')
+
+
+class SweepAndPrune:
+    """
+    Persistent x-sorted list of entities reporting overlapping pairs
+
+    Entities straddling the screen edge in wrap mode are tested only on the
+    side where their position is.
+
+    Attributes:
+        order (:obj:`list`): members ordered by left edge of their rects
+        members (:obj:`dict`): members in order of adding, used as a set
+        widest (int): the largest width of rect of all added members
+
+    """
+    def __init__(self):
+        self.order = []
+        self.members = {}
+        self.widest = 0
+        self._removed = False
+        self._lefts = None
+
+    def __len__(self):
+        return len(self.members)
+
+    def add(self, entity):
+        """
+        Add entity, it is sorted into `order` by the next `pairs` call
+        """
+        if entity not in self.members:
+            self.members[entity] = None
+            self.order.append(entity)
+            self.widest = max(self.widest, entity.rect.width)
+            self._lefts = None
+
+    def remove(self, entity):
+        """
+        Remove entity, unknown entity is ignored
+        """
+        if self.members.pop(entity, False) is None:
+            self._removed = True
+
+    def sort(self):
+        """
+        Drop removed members from `order` and sort it again by current rects
+        """
+        if self._removed:
+            members = self.members
+            self.order = [entity for entity in self.order
+                          if entity in members]
+            self._removed = False
+        self.order.sort(key=_left)
+        self._lefts = None
+
+    def pairs(self):
+        """
+        Sort the members again and return pairs with overlapping rects
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: pairs of entities, the first one has
+                lower left edge
+
+        """
+        self.sort()
+        order = self.order
+
+        pairs = []
+        active = []
+        for entity in order:
+            rect = entity.rect
+            left = rect.left
+            active = [other for other in active if other.rect.right > left]
+            for other in active:
+                if rect.colliderect(other.rect):
+                    pairs.append((other, entity))
+            active.append(entity)
+        return pairs
+
+    def _edges(self):
+        """
+        Return left edges of `order`, they are collected once per sorting
+
+        Members are sorted first if some were added or removed since the
+        last sorting.
+        """
+        if self._lefts is None:
+            self.sort()
+            self._lefts = [entity.rect.left for entity in self.order]
+        return self._lefts
+
+    def _band(self, x, radius):
+        """
+        Return range of indexes of `order` whose rects can reach within
+        `radius` from `x`
+        """
+        lefts = self._edges()
+        return (bisect.bisect_left(lefts, x - radius - self.widest),
+                bisect.bisect_right(lefts, x + radius))
+
+    def candidates(self, x, radius):
+        """
+        Return number of members that `within` examines for query at `x`
+        """
+        start, stop = self._band(x, radius)
+        return stop - start
+
+    def within(self, x, y, radius):
+        """
+        Return members whose circles are closer than `radius` to the point
+
+        Args:
+            x, y (float): the point
+            radius (float): distance from the point
+
+        Returns:
+            :obj:`list`: found members ordered by left edge
+
+        """
+        start, stop = self._band(x, radius)
+        members = self.members
+        found = []
+        for entity in self.order[start:stop]:
+            reach = radius + entity.radius
+            off_x = entity.x - x
+            off_y = entity.y - y
+            if (off_x * off_x + off_y * off_y < reach * reach and
+                    entity in members):
+                found.append(entity)
+        return found
+
+    def nearest(self, x, y, limit=math.inf):
+        """
+        Return member whose circle is nearest to the point
+
+        Members are searched from the left edge nearest to `x` in both
+        directions, until the horizontal distance alone exceeds the best
+        distance found.
+
+        Args:
+            x, y (float): the point
+            limit (float): maximum distance, farther members are ignored
+
+        Returns:
+            tuple: (member, distance between the point and its circle), or
+                (None, `limit`) if no member is closer than `limit`
+
+        """
+        lefts = self._edges()
+        order, members = self.order, self.members
+        best, best_distance = None, limit
+        middle = bisect.bisect_left(lefts, x)
+        left, right = middle - 1, middle
+        while left >= 0 or right < len(order):
+            if left >= 0 and x - lefts[left] - self.widest > best_distance:
+                left = -1
+            if right < len(order) and lefts[right] - x > best_distance:
+                right = len(order)
+            for index in (left, right):
+                if 0 <= index < len(order):
+                    entity = order[index]
+                    distance = (math.hypot(entity.x - x, entity.y - y) -
+                                entity.radius)
+                    if distance < best_distance and entity in members:
+                        best, best_distance = entity, distance
+            left -= 1
+            right += 1
+        return best, best_distance
+
+    def bounce(self):
+        """
+        Bounce overlapping circles off each other
+
+        See `bounce` function.
+
+        Returns:
+            int: number of bounced pairs
+
+        """
+        bounced = 0
+        for first, second in self.pairs():
+            bounced += bounce(first, second)
+        return bounced
+
+
+def bounce(first, second):
+    """
+    Elastic bounce of two circles with masses given by their areas
+
+    Only velocities are changed and only if circles overlap and approach each
+    other, so circles created at the same place (like fragments of asteroid)
+    just fly apart. Relative speed along the normal is reduced by
+    `components.ENERGY_LOSS` percent, as if they bounced off the edge.
+
+    Args:
+        first, second (components._MovingSprite): colliding entities
+
+    Returns:
+        bool: True if velocities changed
+
+    """
+    # screen coordinates, positive `dy` moves up
+    normal_x = second.x - first.x
+    normal_y = second.y - first.y
+    distance = math.hypot(normal_x, normal_y)
+    radii = first.radius + second.radius
+    if distance == 0 or distance >= radii:
+        return False
+    normal_x /= distance
+    normal_y /= distance
+    approach = ((first.dx - second.dx) * normal_x -
+                (first.dy - second.dy) * normal_y)
+    if approach <= 0:
+        return False
+
+    first_mass = first.radius * first.radius
+    second_mass = second.radius * second.radius
+    impulse = ((1 + components.ENERGY_REMAINS) * approach /
+               (first_mass + second_mass))
+    first.dx -= impulse * second_mass * normal_x
+    first.dy += impulse * second_mass * normal_y
+    second.dx += impulse * first_mass * normal_x
+    second.dy -= impulse * first_mass * normal_y
+    return True
@@ -1,14 +1,26 @@
 """
 Module implements some
+
+Velocities are in pixels per second and `update` methods take time step
+`dt` in seconds.
+
+Attributes:
+    POOL_CAPACITY (int): default maximum number of killed sprites kept for
+        reuse by each `_FrameBasedSprite` subclass
+    LIFETIME_EPSILON (float): tolerance of comparing age with lifetime, so
+        rounding errors of summed time steps do not add one more update
+
 """
 import abc
 import math
 import pygame as pg
 
-from .. import prepare
+from .. import atlas, prepare, surfaces
 
 ENERGY_LOSS = 0
 ENERGY_REMAINS = 1 - (ENERGY_LOSS / 100)
+POOL_CAPACITY = 512
+LIFETIME_EPSILON = 1e-9
 
 
 class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
@@ -24,10 +36,12 @@ class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
     Attributes:
         colite (bool): if True, object bounce off the `move_rect` instead of
             go through
+        wrap (bool): if True, object leaving `move_rect` on one side enters
+            it on the opposite side. `colide` is ignored
         move_rect (pg.Rect): rectangle in witch Sprite moves. But if `colide`
             is set to True, this rectangle is ignored
-        dx (float): speed in x direction
-        dy (float): speed in y direction
+        dx (float): speed in x direction in pixels per second
+        dy (float): speed in y direction in pixels per second
         rotation (int): current rotation of the ship
         image_changed (bool): determine if image changed, if so, `image` is
             recreated, same with `rect`
@@ -42,13 +56,19 @@ class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
             `original` image is used every time when creating new `image` to
             preserve image quality.
         color (:obj:`tuple`of :obj:`int`): color to `fill` `image` with in RGB
-        alpha (int): alpha of the image <0; 255>
+        alpha (int): alpha of the image <0; 255>, None for opaque image
+        area (pg.Rect): area of `image` that is drawn, None means the whole
+            image. It is set when the image is taken from atlas, see `region`
 
     """
+    __slots__ = ('colide', 'wrap', 'move_rect', 'dx', 'dy', 'rotation',
+                 'image_changed', 'color_changed', 'original', 'rect', 'x',
+                 'y', 'image', 'color', 'alpha', 'area')
 
     def __init__(self, img, position):
         super().__init__([])
         self.colide = True
+        self.wrap = False
         self.move_rect = prepare.SCREEN_RECT
 
         self.dx = 0.0
@@ -65,6 +85,7 @@ class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
         self.image = None
         self.color = None
         self.alpha = 255
+        self.area = None
 
         self.update_image()
 
@@ -83,23 +104,31 @@ class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
 
         Set `colide` to False to bypass.
         """
-        difference = {'x': 0, 'y': 0}
-        if self.rect.right > self.move_rect.right and self.dx > 0:
-            difference['x'] = self.move_rect.right - self.rect.right
-        elif self.rect.left < self.move_rect.left and self.dx < 0:
-            difference['x'] = self.move_rect.left - self.rect.left
-        if self.rect.top < self.move_rect.top and self.dy > 0:
-            difference['y'] = self.move_rect.top - self.rect.top
-        elif self.rect.bottom > self.move_rect.bottom and self.dy < 0:
-            difference['y'] = self.move_rect.bottom - self.rect.bottom
-        if difference['x'] is not 0:
-            self._bounce_in_x_direction(difference['x'])
-        elif difference['y'] is not 0:
-            self._bounce_in_y_direction(difference['y'])
+        rect, area = self.rect, self.move_rect
+        if rect.right > area.right and self.dx > 0:
+            self._bounce_in_x_direction(area.right - rect.right)
+        elif rect.left < area.left and self.dx < 0:
+            self._bounce_in_x_direction(area.left - rect.left)
+        elif rect.top < area.top and self.dy > 0:
+            self._bounce_in_y_direction(area.top - rect.top)
+        elif rect.bottom > area.bottom and self.dy < 0:
+            self._bounce_in_y_direction(area.bottom - rect.bottom)
         else:
             return
         self._check_position()
 
+    def _wrap_position(self):
+        """
+        Move the object back into `move_rect` as if its edges were connected
+
+        Position is computed by one modulo on each axis, so it works for any
+        velocity.
+        """
+        area = self.move_rect
+        self.x = area.left + (self.x - area.left) % area.width
+        self.y = area.top + (self.y - area.top) % area.height
+        self.update_rect()
+
     def _bounce_in_x_direction(self, difference):
         self.dx *= -ENERGY_REMAINS
         shift = difference * (1 + ENERGY_REMAINS)
@@ -127,7 +156,9 @@ class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
         """
         Updates `rect` position by `x`, `y` values
         """
-        self.rect.center = self.get_position()
+        rect = self.rect
+        rect.centerx = self.x
+        rect.centery = self.y
 
     def _check_angle(self, angle):
         """
@@ -149,17 +180,46 @@ class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
         self.color = color
         self.color_changed = True
 
+    def region(self):
+        """
+        Return region of atlas with pre-baked image matching the attributes
+
+        Called only if the atlas is built. Subclasses with images in the atlas
+        should overload it.
+
+        Returns:
+            data.atlas.Region: the region, None if there isn't such image
+
+        """
+        return None
+
     def update_image(self):
         """
         Update image to match new attributes
+
+        If atlas has pre-baked image (see `region`), `image` is the atlas page
+        and `area` is the image on it. Otherwise `image` is created from
+        `original`.
         """
+        region = self.region() if atlas.current is not None else None
+        if region is not None:
+            self.image, self.area = region.page, region.area
+            self.rect = region.surface.get_rect(center=self.get_position())
+            self.image_changed, self.color_changed = False, False
+            return
+        if self.area is not None:
+            self.area = None
+            self.image_changed = True
         if self.image_changed:
-            self.image = pg.transform.rotate(self.original, self.rotation)
+            self.image = surfaces.track(
+                    pg.transform.rotate(self.original, self.rotation),
+                    type(self).__name__, 'rotation')
             self.image.set_alpha(self.alpha)
             self.rect = self.image.get_rect(center=self.get_position())
         if ((self.color_changed or self.image_changed) and
                 self.color is not None):
             self.image.fill(self.color)
+            surfaces.invalidate(self.image)
         self.image_changed, self.color_changed = False, False
 
     def set_original(self, image):
@@ -197,19 +257,39 @@ class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
         self.image_changed = True
         self.update_image()
 
-    def update(self):
+    def update(self, dt):
         """
         Set new possition using velocities
 
         The `dy` value is subtracted instead of added. As a result, positive
         `dy` moves sprite up, instead of down.
+
+        The rect is moved in place and the image is updated only if it
+        changed, so steady movement allocates no new objects.
+
+        Args:
+            dt (float): time step in seconds
+
         """
-        self.x += self.dx
-        self.y -= self.dy
-        self.rect.center = self.get_position()
-        if self.colide:
+        self.x += self.dx * dt
+        self.y -= self.dy * dt
+        rect = self.rect
+        rect.centerx = self.x
+        rect.centery = self.y
+        if self.wrap:
+            self._wrap_position()
+        elif self.colide and not self.move_rect.contains(rect):
             self._check_position()
-        self.update_image()
+        if self.image_changed or self.color_changed:
+            self.update_image()
+
+    @property
+    def radius(self):
+        """
+        float: radius of circle inscribed in unrotated image, used by swept
+            collision tests
+        """
+        return min(self.original.get_size()) / 2
 
     def get_position(self):
         """
@@ -218,40 +298,162 @@ class _MovingSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
         return (self.x, self.y)
 
 
+class SpritePool:
+    """
+    Free list of killed sprites that are reinitialised instead of created
+
+    Args:
+        capacity (int): maximum number of sprites kept in free list
+
+    Attributes:
+        free (:obj:`list` of :obj:`_FrameBasedSprite`): killed sprites
+        live (int): number of sprites that were not killed yet
+
+    """
+    def __init__(self, capacity=POOL_CAPACITY):
+        self.capacity = capacity
+        self.free = []
+        self.live = 0
+
+    @property
+    def free_count(self):
+        """
+        int: number of sprites ready to reuse
+        """
+        return len(self.free)
+
+    def acquire(self, cls, *args):
+        """
+        Return killed sprite reinitialised by `args` or create new one
+
+        Args:
+            cls (type): `_FrameBasedSprite` subclass that owns this pool
+            *args: arguments of `cls` constructor
+
+        """
+        if not self.free:
+            return cls(*args)
+        sprite = self.free.pop()
+        sprite.pooled = False
+        self.live += 1
+        sprite.reinit(*args)
+        return sprite
+
+    def release(self, sprite):
+        """
+        Take killed sprite back, it is dropped if the pool is full
+        """
+        if sprite.pooled:
+            return
+        sprite.pooled = True
+        self.live -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(sprite)
+
+    def evict(self, excess):
+        """
+        Drop sprites released the longest ago until their surfaces free
+        `excess` bytes
+
+        It is eviction callback of `surfaces.accountant`. Eviction stops at
+        sprite whose drop frees nothing, as the sprites share their images.
+        """
+        accountant = surfaces.accountant
+        target = accountant.total - excess
+        while self.free and accountant.total > target:
+            before = accountant.total
+            del self.free[0]
+            if accountant.total == before:
+                break
+
+
 class _FrameBasedSprite(_MovingSprite, metaclass=abc.ABCMeta):
     """
-    Sprite calls each frame `make_changes` and that `kill` itself at the end
+    Sprite calls each update `make_changes` and `kill` itself at the end of
+    its life
 
-    `make_changes` method have to be overloaded
+    `make_changes` method have to be overloaded. Killed sprites return to
+    `pool` of their class. Use `spawn` instead of constructor to reuse them,
+    subclasses that take different arguments have to overload `reinit`.
 
     Args:
-        max_frames (int): determine how long does the life of the object will
-            be, at the final frame, it `kill` itself
+        lifetime (float): determine how long (in seconds) does the life of the
+            object will be, at the end, it `kill` itself
         img (:obj:`str` or :obj:`pygame.Surface`):
         position (:obj:`tuple`of :obj:`int`): ship's initial position
 
     Attributes:
-        count (int): number specifying what frame is the curent one
+        age (float): time in seconds since the sprite was spawned
+        pooled (bool): True if sprite is killed and waits in `pool`
+        pool (SpritePool): pool shared by all instances of the class. Every
+            subclass get its own pool with `POOL_CAPACITY` capacity, it is
+            evicted when surface memory exceeds its budget
 
     """
+    __slots__ = ('lifetime', 'age', 'pooled')
+    POOL_CAPACITY = POOL_CAPACITY
 
-    def __init__(self, max_frames, img, position):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.pool = SpritePool(cls.POOL_CAPACITY)
+        surfaces.add_evictor(cls.pool.evict)
+
+    def __init__(self, lifetime, img, position):
         super().__init__(img, position)
-        self.max_frames = max_frames
-        self.count = 0
+        self.lifetime = lifetime
+        self.age = 0.0
+        self.pooled = False
+        self.pool.live += 1
+
+    @classmethod
+    def spawn(cls, *args):
+        """
+        Return sprite from `pool` or new one if the pool is empty
+        """
+        return cls.pool.acquire(cls, *args)
+
+    def reinit(self, lifetime, img, position):
+        """
+        Reinitialise killed sprite in place
+
+        Takes the same arguments as constructor. Image is replaced only if it
+        differs from the current `original`. Velocity, color and other
+        attributes that subclasses set in constructor have to be set by
+        overloaded method.
+
+        """
+        self.lifetime = lifetime
+        self.age = 0.0
+        self.x, self.y = position
+        if isinstance(img, str):
+            img = prepare.GTX[img]
+        if img is not self.original:
+            self.set_original(img)
+        self.update_rect()
+
+    def kill(self):
+        """
+        Remove sprite from all groups and return it to `pool`
+        """
+        super().kill()
+        self.pool.release(self)
 
-    def update(self):
-        self.count += 1
-        if self.count >= self.max_frames:
+    def update(self, dt):
+        self.age += dt
+        if self.age + LIFETIME_EPSILON >= self.lifetime:
             self.kill()
         else:
-            self.make_changes(self.count)
-            super().update()
+            self.make_changes(dt)
+            super().update(dt)
 
     @abc.abstractmethod
-    def make_changes(self, frames):
+    def make_changes(self, dt):
         """
         The class should changes in this method
 
         This method have to be overloaded.
+
+        Args:
+            dt (float): time step in seconds, `age` is already increased
+
         """
@@ -0,0 +1,200 @@
+"""
+Debris of explosions kept in NumPy arrays
+
+Debris points are not sprites. Positions, velocities, ages and colors of
+all points are columns of preallocated arrays, they are advanced in bulk
+and written into the frame by one scatter through `pygame.surfarray`.
+Points fade out by their age, they are blended with pixels below them.
+
+Debris is only a visual effect, its random numbers come from its own
+generator, so numbers of the game random generator are not consumed.
+
+Args:
+    CAPACITY (int): maximum number of live points, the oldest points are
+        replaced by new ones when it is full
+    POINTS (int): points of burst of asteroid of level 1, the number is
+        halved with each level like the radius
+    SPEED (:obj:`tuple` of :obj:`float`): minimum and maximum speed of
+        points in pixels per second
+    LIFETIME (:obj:`tuple` of :obj:`float`): minimum and maximum lifetime of
+        points in seconds
+    DRAG (float): points slow their speed by this part each second
+    COLOR (:obj:`tuple` of :obj:`int`): default color of points
+
+"""
+
+import numpy as np
+import pygame as pg
+
+from .. import quality, surfaces
+
+CAPACITY = 8192
+POINTS = 480
+SPEED = (40.0, 320.0)
+LIFETIME = (0.4, 1.2)
+DRAG = 0.6
+COLOR = (255, 220, 170)
+
+_random = np.random.default_rng()
+
+
+class Debris:
+    """
+    Layer of debris points of all explosions
+
+    Live points are the first `count` rows of the arrays, dead points are
+    removed by compacting the arrays, so no memory is allocated per point.
+
+    Args:
+        capacity (int): maximum number of live points
+
+    Attributes:
+        count (int): number of live points
+        position (numpy.ndarray): positions of points, shape (capacity, 2)
+        velocity (numpy.ndarray): velocities of points, shape (capacity, 2)
+        age (numpy.ndarray): ages of points in seconds
+        lifetime (numpy.ndarray): lifetimes of points in seconds
+        color (numpy.ndarray): colors of points, shape (capacity, 3)
+
+    """
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.age = np.zeros(capacity)
+        self.lifetime = np.ones(capacity)
+        self.color = np.zeros((capacity, 3))
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """
+        Remove all points
+        """
+        self.count = 0
+
+    def explode(self, asteroid):
+        """
+        Burst of destroyed asteroid, smaller asteroids burst with fewer
+        points
+        """
+        return self.burst(asteroid.rect.center,
+                          POINTS >> (asteroid.level - 1))
+
+    def burst(self, position, points, color=COLOR):
+        """
+        Add `points` points flying from `position` in random directions
+
+        The number of points is scaled by `quality.current`. If the layer
+        is full, the oldest points are dropped to make room.
+
+        Args:
+            position (:obj:`tuple` of :obj:`float`): center of the burst
+            points (int): number of points on the best quality
+            color (:obj:`tuple` of :obj:`int`): color of the points
+
+        Returns:
+            int: number of added points
+
+        """
+        points = min(int(points * quality.current.debris), self.capacity)
+        if points <= 0:
+            return 0
+        overflow = self.count + points - self.capacity
+        if overflow > 0:
+            self._keep(np.arange(overflow, self.count))
+        new = slice(self.count, self.count + points)
+        angles = _random.uniform(0, 2 * np.pi, points)
+        speeds = _random.uniform(*SPEED, points)
+        self.position[new] = position
+        self.velocity[new, 0] = speeds * np.cos(angles)
+        self.velocity[new, 1] = speeds * np.sin(angles)
+        self.age[new] = 0.0
+        self.lifetime[new] = _random.uniform(*LIFETIME, points)
+        self.color[new] = color
+        self.count += points
+        return points
+
+    def update(self, dt):
+        """
+        Move and age all points, remove points older than their lifetime
+        """
+        if not self.count:
+            return
+        live = slice(0, self.count)
+        self.velocity[live] *= max(0.0, 1 - DRAG * dt)
+        self.position[live] += self.velocity[live] * dt
+        self.age[live] += dt
+        expired = self.age[live] >= self.lifetime[live]
+        if expired.any():
+            self._keep(np.flatnonzero(~expired))
+
+    def _keep(self, indices):
+        count = len(indices)
+        for array in (self.position, self.velocity, self.age, self.lifetime,
+                      self.color):
+            array[:count] = array[indices]
+        self.count = count
+
+    def draw(self, surface):
+        """
+        Blend live points into `surface` by one scatter of its pixels
+
+        Points are drawn at `surfaces.scale`, points out of the surface are
+        skipped. Pixels are packed by masks of the surface, so any format
+        with 2 or 4 bytes per pixel works, other formats fall back to
+        `pygame.Surface.set_at`.
+        """
+        if not self.count:
+            return
+        live = slice(0, self.count)
+        xy = (self.position[live] * surfaces.scale).astype(np.intp)
+        width, height = surface.get_size()
+        inside = ((xy[:, 0] >= 0) & (xy[:, 0] < width) &
+                  (xy[:, 1] >= 0) & (xy[:, 1] < height))
+        x, y = xy[inside, 0], xy[inside, 1]
+        alpha = 1 - self.age[live][inside] / self.lifetime[live][inside]
+        color = self.color[live][inside]
+        if surface.get_bytesize() not in (2, 4):
+            self._draw_slow(surface, x, y, color * alpha[:, np.newaxis])
+            return
+        pixels = pg.surfarray.pixels2d(surface)
+        try:
+            below = pixels[x, y].astype(np.int64)
+            pixels[x, y] = _blend(surface, below, color, alpha)
+        finally:
+            del pixels
+
+    @staticmethod
+    def _draw_slow(surface, x, y, colors):
+        for px, py, rgb in zip(x.tolist(), y.tolist(),
+                               colors.astype(int).tolist()):
+            surface.set_at((px, py), rgb)
+
+
+def _blend(surface, below, color, alpha):
+    """
+    Return packed pixels of `color` blended over packed pixels `below`
+
+    Args:
+        surface (pygame.Surface): surface whose pixel format is used
+        below (numpy.ndarray): packed pixels of the surface
+        color (numpy.ndarray): colors of points, shape (n, 3)
+        alpha (numpy.ndarray): opacities of points from 0 to 1
+
+    Returns:
+        numpy.ndarray: the packed blended pixels
+
+    """
+    masks = surface.get_masks()[:3]
+    shifts = surface.get_shifts()[:3]
+    losses = surface.get_losses()[:3]
+    packed = below & ~(masks[0] | masks[1] | masks[2])
+    for channel, (mask, shift, loss) in enumerate(zip(masks, shifts,
+                                                      losses)):
+        under = ((below & mask) >> shift) << loss
+        value = under + (color[:, channel] - under) * alpha
+        packed |= ((value.astype(np.int64) >> loss) << shift) & mask
+    return packed
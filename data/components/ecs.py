@@ -0,0 +1,428 @@
+"""
+Entity-component-system core
+
+Entity is a sprite that stores fields of its components in `__slots__`
+(see `components._MovingSprite`). `World` keeps a table for every component
+and systems iterate one table in a tight loop, instead of every group calling
+`update` of each member.
+
+Components and fields that entities of their table must have:
+    TRANSFORM: `x`, `y`, `rotation` and `rect`
+    VELOCITY: `dx`, `dy`, `colide` and `move_rect`, moved by `World.step`
+        with explicit time step
+    WRAP: `move_rect`, entities are wrapped around the edges of `move_rect`
+        instead of bouncing off them. Entities straddling an edge are drawn
+        and collide on both sides of the edge
+    LIFETIME: `age` and `lifetime` (in seconds), killed by `World.step` at
+        the end of life
+    ANIMATION: `make_changes` method called every step with the time step
+    RENDER: `image`, `rect`, `area`, `image_changed` and `color_changed`,
+        there is one render table for each layer, see `render`
+    COLLIDER: `rect` and `radius`, there is one collider table for each kind
+        of objects, see `collider`. Entities with `touches` method have
+        narrowphase test of their shape (see `World.collisions`)
+
+Entities usually join the world through `EntityGroup`, that add its members
+into the tables listed in `COMPONENTS` and remove them when they are killed.
+
+"""
+
+import collections
+import operator
+
+import pygame as pg
+
+from .components import LIFETIME_EPSILON
+from .. import surfaces
+
+TRANSFORM = 'transform'
+VELOCITY = 'velocity'
+WRAP = 'wrap'
+LIFETIME = 'lifetime'
+ANIMATION = 'animation'
+RENDER = 'render'
+COLLIDER = 'collider'
+
+_blit_args = operator.attrgetter('image', 'rect', 'area')
+
+
+def _is_render(component):
+    return isinstance(component, tuple) and component[0] == RENDER
+
+
+def ghost_offsets(rect, area):
+    """
+    Return shifts of wrapped rect that show its parts beyond edges of area
+
+    Args:
+        rect (pygame.Rect): rect of the entity
+        area (pygame.Rect): rect in which entity moves
+
+    Returns:
+        :obj:`list` of :obj:`tuple`: (x, y) shifts, empty if `rect` lies
+            inside `area`
+
+    """
+    x_shifts = [0]
+    if rect.left < area.left:
+        x_shifts.append(area.width)
+    elif rect.right > area.right:
+        x_shifts.append(-area.width)
+    y_shifts = [0]
+    if rect.top < area.top:
+        y_shifts.append(area.height)
+    elif rect.bottom > area.bottom:
+        y_shifts.append(-area.height)
+    return [(x, y) for x in x_shifts for y in y_shifts if x or y]
+
+
+def sweep_circle(start, end, center, radius):
+    """
+    Test segment against circle
+
+    Args:
+        start (:obj:`tuple` of :obj:`float`): start of the segment
+        end (:obj:`tuple` of :obj:`float`): end of the segment
+        center (:obj:`tuple` of :obj:`float`): center of the circle
+        radius (float): radius of the circle
+
+    Returns:
+        float: fraction (0 to 1) of the segment closest to the center, or None
+            if the segment does not touch the circle
+
+    """
+    x, y = start
+    seg_x, seg_y = end[0] - x, end[1] - y
+    to_x, to_y = center[0] - x, center[1] - y
+    length = seg_x * seg_x + seg_y * seg_y
+    fraction = 0.0
+    if length:
+        fraction = min(1.0, max(0.0, (to_x * seg_x + to_y * seg_y) / length))
+    off_x = seg_x * fraction - to_x
+    off_y = seg_y * fraction - to_y
+    if off_x * off_x + off_y * off_y <= radius * radius:
+        return fraction
+    return None
+
+
+def render(layer):
+    """
+    Return key of render table for given layer
+
+    Args:
+        layer (int): layers with lower number are drawn first
+
+    """
+    return (RENDER, layer)
+
+
+def collider(kind):
+    """
+    Return key of collider table for given kind of objects
+
+    Args:
+        kind (str): name of the kind, for example 'asteroids'
+
+    """
+    return (COLLIDER, kind)
+
+
+def _touch(entity, rect, other, other_rect):
+    """
+    Return True if entities whose rects overlap collide
+
+    Entities without `touches` method collide as their rects.
+    """
+    touches = getattr(entity, 'touches', None)
+    if touches is not None:
+        return touches(rect, other, other_rect)
+    touches = getattr(other, 'touches', None)
+    if touches is not None:
+        return touches(other_rect, entity, rect)
+    return True
+
+
+class World:
+    """
+    Component tables and systems working on them
+
+    Table is a dict with entities as keys, so adding and removing is O(1) and
+    iteration keeps the order in which entities were added.
+
+    Attributes:
+        tables (:obj:`dict` of :obj:`dict`): tables keyed by component
+        memberships (:obj:`dict`): component keys of every entity
+        render_layers (:obj:`list` of :obj:`dict`): render tables sorted by
+            layer
+
+    """
+    def __init__(self):
+        self.tables = collections.defaultdict(dict)
+        self.memberships = {}
+        self.render_layers = []
+        self._expired = []
+
+    def __len__(self):
+        return len(self.memberships)
+
+    def __contains__(self, entity):
+        return entity in self.memberships
+
+    def table(self, component):
+        """
+        Return table of given component, it is created if it doesn't exist
+        """
+        if component not in self.tables:
+            self.tables[component] = {}
+            if _is_render(component):
+                self.render_layers = [self.tables[key] for key in
+                                      sorted(filter(_is_render, self.tables))]
+        return self.tables[component]
+
+    def add(self, entity, components):
+        """
+        Add entity into tables of given components
+
+        Args:
+            entity (components._MovingSprite): the entity
+            components (:obj:`tuple`): component keys
+
+        """
+        self.memberships[entity] = components
+        for component in components:
+            self.table(component)[entity] = None
+
+    def remove(self, entity):
+        """
+        Remove entity from all tables, unknown entity is ignored
+        """
+        for component in self.memberships.pop(entity, ()):
+            del self.tables[component][entity]
+
+    def step(self, dt):
+        """
+        Run all systems that advance the simulation by one tick
+
+        Args:
+            dt (float): time step in seconds
+
+        """
+        self._age(dt)
+        self._animate(dt)
+        self._move(dt)
+        self._wrap()
+        self._refresh_images()
+
+    def _age(self, dt):
+        expired = self._expired
+        for entity in self.tables[LIFETIME]:
+            entity.age += dt
+            if entity.age + LIFETIME_EPSILON >= entity.lifetime:
+                expired.append(entity)
+        if expired:
+            for entity in expired:
+                entity.kill()
+            expired.clear()
+
+    def _animate(self, dt):
+        for entity in self.tables[ANIMATION]:
+            entity.make_changes(dt)
+
+    def _move(self, dt):
+        for entity in self.tables[VELOCITY]:
+            entity.x += entity.dx * dt
+            entity.y -= entity.dy * dt
+            rect = entity.rect
+            rect.centerx = entity.x
+            rect.centery = entity.y
+            if (entity.colide and not entity.wrap and
+                    not entity.move_rect.contains(rect)):
+                entity._check_position()
+
+    def _wrap(self):
+        for entity in self.tables[WRAP]:
+            area = entity.move_rect
+            x = area.left + (entity.x - area.left) % area.width
+            y = area.top + (entity.y - area.top) % area.height
+            if x != entity.x or y != entity.y:
+                entity.x, entity.y = x, y
+                entity.rect.centerx = x
+                entity.rect.centery = y
+
+    def straddling(self):
+        """
+        Return wrapped entities that overlap an edge, with their ghost rects
+
+        Returns:
+            :obj:`dict`: lists of ghost rects keyed by entity
+
+        """
+        ghosts = {}
+        for entity in self.tables[WRAP]:
+            rect = entity.rect
+            if not entity.move_rect.contains(rect):
+                ghosts[entity] = [rect.move(offset) for offset
+                                  in ghost_offsets(rect, entity.move_rect)]
+        return ghosts
+
+    def _refresh_images(self):
+        for layer in self.render_layers:
+            for entity in layer:
+                if entity.image_changed or entity.color_changed:
+                    entity.update_image()
+
+    def draw(self, surface):
+        """
+        Draw entities of all render tables, one `blits` call per layer
+
+        Entities with images from atlas are drawn as areas of atlas pages.
+
+        Wrapped entities that overlap an edge are drawn also on the opposite
+        side.
+        """
+        ghosts = self.straddling()
+        for layer in self.render_layers:
+            blits = list(map(_blit_args, layer))
+            for entity, rects in ghosts.items():
+                if entity in layer:
+                    blits.extend((entity.image, rect, entity.area)
+                                 for rect in rects)
+            surfaces.blits(surface, blits)
+
+    def collisions(self, first, second):
+        """
+        Return colliding pairs of entities from two collider tables
+
+        Ghost rects of wrapped entities that overlap an edge are tested too,
+        every pair is reported once. Pairs with overlapping rects are tested
+        by `touches` method of entities that have it.
+
+        Args:
+            first (:obj:`tuple`): key of the smaller collider table
+            second (:obj:`tuple`): key of the other collider table
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: pairs (entity from `first`, entity
+                from `second`)
+
+        """
+        ghosts = self.straddling()
+        table = self.tables[second]
+        others = list(table)
+        rects = [entity.rect for entity in others]
+        for entity, ghost_rects in ghosts.items():
+            if entity in table:
+                others.extend(entity for rect in ghost_rects)
+                rects.extend(ghost_rects)
+
+        pairs = []
+        for entity in self.tables[first]:
+            found = {}
+            for rect in [entity.rect] + ghosts.get(entity, []):
+                for index in rect.collidelistall(rects):
+                    other = others[index]
+                    if other not in found and _touch(entity, rect, other,
+                                                     rects[index]):
+                        found[other] = None
+            pairs.extend((entity, other) for other in found)
+        return pairs
+
+    def swept_collisions(self, first, second, dt):
+        """
+        Return pairs of fast entities and circles they passed during last step
+
+        Entities of `first` table are swept along the path they moved during
+        the step, so they can not tunnel through small entities of `second`
+        table. Segment relative to the moving circle is tested, the circle
+        radius is enlarged by radius of the swept entity. Ghosts of wrapped
+        entities of `second` table are tested too.
+
+        All entities of `first` table are tested in one batch, candidates are
+        found by one `collidelistall` of rect covering the whole path against
+        rects of circles covering their own path during the step.
+
+        Args:
+            first (:obj:`tuple`): key of collider table of fast entities
+            second (:obj:`tuple`): key of collider table of circles
+            dt (float): time step of the last `step`
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: pairs (entity from `first`, entity
+                from `second`), hits of one entity are ordered as they
+                happened along its path
+
+        """
+        table = self.tables[second]
+        others = list(table)
+        rects = [_swept_rect(entity, entity.rect, dt) for entity in others]
+        centers = [(entity.x, entity.y) for entity in others]
+        for entity, ghost_rects in self.straddling().items():
+            if entity in table:
+                for rect in ghost_rects:
+                    others.append(entity)
+                    rects.append(_swept_rect(entity, rect, dt))
+                    centers.append((entity.x + rect.x - entity.rect.x,
+                                    entity.y + rect.y - entity.rect.y))
+
+        pairs = []
+        for entity in self.tables[first]:
+            shift_x, shift_y = entity.dx * dt, -entity.dy * dt
+            path = entity.rect.union(entity.rect.move(-shift_x, -shift_y))
+            hits = []
+            for index in path.collidelistall(rects):
+                other = others[index]
+                rel_x = shift_x - other.dx * dt
+                rel_y = shift_y + other.dy * dt
+                fraction = sweep_circle((entity.x - rel_x, entity.y - rel_y),
+                                        (entity.x, entity.y), centers[index],
+                                        entity.radius + other.radius)
+                if fraction is not None:
+                    hits.append((fraction, index))
+            found = dict.fromkeys(others[index] for fraction, index
+                                  in sorted(hits))
+            pairs.extend((entity, other) for other in found)
+        return pairs
+
+
+def _swept_rect(entity, rect, dt):
+    """
+    Return `rect` of `entity` enlarged to cover its move during last step
+    """
+    return rect.union(rect.move(-entity.dx * dt, entity.dy * dt))
+
+
+class EntityGroup(pg.sprite.RenderPlain):
+    """
+    Sprite group whose members are entities of a `World`
+
+    Without world the group works as plain sprite group, its members are
+    updated and drawn by `update` and `draw` methods.
+
+    Args:
+        world (World): world to which members are added, can be None
+        wrap (bool): if True, members wrap around edges of their `move_rect`
+            instead of bouncing off them
+
+    Attributes:
+        COMPONENTS (:obj:`tuple`): component keys of members, subclasses
+            should overload it
+
+    """
+    COMPONENTS = (TRANSFORM,)
+
+    def __init__(self, world=None, wrap=False):
+        self.world = world
+        self.wrap = wrap
+        self.components = self.COMPONENTS + ((WRAP,) if wrap else ())
+        super().__init__([])
+
+    def add_internal(self, sprite, *args):
+        super().add_internal(sprite, *args)
+        sprite.wrap = self.wrap
+        if self.world is not None:
+            self.world.add(sprite, self.components)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if self.world is not None:
+            self.world.remove(sprite)
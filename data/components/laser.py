@@ -3,26 +3,39 @@ Module implying lasers
 
 Args:
     LASER_COLOR (:obj:`list` of :obj:`int`): color of the lasers in RGB
+    LAYER (int): render layer of lasers
+    COLLIDER (:obj:`tuple`): collider table of lasers
 
 """
-import pygame as pg
 
-from . import components
-from .. import prepare
+from . import components, ecs
+from .. import atlas, audio, prepare
 
 LASER_COLOR = (255, 255, 255)
+LAYER = 1
+COLLIDER = ecs.collider('lasers')
 
 
-class Lasers(pg.sprite.RenderPlain):
+class Lasers(ecs.EntityGroup):
     """
     Laser gun
 
     Args:
+        world (ecs.World): world that moves and draws lasers
+        wrap (bool): if True, lasers wrap around the screen edges
+
+    Attributes:
         max (int): maximum lasers that can exists simultaneously
+        COLOR (:obj:`tuple` of :obj:`int`): color of fired lasers, subclasses
+            can overload it
 
     """
-    def __init__(self):
-        super().__init__(list())
+    COMPONENTS = (ecs.TRANSFORM, ecs.VELOCITY, ecs.LIFETIME,
+                  ecs.render(LAYER), COLLIDER)
+    COLOR = LASER_COLOR
+
+    def __init__(self, world=None, wrap=False):
+        super().__init__(world, wrap)
         self.max = 4
 
     def fire(self, gun):
@@ -35,14 +48,15 @@ class Lasers(pg.sprite.RenderPlain):
 
         """
         if len(self) < self.max:
-            self.add(Laser(gun))
+            self.add(Laser.spawn(gun, self.COLOR))
+            audio.play(audio.LASER)
 
 
 class Laser(components._FrameBasedSprite):
     """
     Laser shot
 
-    `_FrameBasedSprite` automaticly kills sprite after final frame.
+    `_FrameBasedSprite` automaticly kills sprite at the end of its lifetime.
 
     Args:
         gun (data.components.ship.ShipPoint): hold data about the point from
@@ -50,14 +64,45 @@ class Laser(components._FrameBasedSprite):
         color (:obj:`list` of :obj:`int`): color of the lasers in RGB
 
     """
+    __slots__ = ()
+
     def __init__(self, gun, color=LASER_COLOR):
-        super().__init__(prepare.LASER['frames'],
+        super().__init__(prepare.LASER['lifetime'],
                          prepare.LASER['img'],
                          gun.get_position())
+        self.launch(gun)
+        self.update_color(color)
+
+    def reinit(self, gun, color=LASER_COLOR):
+        """
+        Fire killed laser again, image is recolored only if color differs
+        """
+        super().reinit(prepare.LASER['lifetime'],
+                       prepare.LASER['img'],
+                       gun.get_position())
+        self.launch(gun)
+        if color != self.color:
+            self.update_color(color)
+
+    def launch(self, gun):
+        """
+        Set velocity of the laser due to the gun
+        """
         self.dx = gun.dx
         self.dy = gun.dy
         self.accelerate(gun.direction, prepare.LASER['speed'])
-        self.update_color(color)
 
-    def make_changes(self, frames):
+    def region(self):
+        return atlas.lookup(('laser', self.color))
+
+    def make_changes(self, dt):
         pass
+
+
+def atlas_images():
+    """
+    Return image of laser of `LASER_COLOR` to be baked into atlas
+    """
+    image = prepare.LASER['img'].copy()
+    image.fill(LASER_COLOR)
+    return {('laser', LASER_COLOR): image}
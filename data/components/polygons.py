@@ -0,0 +1,177 @@
+"""
+Convex and star-shaped polygons in NumPy arrays
+
+Polygon is an array of shape (n, 2) with vertices relative to the position
+of its entity, ordered by their angle around it. Outlines of vector
+asteroids are star-shaped around the origin, collisions use their convex
+hulls.
+
+Random numbers come from the `random` module, so shapes are reproducible
+with its state like the rest of the simulation.
+
+Args:
+    VERTICES (int): number of vertices of generated outline
+    ROUGHNESS (float): vertices lie between (1 - `ROUGHNESS`) * radius and
+        radius from the origin
+    ANGLE_JITTER (float): maximum shift of vertex angle, as a fraction of
+        the angle between vertices
+
+"""
+
+import math
+import random
+
+import numpy as np
+import pygame as pg
+
+from .. import surfaces
+
+VERTICES = 12
+ROUGHNESS = 0.35
+ANGLE_JITTER = 0.4
+
+
+def generate(radius, vertices=VERTICES):
+    """
+    Return random star-shaped outline
+
+    Args:
+        radius (float): the largest distance of vertex from the origin
+        vertices (int): number of vertices
+
+    Returns:
+        numpy.ndarray: the outline
+
+    """
+    step = 2 * math.pi / vertices
+    angles = [step * (index + random.uniform(-ANGLE_JITTER, ANGLE_JITTER))
+              for index in range(vertices)]
+    radii = [radius * (1 - ROUGHNESS * random.random())
+             for index in range(vertices)]
+    angles, radii = np.array(angles), np.array(radii)
+    return np.column_stack((radii * np.cos(angles), -radii * np.sin(angles)))
+
+
+def bounding_radius(polygon):
+    """
+    Return radius of circle around the origin that contains the polygon
+    """
+    return float(np.sqrt((polygon * polygon).sum(axis=1)).max())
+
+
+def hull(polygon):
+    """
+    Return convex hull of the polygon (monotone chain algorithm)
+    """
+    points = sorted(map(tuple, polygon.tolist()))
+    if len(points) < 3:
+        return np.array(points, dtype=float)
+
+    def half(points):
+        chain = []
+        for point in points:
+            while len(chain) >= 2 and _cross(chain[-2], chain[-1],
+                                             point) <= 0:
+                chain.pop()
+            chain.append(point)
+        return chain[:-1]
+
+    return np.array(half(points) + half(points[::-1]), dtype=float)
+
+
+def _cross(origin, first, second):
+    return ((first[0] - origin[0]) * (second[1] - origin[1]) -
+            (first[1] - origin[1]) * (second[0] - origin[0]))
+
+
+def _normals(polygon):
+    edges = np.roll(polygon, -1, axis=0) - polygon
+    return np.column_stack((-edges[:, 1], edges[:, 0]))
+
+
+def overlap(first, second):
+    """
+    Test two convex polygons by separating axis theorem
+
+    Both polygons are projected on normals of all their edges at once, they
+    overlap if their projections overlap on every axis.
+
+    Args:
+        first (numpy.ndarray): vertices of the first polygon
+        second (numpy.ndarray): vertices of the second polygon, in the same
+            coordinates
+
+    Returns:
+        bool: True if the polygons overlap or touch
+
+    """
+    axes = np.concatenate((_normals(first), _normals(second))).T
+    first, second = first @ axes, second @ axes
+    return not np.any((first.max(axis=0) < second.min(axis=0)) |
+                      (second.max(axis=0) < first.min(axis=0)))
+
+
+def rect_polygon(rect):
+    """
+    Return corners of the rect as polygon in screen coordinates
+    """
+    return np.array((rect.topleft, rect.topright, rect.bottomright,
+                     rect.bottomleft), dtype=float)
+
+
+def split(outline, pieces):
+    """
+    Split star-shaped outline into wedges meeting at the origin
+
+    Neighbouring wedges share the vertex on their border, so they cover the
+    outline. Every wedge has at least three vertices.
+
+    Args:
+        outline (numpy.ndarray): star-shaped outline
+        pieces (int): number of wedges, it is limited by number of vertices
+
+    Returns:
+        :obj:`list` of :obj:`tuple`: pairs (outline of the wedge relative to
+            its center, center of the wedge relative to the origin). Wedges
+            are star-shaped around their centers
+
+    """
+    count = len(outline)
+    pieces = max(1, min(pieces, count))
+    start = random.randrange(count)
+    bounds = [start + count * piece // pieces for piece in range(pieces + 1)]
+    wedges = []
+    for first, last in zip(bounds, bounds[1:]):
+        indices = np.arange(first, last + 1) % count
+        wedge = np.concatenate((np.zeros((1, 2)), outline[indices]))
+        center = wedge.mean(axis=0)
+        wedge -= center
+        wedge = wedge[np.argsort(np.arctan2(-wedge[:, 1], wedge[:, 0]))]
+        wedges.append((wedge, (float(center[0]), float(center[1]))))
+    return wedges
+
+
+def draw(surface, color, outlines, centers):
+    """
+    Draw closed antialiased outlines
+
+    All outlines are moved to their centers (and scaled by `surfaces.scale`)
+    in one array operation.
+
+    Args:
+        surface (pygame.Surface): target surface
+        color (:obj:`tuple` of :obj:`int`): color of lines
+        outlines (:obj:`list` of :obj:`numpy.ndarray`): outlines relative to
+            their centers
+        centers (:obj:`list` of :obj:`tuple`): positions of the centers
+
+    """
+    if not outlines:
+        return
+    counts = [len(outline) for outline in outlines]
+    points = np.concatenate(outlines)
+    points += np.repeat(np.array(centers, dtype=float), counts, axis=0)
+    if surfaces.scale != 1:
+        points *= surfaces.scale
+    for polygon in np.split(points, np.cumsum(counts)[:-1]):
+        pg.draw.aalines(surface, color, True, polygon.tolist())
@@ -2,8 +2,22 @@
 Module implement ship and other close related objects
 
 Args:
-    SHIP_IMMORTAL_FRAMES (int): set interval of immortality right after
-        spawning the ship
+    SHIP_IMMORTAL_TIME (float): set interval (in seconds) of immortality
+        right after spawning the ship
+    STOP_SPEED (float): speed (in pixels per second) under which the slowing
+        ship stops
+    SHIP_ROTATIONS (int): number of pre-baked rotations of the ship in atlas
+    SMOKE_ROTATIONS (int): number of pre-baked rotations of smoke particle in
+        atlas, between 0 and 90 degrees
+    SMOKE_STAGES (int): number of pre-baked colors and alphas of smoke
+        particle in atlas during its life
+    SMOKE_LAYER (int): render layer of smoke particles
+    LAYER (int): render layer of the ship
+    COLLIDER (:obj:`tuple`): collider table of the ship
+
+Smoke is only a visual effect, its amount and look follow `quality.current`.
+It has its own random generator, so the number of emitted particles does not
+change random numbers of the game.
 
 """
 
@@ -11,16 +25,27 @@ import math
 import random
 import pygame as pg
 
-from . import components, laser
-from .. import prepare, tools
+from . import components, ecs, laser
+from .. import atlas, audio, inputs, prepare, quality, surfaces, tools
 
-SHIP_IMMORTAL_FRAMES = 120
+SHIP_IMMORTAL_TIME = 2
+STOP_SPEED = 3
+SHIP_ROTATIONS = 72
+SMOKE_ROTATIONS = 18
+SMOKE_STAGES = 16
+SMOKE_LAYER = 0
+LAYER = 2
+COLLIDER = ecs.collider('ship')
+
+_smoke_random = random.Random()
 
 
 class ShipPoint:
     """
     Class that exists just to hold informations about one point around ship
     """
+    __slots__ = ('x', 'y', 'direction', 'dx', 'dy')
+
     def __init__(self, x, y, direction, dx, dy):
         self.x = x
         self.y = y
@@ -43,11 +68,12 @@ class _ShipTraction(components._MovingSprite):
         LEFT (int): constant used when user rotates an `image` to the left
         RIGHT (int): constant used when user rotates an `image` to the left
         ship_size (:obj:`str` or :obj:`pygame.Surface`): sizes of the ship
-        rotation_speed (float): determine rotation of the ship each frame when
-        acceleration (float): acceleration of the ship per frame
+        rotation_speed (float): rotation of the ship in degrees per second
+        acceleration (float): acceleration of the ship in pixels per second
+            squared
         slow_factor (float): determine how large part of velocity will the
-            ship lost each frame
-        max_speed (float): maximum speed limit
+            ship lost each second
+        max_speed (float): maximum speed limit in pixels per second
 
     """
 
@@ -57,30 +83,35 @@ class _ShipTraction(components._MovingSprite):
     def __init__(self):
         super().__init__('ship', prepare.SHIP['xy'])
         self.ship_size = self.original.get_size()
-        self.rotate_speed = prepare.SHIP['rotate_speed'] / prepare.FPS
+        self.rotate_speed = prepare.SHIP['rotate_speed']
         self.acceleration = prepare.SHIP['acceleration']
         self.slow_factor = prepare.SHIP['slow_factor']
         self.max_speed = prepare.SHIP['max_speed']
 
-    def rotate(self, side):
+    def rotate(self, side, dt):
         """
         Rotate the ship by `rotate_speed`
 
         Args:
             side (int): set on witch side the ship should rotate. `LEFT` and
                 `RIGHT` values should be used for this argument
+            dt (float): time step in seconds
 
         """
-        angle = self.rotate_speed * side
+        angle = self.rotate_speed * side * dt
         self.rotate_angle(angle)
 
-    def accelerate(self):
+    def accelerate(self, dt):
         """
         Change ships speed and check speed limit
+
+        Args:
+            dt (float): time step in seconds
+
         """
         radians = math.radians(self.rotation)
-        self.dx += self.acceleration * math.cos(radians)
-        self.dy += self.acceleration * math.sin(radians)
+        self.dx += self.acceleration * dt * math.cos(radians)
+        self.dy += self.acceleration * dt * math.sin(radians)
         speed = math.hypot(self.dx, self.dy)
         if speed > self.max_speed:
             speed_vector_angle = self._calculate_speed_vector_angle()
@@ -105,16 +136,22 @@ class _ShipTraction(components._MovingSprite):
             else:
                 return math.radians(270)
 
-    def slow_down(self):
+    def slow_down(self, dt):
         """
         Slow down the ship by `slow_factor`
 
-        If ship's total speed is lower then 0.05, set `dx` and `dy` to 0
+        If ship's total speed is lower then `STOP_SPEED`, set `dx` and `dy`
+        to 0
+
+        Args:
+            dt (float): time step in seconds
+
         """
-        self.dx *= 1 - self.slow_factor
-        self.dy *= 1 - self.slow_factor
+        factor = (1 - self.slow_factor) ** dt
+        self.dx *= factor
+        self.dy *= factor
         self.speed = math.hypot(self.dx, self.dy)
-        if self.speed < 0.05:
+        if self.speed < STOP_SPEED:
             self.dx = 0
             self.dy = 0
 
@@ -149,61 +186,82 @@ class Ship(_ShipTraction):
     """
     Extension of `_ShipTraction` by image management
 
-    Rotate the ship by 90 degrees immediately.
+    Rotate the ship by 90 degrees immediately. The ship, its lasers and smoke
+    particles are moved and drawn by systems of the world, see `PlayerGroup`.
+
+    Args:
+        scheduler (data.scheduler.Scheduler): scheduler of the game state
+        world (ecs.World): world of the game
+        wrap (bool): if True, lasers wrap around the screen edges
+        pilot (object): pilot steering the ship, see `inputs`, keyboard by
+            default
 
     Attributes:
         immortal (bool): if True, ship can not collide with asteroids and other
             harmful objects
         smoke_generator (SmokeGenerator): generator of smoke particles
         ship_lasers (laser.Lasers): gun firing the laser
-        immortal_timer (tools.Timer): timer that disable the immortality after
-            `SHIP_IMMORTAL_FRAMES` frames
+        immortal_timer (data.scheduler.ScheduledCall): call that disable the
+            immortality after `SHIP_IMMORTAL_TIME` seconds
+        last_thrust (int): tick of `scheduler` when the ship accelerated the
+            last time
 
     """
 
-    def __init__(self):
+    def __init__(self, scheduler, world=None, wrap=False, pilot=None):
         super().__init__()
         self.immortal = True
+        self.scheduler = scheduler
+        self.pilot = pilot if pilot is not None else inputs.Keyboard()
+        self.last_thrust = scheduler.tick
 
-        self.smoke_generator = SmokeGenerator()
-        self.ship_lasers = laser.Lasers()
-        self.immortal_timer = tools.Timer(
-                SHIP_IMMORTAL_FRAMES / 60 * 1000,
-                self.disable_immortality,
-                ticks=1)
+        self.smoke_generator = SmokeGenerator(world)
+        self.ship_lasers = laser.Lasers(world, wrap)
+        self.immortal_timer = scheduler.call_in_ticks(
+                round(SHIP_IMMORTAL_TIME * tools.TICK_RATE),
+                self.disable_immortality)
 
         self.rotate_angle(90)
 
-    def update(self, now):
-        """
-        Slow down, then speed up, if user press a key
+    def update(self, dt):
         """
-        self.immortal_timer.check_tick(now)
-        self.slow_down()
-        self.key_event()
-        self.ship_lasers.update()
-        self.rect = self.image.get_rect(center=self.get_position())
-
-        _ShipTraction.update(self)
-        self.smoke_generator.update()
+        Slow down, then follow command of the pilot
 
-    def draw(self, surface):
-        self.smoke_generator.draw(surface)
-        self.ship_lasers.draw(surface)
+        Args:
+            dt (float): time step in seconds
 
-        surface.blit(self.image, self.rect)
+        """
+        self.slow_down(dt)
+        self.key_event(dt)
+        self.update_rect()
 
-    def key_event(self):
-        keys = pg.key.get_pressed()
-        if ((keys[pg.K_LEFT] and not keys[pg.K_RIGHT]) or
-                (keys[pg.K_a] and not keys[pg.K_d])):
-            self.rotate(self.LEFT)
-        elif ((keys[pg.K_RIGHT] and not keys[pg.K_LEFT]) or
-                (keys[pg.K_d] and not keys[pg.K_a])):
-            self.rotate(self.RIGHT)
-        if keys[pg.K_UP] or keys[pg.K_w]:
-            self.accelerate()
-            self.smoke_generator.create_particle(20, self.get_jet())
+    def key_event(self, dt):
+        """
+        Rotate, accelerate and fire according to command of `pilot`
+        """
+        command = self.pilot.command(self)
+        if command.turn:
+            self.rotate(command.turn, dt)
+        if command.thrust:
+            self.accelerate(dt)
+            self.last_thrust = self.scheduler.tick
+            audio.play(audio.THRUST)
+            self.smoke_generator.emit(dt, self.get_jet())
+        if command.fire:
+            self.space_pressed()
+
+    def region(self):
+        step = round(self.rotation * SHIP_ROTATIONS / 360) % SHIP_ROTATIONS
+        return atlas.lookup(('ship', step))
+
+    def kill(self):
+        """
+        Remove the ship and return its lasers and smoke particles to pools
+        """
+        for group in (self.ship_lasers, self.smoke_generator):
+            for sprite in group.sprites():
+                sprite.kill()
+        super().kill()
 
     def space_pressed(self):
         """
@@ -225,60 +283,142 @@ class SmokeParticle(components._FrameBasedSprite):
     Smoke particle generate own position. It jet as initial point and then it
     change its position with max deflection of 20.
 
-    Every frame, color is changed in `make_changes` method.
+    Every update, color is changed in `make_changes` method.
 
     Args:
         jet (ShipPoint): holder of informations about jet
 
     Attributes:
-        steps (:obj:`str` or :obj:`int`): change in color each frame
+        steps (:obj:`list` of :obj:`float`): change in color each second
 
     """
+    __slots__ = ('steps',)
+
     def __init__(self, jet):
         """
         Create random particle
         """
-        pos = list((x + random.randint(-20, 20) for x in jet.get_position()))
-        super().__init__(prepare.SMOKE['frames'],
-                         pg.Surface(prepare.SMOKE['size']),
-                         pos)
+        scale = quality.current.smoke_lifetime
+        super().__init__(prepare.SMOKE['lifetime'] * scale,
+                         surfaces.new(prepare.SMOKE['size'],
+                                      owner='SmokeParticle'),
+                         self._random_position(jet))
 
         self.colide = False
-        self.steps = prepare.SMOKE['rgb_change_per_frame']
+        self.steps = _smoke_steps(scale)
+        self.launch(jet)
+
+        self.rotate_angle(_smoke_random.randint(0, 89))
+        self.update_color(prepare.SMOKE['color'].copy())
+
+    def reinit(self, jet):
+        """
+        Reuse killed particle
 
-        direction = math.radians(jet.direction + random.randint(-20, 20))
+        Particle keeps its previous random rotation, so rotated image does not
+        have to be created again.
+        """
+        scale = quality.current.smoke_lifetime
+        super().reinit(prepare.SMOKE['lifetime'] * scale,
+                       self.original,
+                       self._random_position(jet))
+        self.steps = _smoke_steps(scale)
+        self.launch(jet)
+        self.alpha = 255
+        self.update_color(prepare.SMOKE['color'].copy())
+
+    @staticmethod
+    def _random_position(jet):
+        return (jet.x + _smoke_random.randint(-20, 20),
+                jet.y + _smoke_random.randint(-20, 20))
+
+    def launch(self, jet):
+        """
+        Set velocity of the particle from the jet with random deflection
+        """
+        deflection = _smoke_random.randint(-20, 20)
+        direction = math.radians(jet.direction + deflection)
         self.dx = prepare.SMOKE['speed'] * math.cos(direction)
         self.dx += jet.dx
         self.dy = prepare.SMOKE['speed'] * math.sin(direction)
         self.dy += jet.dy
 
-        self.rotate_angle(random.randint(0, 89))
-        self.update_color(prepare.SMOKE['color'].copy())
-
     @property
-    def alpha_by_frame(self):
+    def alpha_by_age(self):
         """
-        float: return how much transparent particle is each frame.
+        float: return how much transparent particle is at its age.
         """
-        return 256 - math.exp((self.count * math.log(256)) / self.max_frames)
-
-    def make_changes(self, frames):
+        return _smoke_alpha(self.age, self.lifetime)
+
+    def region(self):
+        if self.color is None:
+            return None
+        stage = min(SMOKE_STAGES - 1,
+                    int(self.age * SMOKE_STAGES / self.lifetime))
+        rotations = quality.current.smoke_rotations
+        step = (int(self.rotation) * rotations // 90 *
+                (SMOKE_ROTATIONS // rotations))
+        if quality.current.smoke_alpha:
+            return atlas.lookup(('smoke', step, stage))
+        return atlas.lookup(('smoke', step, stage, 'opaque'))
+
+    def make_changes(self, dt):
         """
         Change color of the particle and alpha channel
         """
         color = self.color
-        for index, step in enumerate(prepare.SMOKE['rgb_change_per_frame']):
-            color[index] -= step
+        for index, step in enumerate(self.steps):
+            color[index] -= step * dt
         self.update_color(color)
-        self.alpha = self.alpha_by_frame
+        if quality.current.smoke_alpha:
+            self.alpha = self.alpha_by_age
+        else:
+            self.alpha = None
 
 
-class SmokeGenerator(pg.sprite.RenderPlain):
+class PlayerGroup(ecs.EntityGroup):
+    """
+    Group that holds the ship
+    """
+    COMPONENTS = (ecs.TRANSFORM, ecs.VELOCITY, ecs.render(LAYER), COLLIDER)
+
+
+class SmokeGenerator(ecs.EntityGroup):
     """
     Generator of smoke particles
+
+    Particles are emitted at rate `prepare.SMOKE['rate']` per second scaled
+    by `quality.current`, the fraction of particle left over is carried to
+    the next update.
+
+    Args:
+        world (ecs.World): world that moves and draws particles
+
+    Attributes:
+        pending (float): particles owed from previous updates
+
     """
-    def __init__(self):
-        super().__init__([])
+    COMPONENTS = (ecs.TRANSFORM, ecs.VELOCITY, ecs.LIFETIME, ecs.ANIMATION,
+                  ecs.render(SMOKE_LAYER))
+
+    def __init__(self, world=None, wrap=False):
+        super().__init__(world, wrap)
+        self.pending = 0.0
+
+    def emit(self, dt, jet):
+        """
+        Create particles emitted during time step
+
+        Args:
+            dt (float): time step in seconds
+            jet (ShipPoint): holder of informations about jet
+
+        """
+        rate = prepare.SMOKE['rate'] * quality.current.smoke_rate
+        self.pending += rate * dt
+        number = int(self.pending)
+        self.pending -= number
+        self.create_particle(number, jet)
 
     def create_particle(self, number, jet):
         """
@@ -290,4 +430,79 @@ class SmokeGenerator(pg.sprite.RenderPlain):
 
         """
         for i in range(number):
-            self.add(SmokeParticle(jet))
+            self.add(SmokeParticle.spawn(jet))
+
+
+def _smoke_alpha(age, lifetime):
+    return 256 - math.exp((age * math.log(256)) / lifetime)
+
+
+def _smoke_steps(scale):
+    """
+    Return change of color each second of particle with lifetime scaled by
+    `scale`, so it reaches the same color at the end of its life
+    """
+    return [step / scale for step in prepare.SMOKE['rgb_change_per_second']]
+
+
+def _smoke_colors():
+    """
+    Return colors (rgba) of smoke particle in stages of its life
+    """
+    lifetime = prepare.SMOKE['lifetime']
+    colors = []
+    for stage in range(SMOKE_STAGES):
+        age = (stage + 0.5) * lifetime / SMOKE_STAGES
+        color = [int(color - step * age) for color, step
+                 in zip(prepare.SMOKE['color'],
+                        prepare.SMOKE['rgb_change_per_second'])]
+        color.append(max(0, min(255, int(_smoke_alpha(age, lifetime)))))
+        colors.append(color)
+    return colors
+
+
+def _smoke_sizes():
+    """
+    Return sizes of smoke particle in its rotations
+    """
+    return [pg.transform.rotate(pg.Surface(prepare.SMOKE['size']),
+                                step * 90 / SMOKE_ROTATIONS).get_size()
+            for step in range(SMOKE_ROTATIONS)]
+
+
+def atlas_images():
+    """
+    Return images to be baked into atlas
+
+    These are rotations of the ship, the ship icon and smoke particles in
+    all rotations and stages of life.
+    """
+    images = {'ship_icon': prepare.GTX['ship_icon']}
+    for step in range(SHIP_ROTATIONS):
+        images['ship', step] = pg.transform.rotate(
+                prepare.GTX['ship'], step * 360 / SHIP_ROTATIONS)
+
+    sizes = _smoke_sizes()
+    for stage, color in enumerate(_smoke_colors()):
+        for step, size in enumerate(sizes):
+            image = pg.Surface(size, pg.SRCALPHA)
+            image.fill(color)
+            images['smoke', step, stage] = image
+    return images
+
+
+def opaque_atlas_images():
+    """
+    Return images to be baked into atlas pages without alpha
+
+    These are smoke particles without transparency for lower quality levels,
+    see `quality.Quality.smoke_alpha`.
+    """
+    images = {}
+    sizes = _smoke_sizes()
+    for stage, color in enumerate(_smoke_colors()):
+        for step, size in enumerate(sizes):
+            image = pg.Surface(size)
+            image.fill(color[:3])
+            images['smoke', step, stage, 'opaque'] = image
+    return images
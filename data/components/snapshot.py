@@ -0,0 +1,388 @@
+"""
+Module implementing compact binary snapshots of the game and rewind buffer
+
+Snapshot is a plain `bytes` object with fixed layout. It starts with `HEADER`
+followed by `SHIP` record and state of the random generator. Then there are
+arrays of doubles with records of lasers, smoke particles, asteroids, UFOs
+and lasers of UFOs. The number of records of each kind is stored in the
+header.
+
+Args:
+    VERSION (int): version of the snapshot layout
+    HEADER (struct.Struct): version, flags, score, healths, round level,
+        asteroids number, immortality ticks, lasers count, smoke count,
+        asteroids count, UFOs count, UFO lasers count and `gauss_next` of
+        the random generator
+    SHIP (struct.Struct): x, y, dx, dy and rotation of the ship
+    RNG_STATE_SIZE (int): number of 32-bit words in random generator state
+    LASER_FIELDS (int): x, y, dx, dy and age of one laser
+    SMOKE_FIELDS (int): x, y, dx, dy, rotation, age and color (rgb)
+        of one smoke particle
+    ASTEROID_FIELDS (int): level, x, y, dx and dy of one asteroid
+    UFO_FIELDS (int): kind (1 for small), x, y, dx, dy, ticks before the
+        next shot and ticks before leaving of one UFO
+    END, SHIP_ALIVE, IMMORTAL (int): flags stored in the header
+    REWIND_SECONDS (int): how long history `RewindBuffer` keeps by default
+
+"""
+
+import array
+import collections
+import itertools
+import operator
+import random
+import struct
+import zlib
+
+from . import laser, ship, ufo
+from .. import tools
+
+VERSION = 3
+HEADER = struct.Struct('<HHiiiiiIIIIId')
+SHIP = struct.Struct('<5d')
+RNG_STATE_SIZE = 625
+LASER_FIELDS = 5
+SMOKE_FIELDS = 9
+ASTEROID_FIELDS = 5
+UFO_FIELDS = 7
+
+END = 1
+SHIP_ALIVE = 2
+IMMORTAL = 4
+
+REWIND_SECONDS = 5
+
+_RNG_OFFSET = HEADER.size + SHIP.size
+_RECORDS_OFFSET = _RNG_OFFSET + RNG_STATE_SIZE * 4
+
+_laser_record = operator.attrgetter('x', 'y', 'dx', 'dy', 'age')
+_asteroid_record = operator.attrgetter('level', 'x', 'y', 'dx', 'dy')
+_smoke_attributes = operator.attrgetter('x', 'y', 'dx', 'dy', 'rotation',
+                                        'age', 'color')
+
+
+def _smoke_record(sprite):
+    *record, color = _smoke_attributes(sprite)
+    return record + color
+
+
+def capture(game):
+    """
+    Create snapshot of the game
+
+    Args:
+        game (data.states.game.Game): game to be captured
+
+    Returns:
+        bytes: snapshot of the game
+
+    """
+    player = game.ship
+    alive = len(game.playerGroup) > 0
+    flags = (game.end * END) | (alive * SHIP_ALIVE)
+    flags |= player.immortal * IMMORTAL
+
+    lasers = player.ship_lasers.sprites()
+    smoke = player.smoke_generator.sprites()
+    rocks = game.asteroids.sprites()
+    saucers = game.ufos.sprites()
+    shots = game.ufos.shots.sprites()
+    records = array.array('d', list(itertools.chain(
+        itertools.chain.from_iterable(map(_laser_record, lasers)),
+        itertools.chain.from_iterable(map(_smoke_record, smoke)),
+        itertools.chain.from_iterable(map(_asteroid_record, rocks)),
+        itertools.chain.from_iterable(
+            _ufo_record(saucer, game.scheduler) for saucer in saucers),
+        itertools.chain.from_iterable(map(_laser_record, shots)))))
+
+    version, state, gauss_next = random.getstate()
+    header = HEADER.pack(
+            VERSION, flags,
+            game.score.score, game.health.healths,
+            game.asteroids.round_level, game.asteroids.asteroids_number,
+            _immortal_ticks(player, game.scheduler),
+            len(lasers), len(smoke), len(rocks), len(saucers), len(shots),
+            float('nan') if gauss_next is None else gauss_next)
+    return b''.join((
+        header,
+        SHIP.pack(player.x, player.y, player.dx, player.dy, player.rotation),
+        array.array('I', state).tobytes(),
+        records.tobytes()))
+
+
+def restore(game, snapshot):
+    """
+    Set the game to the state stored in snapshot
+
+    Sprites that already exist are reused, so rewinding does not need to
+    recreate images of all asteroids every tick.
+
+    Args:
+        game (data.states.game.Game): game to be restored
+        snapshot (bytes): snapshot created by `capture`
+
+    Raises:
+        ValueError: if snapshot was created with different layout version
+
+    """
+    (version, flags, score, healths, round_level, asteroids_number,
+     immortal_ticks, lasers, smoke, rocks, saucers, shots, gauss_next) = \
+        HEADER.unpack_from(snapshot)
+    if version != VERSION:
+        raise ValueError('unsupported snapshot version {}'.format(version))
+
+    records = array.array('d')
+    records.frombytes(snapshot[_RECORDS_OFFSET:])
+    index = 0
+
+    game.end = bool(flags & END)
+    if flags & SHIP_ALIVE and not game.playerGroup:
+        game.ship = ship.Ship(game.scheduler, game.world,
+                              game.playerGroup.wrap, game.ship.pilot)
+        game.playerGroup.add(game.ship)
+    elif not flags & SHIP_ALIVE:
+        game.playerGroup.empty()
+    player = game.ship
+    _restore_ship(player, snapshot, bool(flags & IMMORTAL))
+    _restore_immortal_timer(player, immortal_ticks, game.scheduler)
+
+    index = _restore_lasers(player.ship_lasers, records, index, lasers)
+    index = _restore_smoke(player.smoke_generator, records, index, smoke)
+    index = _restore_asteroids(game.asteroids, records, index, rocks)
+    index = _restore_ufos(game.ufos, records, index, saucers)
+    _restore_lasers(game.ufos.shots, records, index, shots)
+    game.asteroids.round_level = round_level
+    game.asteroids.asteroids_number = asteroids_number
+
+    if game.score.score != score:
+        game.score.score = score
+        game.score.update_text()
+    if game.health.healths != healths:
+        game.health.set_healths(healths)
+
+    state = array.array('I')
+    state.frombytes(snapshot[_RNG_OFFSET:_RECORDS_OFFSET])
+    random.setstate((3, tuple(state),
+                     None if gauss_next != gauss_next else gauss_next))
+
+
+def _ufo_record(saucer, scheduler):
+    return (saucer.small, saucer.x, saucer.y, saucer.dx, saucer.dy,
+            scheduler.remaining_ticks(saucer.fire_timer),
+            scheduler.remaining_ticks(saucer.stay_timer))
+
+
+def _immortal_ticks(player, scheduler):
+    """
+    Return number of ticks before ship's immortality ends
+
+    Returns:
+        int: -1 if the immortality timer is already done
+
+    """
+    timer = player.immortal_timer
+    if timer.done:
+        return -1
+    return scheduler.remaining_ticks(timer)
+
+
+def _restore_immortal_timer(player, ticks, scheduler):
+    player.immortal_timer.cancel()
+    if ticks >= 0:
+        player.immortal_timer = scheduler.call_in_ticks(
+                ticks,
+                player.disable_immortality)
+
+
+def _restore_ship(player, snapshot, immortal):
+    x, y, dx, dy, rotation = SHIP.unpack_from(snapshot, HEADER.size)
+    player.x, player.y, player.dx, player.dy = x, y, dx, dy
+    player.immortal = immortal
+    if player.rotation != rotation:
+        player.rotation = rotation
+        player.image_changed = True
+        player.update_image()
+    player.update_rect()
+
+
+def _restore_lasers(group, records, index, number):
+    old = group.sprites()
+    group.empty()
+    for i in range(number):
+        x, y, dx, dy, age = records[index:index + LASER_FIELDS]
+        index += LASER_FIELDS
+        if old:
+            sprite = old.pop()
+        else:
+            sprite = laser.Laser.spawn(ship.ShipPoint(x, y, 0, dx, dy),
+                                       group.COLOR)
+        sprite.x, sprite.y, sprite.dx, sprite.dy = x, y, dx, dy
+        sprite.age = age
+        sprite.update_rect()
+        group.add(sprite)
+    for sprite in old:
+        sprite.kill()
+    return index
+
+
+def _restore_smoke(group, records, index, number):
+    old = group.sprites()
+    group.empty()
+    for i in range(number):
+        x, y, dx, dy, rotation, age, *color = \
+            records[index:index + SMOKE_FIELDS]
+        index += SMOKE_FIELDS
+        if old:
+            sprite = old.pop()
+        else:
+            jet = ship.ShipPoint(x, y, 0, dx, dy)
+            sprite = ship.SmokeParticle.spawn(jet)
+        sprite.x, sprite.y, sprite.dx, sprite.dy = x, y, dx, dy
+        sprite.rotation = rotation
+        sprite.age = age
+        sprite.alpha = sprite.alpha_by_age
+        sprite.image_changed = True
+        sprite.update_color(color)
+        sprite.update_image()
+        group.add(sprite)
+    for sprite in old:
+        sprite.kill()
+    return index
+
+
+def _restore_asteroids(group, records, index, number):
+    old = collections.defaultdict(list)
+    for sprite in group.sprites():
+        old[sprite.level].append(sprite)
+    group.empty()
+    for i in range(number):
+        level, x, y, dx, dy = records[index:index + ASTEROID_FIELDS]
+        index += ASTEROID_FIELDS
+        level = int(level)
+        if old[level]:
+            sprite = old[level].pop()
+        else:
+            sprite = group.new_asteroid(level, (x, y))
+        sprite.x, sprite.y, sprite.dx, sprite.dy = x, y, dx, dy
+        sprite.update_rect()
+        group.add(sprite)
+    return index
+
+
+def _restore_ufos(group, records, index, number):
+    old = collections.defaultdict(list)
+    for sprite in group.sprites():
+        old[sprite.small].append(sprite)
+    group.empty()
+    for i in range(number):
+        small, x, y, dx, dy, fire_ticks, stay_ticks = \
+            records[index:index + UFO_FIELDS]
+        index += UFO_FIELDS
+        small = bool(small)
+        if old[small]:
+            sprite = old[small].pop()
+        else:
+            sprite = ufo.Ufo(small, (x, y), 0, group.scheduler, group.shots)
+        sprite.x, sprite.y, sprite.dx, sprite.dy = x, y, dx, dy
+        sprite.set_timers(int(fire_ticks), int(stay_ticks))
+        sprite.update_rect()
+        group.add(sprite)
+    for sprite in itertools.chain.from_iterable(old.values()):
+        sprite.kill()
+    return index
+
+
+class RewindBuffer:
+    """
+    Ring buffer of delta-compressed snapshots
+
+    Only the newest snapshot is stored as it is. Every older snapshot is
+    stored as XOR difference to its successor, so it can be decoded when
+    going backwards in time. Snapshots of equal length differ mostly in
+    a few bytes of each double, that makes the difference easy to compress.
+    If the length differs (for example asteroid was destroyed), whole
+    snapshot is stored instead.
+
+    Args:
+        seconds (float): how long history should be kept
+
+    Attributes:
+        capacity (int): maximum number of stored snapshots
+        latest (bytes): the newest snapshot or None if buffer is empty
+        deltas (collections.deque): compressed older snapshots
+
+    """
+    def __init__(self, seconds=REWIND_SECONDS):
+        self.capacity = max(1, int(seconds * 1000 / tools.TIME_PER_UPDATE))
+        self.latest = None
+        self.deltas = collections.deque(maxlen=self.capacity - 1)
+
+    def __len__(self):
+        if self.latest is None:
+            return 0
+        return len(self.deltas) + 1
+
+    def push(self, snapshot):
+        """
+        Store new snapshot, the oldest one is dropped if buffer is full
+
+        Args:
+            snapshot (bytes): snapshot created by `capture`
+
+        """
+        if self.latest is not None and self.capacity > 1:
+            self.deltas.append(_encode(self.latest, snapshot))
+        self.latest = snapshot
+
+    def pop(self):
+        """
+        Remove and return the newest snapshot
+
+        Returns:
+            bytes: the newest snapshot or None if buffer is empty
+
+        """
+        snapshot = self.latest
+        if self.deltas:
+            self.latest = _decode(self.deltas.pop(), snapshot)
+        else:
+            self.latest = None
+        return snapshot
+
+    def clear(self):
+        """
+        Drop all snapshots
+        """
+        self.latest = None
+        self.deltas.clear()
+
+
+def _xor(first, second):
+    """
+    Return byte-wise XOR of two byte strings of equal length
+    """
+    result = int.from_bytes(first, 'little') ^ int.from_bytes(second, 'little')
+    return result.to_bytes(len(first), 'little')
+
+
+def _encode(previous, current):
+    """
+    Return compressed `previous` snapshot relative to `current` one
+
+    Returns:
+        :obj:`tuple` of (bool, bytes): True and XOR difference if snapshots
+            have the same length, False and whole `previous` otherwise
+
+    """
+    if len(previous) == len(current):
+        return True, zlib.compress(_xor(previous, current), 1)
+    return False, zlib.compress(previous, 1)
+
+
+def _decode(entry, current):
+    """
+    Return snapshot encoded by `_encode`
+    """
+    is_delta, payload = entry
+    payload = zlib.decompress(payload)
+    return _xor(payload, current) if is_delta else payload
@@ -0,0 +1,435 @@
+"""
+Module implementing UFOs
+
+UFO emerges when the ship doesn't accelerate for `SPAWN_TIME` seconds. It
+flies across the screen, avoids asteroids and shoots at the ship. Big UFO
+shoots inaccurately, small one aims well. Both aim at the point where the
+ship will be when the shot reaches it.
+
+Decisions of UFOs (steering and aiming) are time-sliced. Every UFO decides
+at most once per `THINK_TICKS` ticks and all UFOs together examine at most
+`AI_BUDGET` asteroids per tick, the rest waits for the next tick. Only the
+first decision of a tick can exceed the budget, so every tick some UFO
+decides. Asteroids are found by spatial queries of
+`asteroids.AsteroidsGroup`, not by scanning all of them. Budget is counted
+in examined asteroids instead of wall time, so the simulation stays the
+same on fast and slow machines.
+
+Args:
+    MAX_UFOS (int): maximum number of UFOs at once
+    SPAWN_TIME (float): time (in seconds) without acceleration of the ship
+        before UFO emerges
+    STAY_TIME (float): time (in seconds) after which UFO leaves
+    THINK_TICKS (int): minimum number of ticks between decisions of one UFO
+    AI_BUDGET (int): number of asteroids that all UFOs can examine per tick
+    AVOID_RADIUS (float): distance (in pixels) in which UFO looks for
+        asteroids
+    LOOKAHEAD (float): how far (in seconds) UFO predicts collisions
+    CLEARANCE (float): gap (in pixels) kept between UFO and asteroids
+    SPAWN_CANDIDATES (int): number of tried spawn positions, UFO appears on
+        the one farthest from asteroids
+    LASER_COLOR (:obj:`tuple` of :obj:`int`): color of UFO lasers in RGB
+    COLOR (:obj:`tuple` of :obj:`int`): color of UFO image in RGB
+    LAYER (int): render layer of UFOs
+    COLLIDER (:obj:`tuple`): collider table of UFOs
+    LASER_COLLIDER (:obj:`tuple`): collider table of UFO lasers
+
+"""
+
+import collections
+import math
+import random
+import pygame as pg
+
+from . import components, ecs, laser, ship
+from .. import atlas, prepare, tools
+
+MAX_UFOS = 3
+SPAWN_TIME = 8
+STAY_TIME = 15
+THINK_TICKS = 6
+AI_BUDGET = 64
+AVOID_RADIUS = 150
+LOOKAHEAD = 1.0
+CLEARANCE = 10
+SPAWN_CANDIDATES = 4
+LASER_COLOR = (255, 80, 80)
+COLOR = (200, 255, 200)
+LAYER = 2
+COLLIDER = ecs.collider('ufos')
+LASER_COLLIDER = ecs.collider('ufo_lasers')
+
+
+class UfoLasers(laser.Lasers):
+    """
+    Lasers fired by all UFOs
+    """
+    COMPONENTS = (ecs.TRANSFORM, ecs.VELOCITY, ecs.LIFETIME,
+                  ecs.render(laser.LAYER), LASER_COLLIDER)
+    COLOR = LASER_COLOR
+
+    def __init__(self, world=None, wrap=False):
+        super().__init__(world, wrap)
+        self.max = MAX_UFOS * 2
+
+
+class UfoGroup(ecs.EntityGroup):
+    """
+    Group of UFOs, it spawns them and runs their decisions
+
+    Args:
+        scheduler (data.scheduler.Scheduler): scheduler of the game state
+        asteroids (asteroids.AsteroidsGroup): asteroids to be avoided
+        world (ecs.World): world that moves and draws UFOs
+        wrap (bool): if True, UFOs and their lasers wrap around the screen
+            edges
+
+    Attributes:
+        shots (UfoLasers): lasers of all UFOs
+        target (ship.Ship): ship that UFOs shoot at
+        queue (collections.deque): UFOs in order of their next decision, new
+            UFOs decide first
+        spawn_timer (data.scheduler.ScheduledCall): call checking whether
+            the ship is idle long enough to spawn UFO
+
+    """
+    COMPONENTS = (ecs.TRANSFORM, ecs.VELOCITY, ecs.render(LAYER), COLLIDER)
+
+    def __init__(self, scheduler, asteroids, world=None, wrap=False):
+        super().__init__(world, wrap)
+        self.scheduler = scheduler
+        self.asteroids = asteroids
+        self.shots = UfoLasers(world, wrap)
+        self.target = None
+        self.queue = collections.deque()
+        self.spawn_timer = None
+
+    def add_internal(self, sprite, *args):
+        super().add_internal(sprite, *args)
+        self.queue.appendleft(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.queue.remove(sprite)
+
+    def watch(self, target):
+        """
+        Set the ship to shoot at and start waiting for its idleness
+
+        Args:
+            target (ship.Ship): the new ship
+
+        """
+        self.target = target
+        if self.spawn_timer is not None:
+            self.spawn_timer.cancel()
+        self.spawn_timer = self.scheduler.call_in_ticks(
+                _ticks(SPAWN_TIME), self.spawn_if_idle)
+
+    def spawn_if_idle(self, *args):
+        """
+        Spawn UFO if the ship did not accelerate for `SPAWN_TIME` seconds
+
+        The call schedules itself again, to the moment when the ship can be
+        idle long enough.
+        """
+        wait = _ticks(SPAWN_TIME)
+        idle = self.scheduler.tick - self.target.last_thrust
+        if idle < wait:
+            wait -= idle
+        elif self.target.alive() and len(self) < MAX_UFOS:
+            self.spawn()
+        self.spawn_timer = self.scheduler.call_in_ticks(wait,
+                                                        self.spawn_if_idle)
+
+    def spawn(self, small=None):
+        """
+        Create UFO on the left or right edge away from asteroids
+
+        Args:
+            small (bool): kind of UFO, if None, small UFO is chosen with
+                probability growing with the round level
+
+        Returns:
+            Ufo: the new UFO
+
+        """
+        if small is None:
+            small = random.random() < self.asteroids.round_level / 10
+        area = prepare.SCREEN_RECT
+        best, clearance = None, -math.inf
+        for i in range(SPAWN_CANDIDATES):
+            side = random.randint(0, 1)
+            position = (area.left + 1 if side else area.right - 1,
+                        random.randint(area.top, area.bottom))
+            distance = self.asteroids.nearest(*position)[1]
+            if distance > clearance:
+                best, clearance = (position, side), distance
+        (x, y), side = best
+        course = random.randint(-30, 30) + (0 if side else 180)
+        saucer = Ufo(small, (x, y), course, self.scheduler, self.shots)
+        saucer.x += saucer.rect.width / 2 if side else -saucer.rect.width / 2
+        saucer.update_rect()
+        self.add(saucer)
+        return saucer
+
+    def think(self):
+        """
+        Let UFOs decide within `AI_BUDGET`
+
+        UFOs are served in round-robin order. Every UFO decides at most once
+        per tick and only if `THINK_TICKS` passed since its last decision.
+        At least one decision is made each tick, if some UFO is due.
+
+        Returns:
+            int: number of examined asteroids
+
+        """
+        target = self.target
+        if target is not None and not target.alive():
+            target = None
+        tick = self.scheduler.tick
+        queue = self.queue
+        spent = 0
+        for i in range(len(queue)):
+            saucer = queue[0]
+            if tick - saucer.thought < THINK_TICKS:
+                break
+            cost = self.asteroids.candidates(saucer.x, AVOID_RADIUS)
+            if spent and spent + cost > AI_BUDGET:
+                break
+            queue.rotate(-1)
+            saucer.think(self.asteroids, target, tick)
+            spent += cost
+        return spent
+
+    def clear(self):
+        """
+        Remove all UFOs and their lasers and stop spawning
+        """
+        if self.spawn_timer is not None:
+            self.spawn_timer.cancel()
+        for group in (self, self.shots):
+            for sprite in group.sprites():
+                sprite.kill()
+
+
+class Ufo(components._MovingSprite):
+    """
+    Flying saucer
+
+    Args:
+        small (bool): if True, UFO is small (see `prepare.SMALL_UFO`),
+            otherwise it is big (see `prepare.BIG_UFO`)
+        position (:obj:`tuple` of :obj:`int`): initial position
+        course (float): angle of initial velocity in degrees
+        scheduler (data.scheduler.Scheduler): scheduler of shooting and
+            leaving
+        shots (UfoLasers): gun of the UFO
+
+    Attributes:
+        small (bool): kind of the UFO
+        config (dict): settings of the kind of the UFO
+        score (int): score for destroying the UFO
+        aim (float): angle in which UFO shoots, None without target
+        thought (int): tick of the last decision
+        fire_timer (data.scheduler.ScheduledCall): call of the next shot
+        stay_timer (data.scheduler.ScheduledCall): call of `kill` when UFO
+            leaves
+
+    """
+    def __init__(self, small, position, course, scheduler, shots):
+        self.small = small
+        self.config = prepare.SMALL_UFO if small else prepare.BIG_UFO
+        region = self.region()
+        image = ufo_image(small) if region is None else region.surface
+        super().__init__(image, position)
+        self.score = self.config['score']
+        self.scheduler = scheduler
+        self.shots = shots
+        self.aim = None
+        self.thought = -THINK_TICKS
+        self.accelerate(course, self.config['speed'])
+        self.fire_timer = None
+        self.stay_timer = None
+        self.set_timers(_ticks(1 / self.config['shots_per_second']),
+                        _ticks(STAY_TIME))
+
+    def region(self):
+        return atlas.lookup(('ufo', self.small))
+
+    def set_timers(self, fire_ticks, stay_ticks):
+        """
+        Schedule the next shot and leaving, previous calls are cancelled
+
+        Args:
+            fire_ticks (int): ticks before the next shot
+            stay_ticks (int): ticks before UFO leaves
+
+        """
+        for timer in (self.fire_timer, self.stay_timer):
+            if timer is not None:
+                timer.cancel()
+        self.fire_timer = self.scheduler.call_in_ticks(fire_ticks,
+                                                       self.reload)
+        self.stay_timer = self.scheduler.call_in_ticks(stay_ticks,
+                                                       self.leave)
+
+    def reload(self, *args):
+        """
+        Fire and schedule the next shot
+        """
+        self.fire()
+        self.fire_timer = self.scheduler.call_in_ticks(
+                _ticks(1 / self.config['shots_per_second']), self.reload)
+
+    def think(self, asteroids, target, tick):
+        """
+        Steer away from asteroids on collision course and aim at target
+
+        Args:
+            asteroids (asteroids.AsteroidsGroup): asteroids to be avoided
+            target (ship.Ship): ship to aim at, can be None
+            tick (int): current tick
+
+        """
+        self.thought = tick
+        self.steer(asteroids.within(self.x, self.y, AVOID_RADIUS))
+        self.aim = None if target is None else intercept(
+                self, target, prepare.LASER['speed'])
+
+    def steer(self, threats):
+        """
+        Turn velocity away from asteroids that would get too close
+
+        Closest approach of every asteroid in `LOOKAHEAD` seconds is
+        predicted from relative velocity. UFO is pushed away from the point
+        of closest approach, the closer it would be, the stronger. Speed of
+        UFO does not change.
+        """
+        speed = self.config['speed']
+        # screen coordinates, positive `dy` moves up
+        velocity_x, velocity_y = self.dx, -self.dy
+        push_x = push_y = 0.0
+        for asteroid in threats:
+            offset_x, offset_y = asteroid.x - self.x, asteroid.y - self.y
+            relative_x = asteroid.dx - self.dx
+            relative_y = self.dy - asteroid.dy
+            closing = relative_x * relative_x + relative_y * relative_y
+            time = 0.0
+            if closing:
+                time = -(offset_x * relative_x +
+                         offset_y * relative_y) / closing
+                time = min(LOOKAHEAD, max(0.0, time))
+            miss_x = offset_x + relative_x * time
+            miss_y = offset_y + relative_y * time
+            miss = math.hypot(miss_x, miss_y)
+            reach = self.radius + asteroid.radius + CLEARANCE
+            if miss < reach:
+                weight = speed * (reach - miss) / reach / max(miss, 1)
+                push_x -= miss_x * weight
+                push_y -= miss_y * weight
+        if push_x or push_y:
+            velocity_x += push_x
+            velocity_y += push_y
+            length = math.hypot(velocity_x, velocity_y) or 1
+            self.dx = speed * velocity_x / length
+            self.dy = -speed * velocity_y / length
+
+    def fire(self):
+        """
+        Shoot in direction of `aim` with random spread of the kind of UFO
+        """
+        if self.aim is None:
+            return
+        spread = self.config['spread']
+        direction = self.aim + random.uniform(-spread, spread)
+        self.shots.fire(ship.ShipPoint(self.x, self.y, direction, 0, 0))
+
+    def leave(self, *args):
+        """
+        Leave the game, UFO just disappears
+        """
+        self.kill()
+
+    def kill(self):
+        """
+        Remove UFO and cancel its shooting
+        """
+        self.fire_timer.cancel()
+        self.stay_timer.cancel()
+        super().kill()
+
+
+def intercept(shooter, target, speed):
+    """
+    Return direction of shot that hits moving target
+
+    Shot flies straight at `speed` from position of the shooter. Time of hit
+    is the smallest positive root of |offset + velocity * t| = speed * t.
+    If the shot can not reach the target, it aims at the current position.
+
+    Args:
+        shooter (components._MovingSprite): the shooter
+        target (components._MovingSprite): target moving at constant
+            velocity
+        speed (float): speed of the shot in pixels per second
+
+    Returns:
+        float: direction in degrees, 0 is right and 90 is up
+
+    """
+    # coordinates with y axis pointing up, like velocities
+    offset_x = target.x - shooter.x
+    offset_y = shooter.y - target.y
+    a = target.dx * target.dx + target.dy * target.dy - speed * speed
+    b = 2 * (offset_x * target.dx + offset_y * target.dy)
+    c = offset_x * offset_x + offset_y * offset_y
+    time = 0.0
+    if abs(a) < 1e-9:
+        if b < 0:
+            time = -c / b
+    else:
+        discriminant = b * b - 4 * a * c
+        if discriminant >= 0:
+            root = math.sqrt(discriminant)
+            times = [t for t in ((-b - root) / (2 * a),
+                                 (-b + root) / (2 * a)) if t > 0]
+            time = min(times, default=0.0)
+    return math.degrees(math.atan2(offset_y + target.dy * time,
+                                   offset_x + target.dx * time))
+
+
+def _ticks(seconds):
+    """
+    Return number of ticks in `seconds`, at least one
+    """
+    return max(1, round(seconds * tools.TICK_RATE))
+
+
+def ufo_image(small):
+    """
+    Return image of UFO of given kind, drawn as a saucer with a dome
+    """
+    config = prepare.SMALL_UFO if small else prepare.BIG_UFO
+    width, height = config['size']
+    image = pg.Surface((width, height), pg.SRCALPHA)
+    body = pg.Rect(0, height // 3, width, height - height // 3)
+    dome = pg.Rect(width // 4, 0, width // 2, height * 2 // 3)
+    pg.draw.ellipse(image, COLOR, dome, 1)
+    pg.draw.ellipse(image, COLOR, body, 1)
+    pg.draw.line(image, COLOR, (0, body.centery),
+                 (width - 1, body.centery))
+    return image
+
+
+def atlas_images():
+    """
+    Return images of both kinds of UFO and of their laser to be baked into
+    atlas
+    """
+    shot = prepare.LASER['img'].copy()
+    shot.fill(LASER_COLOR)
+    return {('ufo', False): ufo_image(False),
+            ('ufo', True): ufo_image(True),
+            ('laser', LASER_COLOR): shot}
@@ -0,0 +1,334 @@
+"""
+Persistent store of high scores
+
+Scores are kept in a file of fixed-size records that is memory-mapped, so
+a record is written in place without rewriting the file. Every new record
+is first appended to a journal and the journal is synced to disk. Records
+in the journal are written into the mapped file again when the store is
+opened, so a power cut never loses a written score and a half-written
+record is never used. Journal is emptied after the mapped file is flushed
+(see `CHECKPOINT`). A torn entry at the end of the journal fails its CRC and
+is ignored.
+
+All scores are ordered in memory by `index`, so rank of a score is found by
+binary search and the top of the board without reading the file. Records
+are written by a background thread, so submitting a score at the end of a
+game never waits for the disk in the frame.
+
+Layout of the data file is `HEADER` followed by `capacity` slots of
+`RECORD`. Entry of the journal is `RECORD` followed by CRC32 of the record.
+
+Attributes:
+    MAGIC (bytes): first bytes of the data file
+    VERSION (int): version of the file layout
+    HEADER (struct.Struct): magic, version, record size, number of records
+        and capacity
+    RECORD (struct.Struct): sequence number, name, score, round and time of
+        one score
+    CRC (struct.Struct): checksum of journal entry
+    NAME_SIZE (int): maximum length of encoded name in bytes
+    INITIAL_CAPACITY (int): number of slots of a new file, the file doubles
+        when it is full
+    CHECKPOINT (int): number of journal entries after which the mapped file
+        is flushed and the journal emptied
+    TOP (int): default length of the board returned by `HighScores.top`
+    store (HighScores): store of the current run, None if it is not opened
+
+"""
+
+import bisect
+import collections
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+MAGIC = b'ASHS'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+RECORD = struct.Struct('<I16sqId')
+CRC = struct.Struct('<I')
+NAME_SIZE = 16
+INITIAL_CAPACITY = 256
+CHECKPOINT = 32
+TOP = 10
+
+store = None
+
+
+class Entry(collections.namedtuple('Entry',
+                                   ['name', 'score', 'round', 'time'])):
+    """
+    One score on the board
+
+    Args:
+        name (str): name of the player
+        score (int): the score
+        round (int): round reached in the game
+        time (float): time of the game end in seconds since the epoch
+
+    """
+    __slots__ = ()
+
+
+class HighScores:
+    """
+    High scores in memory-mapped file with journal
+
+    Args:
+        path (str): path to the data file, the journal has the same path
+            with '.journal' suffix. Missing files are created
+
+    Attributes:
+        index (list): tuples (negative score, sequence number) of all
+            records in ascending order, that is from the best score
+        journaled (int): number of entries in the journal
+        pending (dict): submitted entries not yet written to the mapped
+            file keyed by sequence number
+        errors (int): number of records the writer failed to store
+
+    Raises:
+        ValueError: if the data file has unknown format
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + '.journal'
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.map = None
+        self.journal = None
+        self.file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644),
+                              'r+b')
+        if os.fstat(self.file.fileno()).st_size < HEADER.size:
+            self._resize(INITIAL_CAPACITY)
+            self._write_header(0, INITIAL_CAPACITY)
+        else:
+            self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, version, size, self.count, self.capacity = \
+            HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            self.close()
+            raise ValueError('{} is not a high score file'.format(path))
+
+        self.journal = open(self.journal_path, 'a+b')
+        self.journaled = self._recover()
+
+        self.index = sorted((-self._read(seq)[2], seq)
+                            for seq in range(self.count))
+        self.pending = {}
+        self.errors = 0
+        self._next = self.count
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='highscores',
+                                        daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return self._next
+
+    def _resize(self, capacity):
+        """
+        Change number of slots of the data file and map it again
+        """
+        if self.map is not None:
+            self.map.flush()
+            self.map.close()
+        self.file.truncate(HEADER.size + capacity * RECORD.size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.capacity = capacity
+
+    def _write_header(self, count, capacity):
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, RECORD.size, count,
+                         capacity)
+
+    def _read(self, seq):
+        return RECORD.unpack_from(self.map, HEADER.size + seq * RECORD.size)
+
+    def _apply(self, record):
+        """
+        Write packed record into its slot of the mapped file
+        """
+        seq = RECORD.unpack_from(record)[0]
+        if seq >= self.capacity:
+            self._resize(max(self.capacity * 2, seq + 1))
+        offset = HEADER.size + seq * RECORD.size
+        self.map[offset:offset + RECORD.size] = record
+        self.count = max(self.count, seq + 1)
+        self._write_header(self.count, self.capacity)
+
+    def _recover(self):
+        """
+        Apply records of the journal to the mapped file
+
+        Returns:
+            int: number of applied entries
+
+        """
+        self.journal.seek(0)
+        data = self.journal.read()
+        entry = RECORD.size + CRC.size
+        applied = 0
+        for offset in range(0, len(data) - entry + 1, entry):
+            record = data[offset:offset + RECORD.size]
+            crc, = CRC.unpack_from(data, offset + RECORD.size)
+            if zlib.crc32(record) != crc:
+                break
+            self._apply(record)
+            applied += 1
+        if applied * entry != len(data):
+            self.checkpoint()
+            return 0
+        return applied
+
+    def checkpoint(self):
+        """
+        Flush the mapped file to disk and empty the journal
+        """
+        self.map.flush()
+        self.journal.truncate(0)
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.journaled = 0
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                self._write(record)
+            except OSError:
+                self.errors += 1
+            finally:
+                self._queue.task_done()
+
+    def _write(self, record):
+        """
+        Journal packed record, write it into the mapped file and checkpoint
+        if it is time
+        """
+        self.journal.write(record + CRC.pack(zlib.crc32(record)))
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.journaled += 1
+        with self._lock:
+            self._apply(record)
+            del self.pending[RECORD.unpack_from(record)[0]]
+        if self.journaled >= CHECKPOINT:
+            self.checkpoint()
+
+    def sync(self):
+        """
+        Wait until all submitted scores are durable
+        """
+        self._queue.join()
+
+    def submit(self, name, score, round_level, when=None):
+        """
+        Store new score
+
+        The rank is found in memory and the record is queued for the
+        writer thread, the score is durable after `sync` or `close`.
+
+        Args:
+            name (str): name of the player, it is cut to `NAME_SIZE` bytes
+            score (int): the score
+            round_level (int): round reached in the game
+            when (float): time of the game end, now by default
+
+        Returns:
+            int: rank of the score, 1 is the best
+
+        """
+        seq = self._next
+        self._next += 1
+        if when is None:
+            when = time.time()
+        name = name.encode('utf-8')[:NAME_SIZE]
+        record = RECORD.pack(seq, name, score, round_level, when)
+        with self._lock:
+            self.pending[seq] = self._entry(name, score, round_level, when)
+        self._queue.put(record)
+
+        key = (-score, seq)
+        bisect.insort(self.index, key)
+        return bisect.bisect_left(self.index, key) + 1
+
+    def rank(self, score):
+        """
+        Return rank that `score` would get now
+
+        Equal scores submitted earlier rank higher.
+        """
+        return bisect.bisect_right(self.index, (-score, self._next)) + 1
+
+    @staticmethod
+    def _entry(name, score, round_level, when):
+        name = name.rstrip(b'\0').decode('utf-8', 'ignore')
+        return Entry(name, score, round_level, when)
+
+    def entry(self, seq):
+        """
+        Return record with sequence number `seq` as `Entry`
+        """
+        with self._lock:
+            if seq in self.pending:
+                return self.pending[seq]
+            return self._entry(*self._read(seq)[1:])
+
+    def top(self, number=TOP):
+        """
+        Return `number` best scores as list of `Entry`
+        """
+        return [self.entry(seq) for score, seq in self.index[:number]]
+
+    def close(self):
+        """
+        Write queued scores, flush everything to disk and close files
+        """
+        thread = getattr(self, '_thread', None)
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+            self._thread = None
+        if self.journal is not None:
+            self.checkpoint()
+            self.journal.close()
+            self.journal = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+
+def open_store(path):
+    """
+    Open store at `path` as `store`
+
+    Returns:
+        HighScores: the store, None if it can not be opened
+
+    """
+    global store
+    try:
+        store = HighScores(path)
+    except (OSError, ValueError):
+        store = None
+    return store
+
+
+def close_store():
+    """
+    Close `store` if it is opened
+    """
+    global store
+    if store is not None:
+        store.close()
+        store = None
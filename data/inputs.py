@@ -0,0 +1,165 @@
+"""
+Keyboard state sampled once per frame and keyed dispatching of events
+
+Keyboard state can change only when events are pumped, so it is sampled once
+per frame by `Control` and every update of the frame reads the same snapshot.
+
+The ship is steered by a pilot, an object with method `command(ship)` that
+returns `Command` for each update. `Keyboard` pilot reads `current`, other
+pilots (see `components.autopilot`) play without keyboard.
+
+Attributes:
+    ALLOWED_EVENTS (:obj:`list` of :obj:`int`): event types that SDL puts into
+        the queue, all other events are dropped before they reach python
+    EXPOSE_EVENTS (:obj:`tuple` of :obj:`int`): events of uncovered or
+        restored window, the active state has to be drawn again
+    ANY_KEY (None): key used in `Dispatcher.bind` to match all keys
+    current (KeySnapshot): keyboard state of the current frame
+    IDLE (Command): command that does nothing
+
+"""
+
+import collections
+
+import pygame as pg
+
+EXPOSE_EVENTS = (pg.WINDOWEXPOSED, pg.VIDEOEXPOSE)
+ALLOWED_EVENTS = [pg.QUIT, pg.KEYDOWN, *EXPOSE_EVENTS]
+ANY_KEY = None
+
+
+class _Released:
+    """
+    Keyboard state before the first sample, no key is pressed
+    """
+    def __getitem__(self, key):
+        return False
+
+
+class KeySnapshot(collections.namedtuple('KeySnapshot', ['frame', 'keys'])):
+    """
+    Immutable keyboard state
+
+    Args:
+        frame (int): number of the frame when keyboard was sampled
+        keys (:obj:`tuple` of :obj:`bool`): result of `pg.key.get_pressed`
+
+    """
+    __slots__ = ()
+
+    def pressed(self, *keys):
+        """
+        Return True if any of given keys is pressed
+        """
+        return any(self.keys[key] for key in keys)
+
+
+current = KeySnapshot(0, _Released())
+
+
+class Command(collections.namedtuple('Command', ['turn', 'thrust', 'fire'])):
+    """
+    Controls of the ship during one update
+
+    Args:
+        turn (int): side of rotation, `LEFT` or `RIGHT` of the ship, 0 to
+            keep the direction
+        thrust (bool): if True, the ship accelerates
+        fire (bool): if True, the ship fires
+
+    """
+    __slots__ = ()
+
+
+IDLE = Command(0, False, False)
+
+
+class Keyboard:
+    """
+    Pilot that steers the ship by keyboard state of the current frame
+
+    Arrows or WASD rotate and accelerate the ship. Keyboard fires by key
+    presses, not by the state, so commands of this pilot never fire.
+    """
+    def command(self, ship):
+        """
+        Return command of keys pressed in `current` frame
+        """
+        keys = current.keys
+        turn = 0
+        if ((keys[pg.K_LEFT] and not keys[pg.K_RIGHT]) or
+                (keys[pg.K_a] and not keys[pg.K_d])):
+            turn = ship.LEFT
+        elif ((keys[pg.K_RIGHT] and not keys[pg.K_LEFT]) or
+                (keys[pg.K_d] and not keys[pg.K_a])):
+            turn = ship.RIGHT
+        return Command(turn, bool(keys[pg.K_UP] or keys[pg.K_w]), False)
+
+
+def allow_events():
+    """
+    Let SDL queue only `ALLOWED_EVENTS`
+    """
+    pg.event.set_blocked(None)
+    pg.event.set_allowed(ALLOWED_EVENTS)
+
+
+def sample():
+    """
+    Sample keyboard state into `current`
+
+    Returns:
+        KeySnapshot: new keyboard state
+
+    """
+    global current
+    current = KeySnapshot(current.frame + 1, pg.key.get_pressed())
+    return current
+
+
+class Dispatcher:
+    """
+    Table of event handlers keyed by event type and key
+
+    Handler bound to specific key takes precedence over handler bound to
+    `ANY_KEY`. Every event is dispatched to at most one handler.
+
+    Attributes:
+        handlers (:obj:`dict`): handlers (function of one argument, the event)
+            keyed by tuple (event type, key)
+
+    """
+    def __init__(self):
+        self.handlers = {}
+
+    def bind(self, event_type, handler, key=ANY_KEY):
+        """
+        Register handler
+
+        Args:
+            event_type (int): pygame event type
+            handler (function): function that takes the event
+            key (int): pygame key constant, `ANY_KEY` match all keys and
+                events without key
+
+        """
+        self.handlers[event_type, key] = handler
+
+    def dispatch(self, event):
+        """
+        Call handler bound to the event
+
+        Args:
+            event (pygame.event.Event): event in pygame format
+
+        Returns:
+            bool: True if any handler was called
+
+        """
+        handler = self.handlers.get((event.type, getattr(event, 'key', None)))
+        if handler is None:
+            handler = self.handlers.get((event.type, ANY_KEY))
+            if handler is None:
+                return False
+        handler(event)
+        return True
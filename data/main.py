@@ -5,7 +5,11 @@ Here is specified list of all posible states of program. These states preloads
 during 'loading screen'.
 """
 
-from data import prepare, tools
+import pygame as pg
+
+from data import (allocations, atlas, highscores, prepare, quality, soak,
+                  surfaces, telemetry, tools, tracing)
+from data.components import asteroids, laser, ship, ufo
 from data.states import title, select, controls, game, quit
 
 
@@ -13,16 +17,40 @@ def main():
     """
     Set initial state to control.
 
-    Initialize display and set all game states, then run the core.
+    Initialize display and set all game states, then run the core. Soak
+    run starts directly in the game.
     """
     prepare.init_display()
+    atlas.current = atlas.build(asteroids.atlas_images, laser.atlas_images,
+                                ship.atlas_images, ufo.atlas_images,
+                                opaque=(ship.opaque_atlas_images,))
 
     app = tools.Control(prepare.CAPTION)
+    if prepare.ADAPTIVE_QUALITY:
+        app.governor = quality.Governor(1000 / app.fps)
     state_dict = {'TITLE': title.Title(),
                   'SELECT': select.Select(),
                   'CONTROLS': controls.Controls(),
-                  'GAME': game.Game(),
+                  'GAME': game.Game(prepare.AUTOPILOT),
                   'QUIT': quit.Quit()}
 
-    app.state_machine.setup_states(state_dict, 'TITLE')
+    start = 'TITLE'
+    if prepare.SOAK_ROUNDS:
+        start = 'GAME'
+        app.soak = soak.Soak(state_dict['GAME'], prepare.SOAK_ROUNDS,
+                             prepare.SOAK_INTERVAL)
+    app.state_machine.setup_states(state_dict, start, pg.time.get_ticks())
+    highscores.open_store(prepare.HIGHSCORE_PATH)
+    if prepare.TELEMETRY_PATH:
+        telemetry.enable(prepare.TELEMETRY_PATH)
     app.main()
+    telemetry.disable()
+    highscores.close_store()
+    if surfaces.audit is not None:
+        print(surfaces.audit.report())
+    if surfaces.accountant is not None:
+        print(surfaces.accountant.report())
+    if allocations.tracker is not None:
+        print(allocations.tracker.report())
+    if tracing.tracer is not None:
+        tracing.tracer.export(prepare.TRACE_PATH)
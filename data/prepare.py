@@ -8,18 +8,71 @@ Attributes:
     CAPTION (str): caption of the window
     BACKGROUND_COLOR (:obj:`tuple` of :obj:`int`): default background color
     SCREEN_RECT (pygame.Rect): screen rectangle object
-    SLOW_FACTOR (int): ship slows its speed by `SLOW_FACTOR` percent each frame
+    RENDER_SCALE (float): size of the display relative to `SCREEN_SIZE`.
+        Everything is drawn at this scale and the display is scaled to the
+        window by SDL, positions stay in units of `SCREEN_SIZE`. It is set by
+        `ASTEROIDS_RENDER_SCALE` environment variable, for example '1/2' or
+        '2/3'
+    RENDER_SIZE (:obj:`tuple` of :obj:`int`): size of the display
+    VSYNC (bool): if True, vsync of the display is requested. It is set by
+        `ASTEROIDS_VSYNC` environment variable
+    VECTOR_ASTEROIDS (bool): if True, asteroids are drawn as outlines of
+        polygons instead of images (needs NumPy). It is set by
+        `ASTEROIDS_VECTOR` environment variable
+    SLOW_FACTOR (int): ship slows its speed by `SLOW_FACTOR` percent each
+        second
+    WRAP_AROUND (bool): if True, space wraps around the screen edges like in
+        the original game, otherwise objects bounce off the edges
+    SURFACE_BUDGET (int): budget of pixel memory of surfaces in bytes, when
+        it is exceeded, caches of surfaces are evicted. It is set in MiB by
+        `ASTEROIDS_SURFACE_BUDGET` environment variable, None for no budget
+    SURFACE_ACCOUNTING (bool): if True, pixel memory of surfaces is tracked
+        by owner and purpose and printed at exit, see `surfaces`. It is
+        enabled by `ASTEROIDS_SURFACE_ACCOUNTING` environment variable or by
+        `SURFACE_BUDGET`
+    BLIT_AUDIT (bool): if True, blits are counted by pixel format of their
+        source and the counts are printed at exit. It is enabled by
+        `ASTEROIDS_BLIT_AUDIT` environment variable
+    TRACE_ALLOCATIONS (int): if not 0, python allocations of each frame are
+        traced and this number of top source lines and classes is printed at
+        exit. It is set by `ASTEROIDS_TRACE_ALLOCATIONS` environment variable
+    TRACE_PATH (str): if set, spans of frame phases are recorded and written
+        to this file as Chrome trace events at exit. It is set by
+        `ASTEROIDS_TRACE` environment variable
+    ADAPTIVE_QUALITY (bool): if True, quality of visual effects is lowered
+        when frames take too long, see `quality.Governor`. It is disabled by
+        `ASTEROIDS_FIXED_QUALITY` environment variable
+    HIGHSCORE_PATH (str): path to the file of high scores, it is set by
+        `ASTEROIDS_HIGHSCORES` environment variable
+    PLAYER_NAME (str): name stored with scores, it is set by
+        `ASTEROIDS_PLAYER` environment variable
+    TELEMETRY_PATH (str): if set, metrics of games are written to this file
+        as JSON Lines, see `telemetry`. It is set by `ASTEROIDS_TELEMETRY`
+        environment variable
+    AUTOPILOT (bool): if True, the ship is steered by
+        `components.autopilot`. It is set by `ASTEROIDS_AUTOPILOT`
+        environment variable
+    SOAK_ROUNDS (int): if not 0, the program runs the game played by
+        autopilot until this number of rounds is reached and reports
+        metrics of the run, see `soak`. It is set by `ASTEROIDS_SOAK`
+        environment variable
+    SOAK_INTERVAL (float): delay in seconds between reports of soak run, it
+        is set by `ASTEROIDS_SOAK_INTERVAL` environment variable
+    HEADLESS (bool): if True, the program runs without window and sound
+        devices, it is set by `ASTEROIDS_HEADLESS` environment variable
     FONT_PATHS (:obj:`list` of :obj:`str`): filepaths to fonts
     MUSIC_PATHS (:obj:`list` of :obj:`str`): filepaths to music
-    SFX (:obj:`list` of :obj:`str`): filepaths to sfx
+    SFX (:obj:`dict` of :obj:`pygame.mixer.Sound`): decoded sound effects,
+        empty if the mixer is not available
     GTX (:obj:`list` of :obj:`pygame.Surface`): loaded imagex
 
 """
 
 import pygame as pg
+import fractions
 import os
 
-from data import tools
+from data import allocations, audio, surfaces, tools, tracing
 
 FPS = 60
 SCREEN_SIZE = (1600, 836)
@@ -27,20 +80,48 @@ CENTER = [x // 2 for x in SCREEN_SIZE]
 CAPTION = 'Asteroids'
 BACKGROUND_COLOR = (0, 0, 30)
 SCREEN_RECT = pg.Rect((0, 0), SCREEN_SIZE)
-SLOW_FACTOR = 1
+RENDER_SCALE = float(fractions.Fraction(
+        os.environ.get('ASTEROIDS_RENDER_SCALE', '1')))
+RENDER_SIZE = tuple(round(size * RENDER_SCALE) for size in SCREEN_SIZE)
+VSYNC = bool(os.environ.get('ASTEROIDS_VSYNC'))
+VECTOR_ASTEROIDS = bool(os.environ.get('ASTEROIDS_VECTOR'))
+SLOW_FACTOR = 45
+WRAP_AROUND = False
+SURFACE_BUDGET = None
+if os.environ.get('ASTEROIDS_SURFACE_BUDGET'):
+    SURFACE_BUDGET = int(float(os.environ['ASTEROIDS_SURFACE_BUDGET']) *
+                         (1 << 20))
+SURFACE_ACCOUNTING = (bool(os.environ.get('ASTEROIDS_SURFACE_ACCOUNTING')) or
+                      SURFACE_BUDGET is not None)
+BLIT_AUDIT = bool(os.environ.get('ASTEROIDS_BLIT_AUDIT'))
+TRACE_ALLOCATIONS = int(os.environ.get('ASTEROIDS_TRACE_ALLOCATIONS', 0))
+TRACE_PATH = os.environ.get('ASTEROIDS_TRACE')
+ADAPTIVE_QUALITY = not os.environ.get('ASTEROIDS_FIXED_QUALITY')
+HIGHSCORE_PATH = os.environ.get(
+        'ASTEROIDS_HIGHSCORES',
+        os.path.join(os.path.expanduser('~'), '.asteroids', 'scores'))
+PLAYER_NAME = os.environ.get('ASTEROIDS_PLAYER', 'PLAYER')
+TELEMETRY_PATH = os.environ.get('ASTEROIDS_TELEMETRY')
+SOAK_ROUNDS = int(os.environ.get('ASTEROIDS_SOAK', 0))
+SOAK_INTERVAL = float(os.environ.get('ASTEROIDS_SOAK_INTERVAL', 60))
+AUTOPILOT = bool(os.environ.get('ASTEROIDS_AUTOPILOT')) or bool(SOAK_ROUNDS)
+HEADLESS = bool(os.environ.get('ASTEROIDS_HEADLESS'))
 
 FONT_PATHS = None
 MUSIC_PATHS = None
 SFX = None
 GTX = None
 
+# Speeds are in pixels per second, accelerations in pixels per second squared
+# and lifetimes in seconds.
+
 SHIP = {  #: initial settings of ship
         'lives': 4,
         'score': 0,
         'initial_angle': 90,
         'xy': SCREEN_RECT.center,
-        'max_speed': 10,
-        'acceleration': 0.25,
+        'max_speed': 600,
+        'acceleration': 900,
         'rotate_speed': 270,
         'slow_factor': SLOW_FACTOR / 100
 }
@@ -49,34 +130,65 @@ SMOKE = {  #: initial settings of ship's smoke particles
         'size': (5, 5),
         'color': [255, 0, 0],
         'end_color': [255, 120, 0],
-        'frames': 15,
-        'speed': 4,
+        'lifetime': 0.25,
+        'speed': 240,
+        'rate': 1200,
 }
-SMOKE['rgb_change_per_frame'] = [(x - y) / SMOKE['frames'] for x, y
-                                 in zip(SMOKE['color'], SMOKE['end_color'])]
+SMOKE['rgb_change_per_second'] = [(x - y) / SMOKE['lifetime'] for x, y
+                                  in zip(SMOKE['color'], SMOKE['end_color'])]
 
 ASTEROIDS = {  #: initial settings of asteroids
         'level': 3,
 }
 
 LASER = {  #: initial settings of lasers
-        'speed': 30,
-        'frames': 50,
+        'speed': 1800,
+        'lifetime': 0.83,
         'max': 4,
         'img': pg.Surface((7, 7))
 }
 
 BIG_UFO = {  #: initial settings of big ufo
-        'speed': 10,
+        'speed': 600,
         'shots_per_second': 3,
+        'size': (48, 24),
+        'score': 200,
+        'spread': 25,
 }
 
 SMALL_UFO = {  #: initial settings of small ufo
-        'speed': 8,
-        'shots_per_second': 2
+        'speed': 480,
+        'shots_per_second': 2,
+        'size': (28, 14),
+        'score': 1000,
+        'spread': 3,
 }
 
 
+def _set_mode():
+    """
+    Set display of `RENDER_SIZE` and `surfaces.scale`
+
+    Scaled display and vsync need `pygame.SCALED`, SDL then scales the
+    display to the window on GPU. If vsync is not available, the display is
+    set without it.
+
+    Returns:
+        pygame.Surface: the display surface
+
+    """
+    flags = pg.DOUBLEBUF
+    if RENDER_SCALE != 1 or VSYNC:
+        flags |= pg.SCALED
+    surfaces.set_scale(RENDER_SCALE)
+    if VSYNC:
+        try:
+            return pg.display.set_mode(RENDER_SIZE, flags, vsync=1)
+        except pg.error:
+            pass
+    return pg.display.set_mode(RENDER_SIZE, flags)
+
+
 def init_display():
     """
     Function that initialize pygame
@@ -89,17 +201,32 @@ def init_display():
     global SFX
     global GTX
 
+    if HEADLESS:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
     pg.init()
 
     icon_path = os.path.join('resources', 'graphics', 'icon.png')
     pg.display.set_icon(pg.image.load(icon_path))
-    _screen = pg.display.set_mode(SCREEN_SIZE, pg.DOUBLEBUF)
+    _screen = _set_mode()
+    if SURFACE_ACCOUNTING:
+        surfaces.enable_accounting(SURFACE_BUDGET)
+    if BLIT_AUDIT:
+        surfaces.enable_audit()
+    if TRACE_ALLOCATIONS:
+        allocations.enable(TRACE_ALLOCATIONS)
+    if TRACE_PATH:
+        tracing.enable()
 
     # Resources
     FONT_PATHS = tools.load_all_fonts(os.path.join('resources', 'fonts'))
     MUSIC_PATHS = tools.load_all_music(os.path.join('resources', 'music'))
-    SFX = tools.load_all_sfx(os.path.join('resources', 'sounds'))
+    SFX = {}
+    if pg.mixer.get_init():
+        SFX = tools.load_all_sfx(os.path.join('resources', 'sounds'))
+    audio.enable(SFX, MUSIC_PATHS)
     GTX = tools.load_all_gtx(os.path.join('resources', 'graphics'))
+    LASER['img'] = surfaces.convert(LASER['img'], owner='Laser')
 
     _Y_OFFSET = (pg.display.Info().current_w - SCREEN_SIZE[0]) // 2
     os.environ['SDL_VIDEO_WINDOW_POS'] = '{},{}'.format(_Y_OFFSET, 25)
@@ -109,5 +236,6 @@ def init_display():
     font = pg.font.Font(FONT_PATHS['ARCADECLASSIC'], 150)
     _screen.fill(BACKGROUND_COLOR)
     _render = font.render('LOADING', 0, pg.Color('white'))
-    _screen.blit(_render, _render.get_rect(center=SCREEN_RECT.center))
+    surfaces.blit(_screen, _render,
+                  _render.get_rect(center=SCREEN_RECT.center))
     pg.display.flip()
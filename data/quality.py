@@ -0,0 +1,140 @@
+"""
+Adaptive quality of visual effects driven by frame time
+
+`Governor` watches time the program spends on one frame (events, updates
+and drawing, without waiting for the next frame) and compares it with the
+frame budget. When frames take too long for a while, it steps to lower
+quality level, when there is enough headroom for a longer while, it steps
+back. Thresholds of both directions are apart and degradation is faster
+than recovery, so quality does not oscillate.
+
+Levels only change effects that don't affect the game, like smoke of the
+ship or debris of explosions. Simulation of the game is the same on all
+levels.
+
+Attributes:
+    LEVELS (:obj:`tuple` of :obj:`Quality`): quality levels from the best
+    DEGRADE_RATIO (float): part of the budget above which frames are slow
+    RECOVER_RATIO (float): part of the budget below which frames are fast
+    DEGRADE_FRAMES (int): number of slow frames in a row before quality is
+        lowered
+    RECOVER_FRAMES (int): number of fast frames in a row before quality is
+        raised
+    SMOOTHING (float): weight of the last frame in the average frame time
+    current (Quality): quality level in use
+
+"""
+
+import collections
+
+DEGRADE_RATIO = 0.9
+RECOVER_RATIO = 0.5
+DEGRADE_FRAMES = 30
+RECOVER_FRAMES = 180
+SMOOTHING = 0.1
+
+
+class Quality(collections.namedtuple('Quality', [
+        'smoke_rate', 'smoke_lifetime', 'smoke_rotations', 'smoke_alpha',
+        'debris'])):
+    """
+    Quality level of visual effects
+
+    Args:
+        smoke_rate (float): multiplier of emitted smoke particles per second
+        smoke_lifetime (float): multiplier of lifetime of smoke particles
+        smoke_rotations (int): number of distinct rotations of smoke
+            particles, it divides `ship.SMOKE_ROTATIONS`
+        smoke_alpha (bool): if False, smoke particles are drawn opaque, so
+            they are blitted without blending
+        debris (float): multiplier of number of debris points of explosions
+
+    """
+    __slots__ = ()
+
+
+LEVELS = (Quality(1.0, 1.0, 18, True, 1.0),
+          Quality(0.5, 0.8, 6, True, 0.5),
+          Quality(0.25, 0.6, 3, False, 0.25),
+          Quality(0.1, 0.5, 1, False, 0.1))
+
+current = LEVELS[0]
+
+
+class Governor:
+    """
+    Changes `current` quality level by measured frame times
+
+    Args:
+        budget (float): time (in milliseconds) available for one frame
+        levels (:obj:`tuple` of :obj:`Quality`): quality levels from the
+            best
+
+    Attributes:
+        level (int): index of the current level in `levels`
+        average (float): smoothed frame time in milliseconds, None before
+            the first frame
+        changes (int): number of level changes
+
+    """
+    def __init__(self, budget, levels=LEVELS):
+        self.budget = budget
+        self.levels = levels
+        self.level = 0
+        self.average = None
+        self.changes = 0
+        self._slow = 0
+        self._fast = 0
+
+    @property
+    def quality(self):
+        """
+        Quality: quality of the current level
+        """
+        return self.levels[self.level]
+
+    def record(self, frame_time):
+        """
+        Count time of one frame and change level if it is needed
+
+        Args:
+            frame_time (float): time of the frame in milliseconds
+
+        Returns:
+            bool: True if level was changed
+
+        """
+        if self.average is None:
+            self.average = frame_time
+        else:
+            self.average += SMOOTHING * (frame_time - self.average)
+
+        if self.average > self.budget * DEGRADE_RATIO:
+            self._slow += 1
+            self._fast = 0
+        elif self.average < self.budget * RECOVER_RATIO:
+            self._fast += 1
+            self._slow = 0
+        else:
+            self._slow = self._fast = 0
+
+        if self._slow >= DEGRADE_FRAMES and self.level < len(self.levels) - 1:
+            self.set_level(self.level + 1)
+            return True
+        if self._fast >= RECOVER_FRAMES and self.level > 0:
+            self.set_level(self.level - 1)
+            return True
+        return False
+
+    def set_level(self, level):
+        """
+        Switch to quality `level` and make it `current`
+
+        Frame counters start again, so the next change has to wait for its
+        whole number of frames.
+        """
+        global current
+        self.level = level
+        self.changes += 1
+        self._slow = self._fast = 0
+        current = self.levels[level]
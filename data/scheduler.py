@@ -0,0 +1,177 @@
+"""
+Scheduler of delayed callbacks
+
+Scheduler replace timers polled by their owners every update. Callbacks are
+kept in two heaps, one ordered by time (in milliseconds) and second by ticks
+of simulation. Only callbacks that are due are touched during `advance`, so
+waiting callbacks cost nothing.
+
+Attributes:
+    FOREVER (int): value of `repeat` argument for callbacks that should be
+        called until they are cancelled
+
+"""
+
+import heapq
+import itertools
+
+FOREVER = -1
+
+
+class ScheduledCall:
+    """
+    Handle of callback registered in `Scheduler`
+
+    Args:
+        due (int): time or tick when callback will be called
+        interval (int): delay between repeated calls
+        callback (function): specify a function of one argument. The argument
+            (int) is the number of calls including the current one
+        repeat (int): how many times callback will be called. `FOREVER` means
+            until the call is cancelled
+
+    Attributes:
+        count (int): number of already made calls
+        cancelled (bool): if True, callback won't be called anymore
+
+    """
+    def __init__(self, due, interval, callback, repeat):
+        self.due = due
+        self.interval = interval
+        self.callback = callback
+        self.repeat = repeat
+        self.count = 0
+        self.cancelled = False
+
+    @property
+    def done(self):
+        """
+        bool: True if callback won't be called anymore
+        """
+        return self.cancelled or self.count == self.repeat
+
+    def cancel(self):
+        """
+        Prevent next calls of the callback
+        """
+        self.cancelled = True
+
+
+class Scheduler:
+    """
+    Call callbacks after given time or number of ticks
+
+    Time domain should be used for things that have to be synchronized with
+    the wall clock, like blinking text. Tick domain should be used for
+    simulation, so it behaves the same regardless of frame rate.
+
+    Attributes:
+        now (int): time of last `advance` in milliseconds
+        tick (int): number of `advance` calls
+
+    """
+    def __init__(self):
+        self.now = 0
+        self.tick = 0
+        self._by_time = []
+        self._by_tick = []
+        self._order = itertools.count()
+
+    def __len__(self):
+        """
+        Return number of pending calls, cancelled calls count until they
+        are due
+        """
+        return len(self._by_time) + len(self._by_tick)
+
+    def call_later(self, delay, callback, repeat=1):
+        """
+        Call `callback` after `delay` milliseconds
+
+        Args:
+            delay (int): delay between calls in milliseconds
+            callback (function): see `ScheduledCall`
+            repeat (int): see `ScheduledCall`
+
+        Returns:
+            ScheduledCall: handle that can cancel the call
+
+        """
+        return self._push(self._by_time, self.now, delay, callback, repeat)
+
+    def call_in_ticks(self, ticks, callback, repeat=1):
+        """
+        Call `callback` after `ticks` calls of `advance`
+
+        Args:
+            ticks (int): number of ticks between calls
+            callback (function): see `ScheduledCall`
+            repeat (int): see `ScheduledCall`
+
+        Returns:
+            ScheduledCall: handle that can cancel the call
+
+        """
+        return self._push(self._by_tick, self.tick, ticks, callback, repeat)
+
+    def _push(self, heap, current, interval, callback, repeat):
+        call = ScheduledCall(current + interval, interval, callback, repeat)
+        if not call.done:
+            heapq.heappush(heap, (call.due, next(self._order), call))
+        return call
+
+    def advance(self, now):
+        """
+        Move time and tick forward and call all callbacks that are due
+
+        Every callback is called at most once per `advance`, even if its
+        interval passed more than once since the last call.
+
+        Args:
+            now (int): current time in milliseconds
+
+        Returns:
+            int: number of made calls
+
+        """
+        self.now = now
+        self.tick += 1
+        return (self._run_due(self._by_time, now) +
+                self._run_due(self._by_tick, self.tick))
+
+    def _run_due(self, heap, current):
+        made = 0
+        due = []
+        while heap and heap[0][0] <= current:
+            call = heapq.heappop(heap)[2]
+            if not call.cancelled:
+                due.append(call)
+        for call in due:
+            if call.cancelled:
+                continue
+            call.count += 1
+            made += 1
+            call.callback(call.count)
+            if not call.done:
+                call.due = current + call.interval
+                heapq.heappush(heap, (call.due, next(self._order), call))
+        return made
+
+    def remaining_ticks(self, call):
+        """
+        Return number of ticks before the next call of tick-domain callback
+        """
+        return call.due - self.tick
+
+    def next_deadline(self):
+        """
+        Return time of the nearest time-domain call
+
+        Returns:
+            int: time in milliseconds or None if nothing is scheduled
+
+        """
+        heap = self._by_time
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
@@ -0,0 +1,168 @@
+"""
+Long unattended runs of the game played by autopilot
+
+Soak run starts in the game, restarts it whenever all lives are lost and
+ends after the given number of rounds. Every `REPORT_INTERVAL` seconds it
+prints percentiles of frame times since the previous report, numbers of
+sprites in groups of the game, resident memory of the process and pixel
+memory of surfaces (if `surfaces.accountant` is enabled), so slow
+leaks and slowdowns of late rounds show as trends between reports. Reports
+are also queued as telemetry events, if telemetry is enabled.
+
+Attributes:
+    REPORT_INTERVAL (float): delay in seconds between reports
+
+"""
+
+import os
+import sys
+import time
+
+from data import surfaces, telemetry
+
+REPORT_INTERVAL = 60.0
+
+
+def rss():
+    """
+    Return resident set size of the process in bytes
+
+    Returns:
+        int: the size, None if the system does not provide it
+
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def counts(game):
+    """
+    Return numbers of sprites in groups of the game
+
+    Args:
+        game (data.states.game.Game): the running game
+
+    Returns:
+        dict: numbers keyed by names of groups
+
+    """
+    ship = game.ship
+    return {
+            'asteroids': len(game.asteroids),
+            'ufos': len(game.ufos),
+            'ufo_lasers': len(game.ufos.shots),
+            'lasers': len(ship.ship_lasers),
+            'smoke': len(ship.smoke_generator),
+            'debris': len(game.debris) if game.debris is not None else 0,
+            'entities': len(game.world),
+            'scheduled': len(game.scheduler),
+    }
+
+
+class Soak:
+    """
+    Driver and monitor of a soak run
+
+    Args:
+        game (data.states.game.Game): game played by autopilot
+        rounds (int): number of rounds after which the run ends
+        interval (float): delay in seconds between reports
+        output (file): stream of reports
+
+    Attributes:
+        rounds_played (int): number of started rounds of all games
+        games (int): number of started games
+        frames (telemetry.Session): frame times since the last report
+        reports (int): number of printed reports
+
+    """
+    def __init__(self, game, rounds, interval=REPORT_INTERVAL,
+                 output=sys.stdout):
+        self.game = game
+        self.rounds = rounds
+        self.interval = interval
+        self.output = output
+        self.rounds_played = 0
+        self.games = 0
+        self.frames = telemetry.Session()
+        self.reports = 0
+        self.started = time.monotonic()
+        self._reported = self.started
+        self._round = None
+        self._world = None
+
+    def frame(self, frame_time_ms):
+        """
+        Count the frame, follow rounds and restart ended game
+
+        Args:
+            frame_time_ms (float): time of the frame in milliseconds
+
+        Returns:
+            bool: True if the run is finished
+
+        """
+        game = self.game
+        self.frames.frame(frame_time_ms)
+        if game.world is not self._world:
+            self._world, self._round = game.world, None
+            self.games += 1
+        if game.asteroids.round_level != self._round:
+            self._round = game.asteroids.round_level
+            self.rounds_played += 1
+        if game.end and not game.done:
+            game.next, game.done = 'GAME', True
+        finished = self.rounds_played > self.rounds
+        if finished or time.monotonic() - self._reported >= self.interval:
+            self.report()
+        return finished
+
+    def report(self):
+        """
+        Print and queue report of the period since the last one
+
+        Returns:
+            dict: the report
+
+        """
+        now = time.monotonic()
+        frames = self.frames
+        report = {
+                'elapsed': round(now - self.started, 1),
+                'games': self.games,
+                'rounds': self.rounds_played,
+                'frames': sum(frames.frames),
+                'frame_ms': {'p{}'.format(percent): frames.percentile(percent)
+                             for percent in telemetry.PERCENTILES},
+                'longest_frame_ms': frames.longest,
+                'sprites': counts(self.game),
+                'rss': rss(),
+        }
+        report.update(surfaces.usage())
+        self.frames = telemetry.Session()
+        self._reported = now
+        self.reports += 1
+        telemetry.event('soak', **report)
+        print(self._format(report), file=self.output, flush=True)
+        return report
+
+    @staticmethod
+    def _format(report):
+        parts = ['[soak {:.0f}s]'.format(report['elapsed'])]
+        parts += ['{} {}'.format(name, report[name])
+                  for name in ('games', 'rounds', 'frames')]
+        parts += ['{} {:.2f}ms'.format(name, value)
+                  for name, value in report['frame_ms'].items()]
+        parts.append('max {:.2f}ms'.format(report['longest_frame_ms']))
+        parts += ['{} {}'.format(name, count)
+                  for name, count in report['sprites'].items()]
+        if report['rss'] is not None:
+            parts.append('rss {:.1f}MiB'.format(report['rss'] / (1 << 20)))
+        if 'surface_bytes' in report:
+            parts.append('surfaces {:.1f}MiB'.format(
+                    report['surface_bytes'] / (1 << 20)))
+        return ' '.join(parts)
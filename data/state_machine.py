@@ -6,6 +6,8 @@ Classes in this module define program flow.
 
 import abc
 
+from data import allocations, inputs, scheduler, tracing
+
 
 class StateMachine:
     """
@@ -44,6 +46,9 @@ class StateMachine:
             `setup_states`.
         state (:obj:`data.state._State`): currently active state. Variable
             is defined in `setup_states`.
+        scheduler (data.scheduler.Scheduler): scheduler shared by all states
+            of this machine. It is advanced before every update of the
+            active state.
 
     """
     def __init__(self):
@@ -52,23 +57,33 @@ class StateMachine:
         self.state_dict = {}
         self.state_name = None
         self.state = None
+        self.scheduler = scheduler.Scheduler()
 
-    def setup_states(self, state_dict, start_state):
+    def setup_states(self, state_dict, start_state, now=0):
         """
         Set up the class
 
+        Give all states access to `scheduler` and start the first state.
+
         Args:
             state_dict (:obj:`dict` of :obj:`data.state_machine._State`): dict
                 that should contain all possible states for this state machine.
                 All states should be already fully initialized.
             start_state (str): key from `state_dict` to state, that should be
                 set to active first.
+            now (int): current time
 
         """
+        self.now = now
+        self.scheduler.now = now
         self.state_dict = state_dict
+        for state in self.state_dict.values():
+            state.scheduler = self.scheduler
         self.state_name = start_state
         self.state = self.state_dict[self.state_name]
+        self.state.startup(now, {})
 
+    @tracing.traced
     def update(self, now):
         """
         Update state and check for state's request
@@ -81,22 +96,59 @@ class StateMachine:
 
         """
         self.now = now
-        self.state.update(now)
+        if self.scheduler.advance(now):
+            self.state.dirty = True
+        with allocations.phase((self.state_name, 'update')):
+            self.state.update(now)
         if self.state.quit:
             self.quit = True
         elif self.state.done:
             self.flip_state()
 
+    @property
+    def idle(self):
+        """
+        bool: True if the active state is idle and nothing changed since it
+        was drawn, so the program can wait for the next event or timer
+        """
+        return self.state.idle and not self.state.dirty
+
+    def next_deadline(self):
+        """
+        Return time of the nearest time-domain call of this machine and of
+        machines of the active state
+
+        Returns:
+            int: time in milliseconds or None if nothing is scheduled
+
+        """
+        deadlines = [deadline for deadline in (self.scheduler.next_deadline(),
+                                               self.state.next_deadline())
+                     if deadline is not None]
+        return min(deadlines, default=None)
+
+    @tracing.traced
     def draw(self, surface):
         """
         Send draw request to active state.
 
+        Idle state is drawn only if it is `dirty`.
+
         Args:
             surface (pygame.Surface): screen surface
 
-        """
-        self.state.draw(surface)
+        Returns:
+            bool: True if the state was drawn
 
+        """
+        if self.state.idle and not self.state.dirty:
+            return False
+        with allocations.phase((self.state_name, 'draw')):
+            self.state.draw(surface)
+        self.state.dirty = False
+        return True
+
+    @tracing.traced
     def flip_state(self):
         """
         End or stop current state and active another one
@@ -114,18 +166,24 @@ class StateMachine:
         """
         Pass events down to current State
 
+        Event may change the state and `inputs.EXPOSE_EVENTS` need the
+        window painted again, so the state is marked as `dirty` and even
+        idle state is drawn.
+
         Args:
             event (pygame.event.Event): event in pygame format
 
         """
         self.state.get_event(event)
+        self.state.dirty = True
 
 
 class _State(abc.ABC):
     """
     Generic class for states
 
-    `get_event and `update` must be overloaded in the childclass.
+    `update` must be overloaded in the childclass. Events are dispatched to
+    handlers registered in `handlers`.
 
     Attributes:
         start_time (float): last time when state become active
@@ -136,8 +194,17 @@ class _State(abc.ABC):
         next (str): name of next state, that starts when `done` is True
         persist (:obj:`dict` of optional): dict of objects that need to stay
             alive
+        scheduler (data.scheduler.Scheduler): scheduler of the state machine
+            that owns this state. It is set in `StateMachine.setup_states`.
+        handlers (data.inputs.Dispatcher): event handlers of the state
+        idle (bool): if True, output of the state changes only after events
+            and scheduled calls, so it is redrawn only when `dirty`. Class
+            attribute, False by default
+        dirty (bool): True if output of the state changed since it was drawn
 
     """
+    idle = False
+
     def __init__(self):
         self.start_time = 0.0
         self.now = 0.0
@@ -145,16 +212,21 @@ class _State(abc.ABC):
         self.quit = False
         self.next = None
         self.persist = {}
+        self.scheduler = None
+        self.handlers = inputs.Dispatcher()
+        self.dirty = True
 
-    @abc.abstractmethod
     def get_event(self, event):
         """
         Processes events that were passed from the main event loop.
 
+        Event is passed to the handler bound in `handlers`.
+
         Args:
             event (pygame.event.Event): event in pygame format
 
         """
+        self.handlers.dispatch(event)
 
     def startup(self, now, persistant):
         """
@@ -168,6 +240,7 @@ class _State(abc.ABC):
         """
         self.persist = persistant
         self.start_time = now
+        self.dirty = True
 
     def cleanup(self):
         """
@@ -176,6 +249,13 @@ class _State(abc.ABC):
         self.done = False
         return self.persist
 
+    def next_deadline(self):
+        """
+        Return time of the nearest call scheduled by the state itself, None
+        by default
+        """
+        return None
+
     @abc.abstractmethod
     def update(self, now):
         """
@@ -192,7 +272,8 @@ class _ControlingState(_State):
     Generic controling state class
 
     Class extends default `_State` class. It provides automated updating, event
-    passing and notifying state machine to draw active state.
+    passing and notifying state machine to draw active state. `idle` and
+    `dirty` are taken from the active low-level state.
     """
     def __init__(self):
         """
@@ -202,8 +283,37 @@ class _ControlingState(_State):
             state_machine (StateMachine): low-level state machine
 
         """
-        super().__init__()
         self.state_machine = StateMachine()
+        super().__init__()
+
+    @property
+    def idle(self):
+        """
+        bool: True if the active low-level state is idle
+        """
+        state = self.state_machine.state
+        return state is not None and state.idle
+
+    @property
+    def dirty(self):
+        """
+        bool: True if the active low-level state changed since it was drawn
+        """
+        state = self.state_machine.state
+        return state is None or state.dirty
+
+    @dirty.setter
+    def dirty(self, value):
+        if self.state_machine.state is not None:
+            self.state_machine.state.dirty = value
+
+    def next_deadline(self):
+        """
+        Return the nearest deadline of the low-level state machine
+        """
+        if self.state_machine.state is None:
+            return None
+        return self.state_machine.next_deadline()
 
     def update(self, now):
         """
@@ -250,8 +360,8 @@ class CommandState(_State):
     All controling states controls if state that should be disabled (because of
     `done` property) is instance of this clas. If so, controling state end
     itself and set next state to `require_highter_level_to`. This is the only
-    job, that this class do, so no need to implement 'draw', 'update' or
-    'get_event' methods.
+    job, that this class do, so no need to implement 'draw' or 'update'
+    methods.
     """
     def __init__(self, require):
         """
@@ -271,6 +381,3 @@ class CommandState(_State):
 
     def update(self, now):
         pass
-
-    def get_event(self, event):
-        pass
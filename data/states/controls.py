@@ -27,9 +27,12 @@ class Controls(state_machine._State):
         any_key (widget_tools.AnyKey): blinking 'any key' text
 
     """
+    idle = True
+
     def __init__(self):
         super().__init__()
         self.next = 'SELECT'
+        self.handlers.bind(pg.KEYDOWN, self.key_pressed)
         self.keybord = widget_tools.SimpleImage(
                 prepare.GTX['keyboard'],
                 prepare.SCREEN_RECT.center
@@ -45,16 +48,30 @@ class Controls(state_machine._State):
                 any_key_center,
         )
 
-    def get_event(self, event):
+    def key_pressed(self, event):
         """
         If key press detected, done itself to start 'SELECT' state
         """
-        self.done = event.type == pg.KEYDOWN
+        self.done = True
 
     def draw(self, surface):
         surface.fill(prepare.BACKGROUND_COLOR)
         self.keybord.draw(surface)
         self.any_key.draw(surface)
 
+    def startup(self, now, persistant):
+        """
+        Start blinking of `any_key`
+        """
+        super().startup(now, persistant)
+        self.any_key.start(self.scheduler)
+
+    def cleanup(self):
+        """
+        Stop blinking of `any_key`
+        """
+        self.any_key.stop()
+        return super().cleanup()
+
     def update(self, now):
-        self.any_key.update(now)
+        pass
@@ -7,105 +7,251 @@ Attributes:
     FONT_SIZE (int): font size of score
     SPACING (int): vertical spacing between score and lives
     SHIP_SPACING (int): horizontal spacinh between life icons
+    REWIND_KEY (int): while the key is held, the game goes back in time
 
 """
 
 import pygame as pg
 
 from data.states import widget_tools
-from data import prepare, state_machine
-from data.components import ship, asteroids
+from data import (atlas, audio, highscores, inputs, prepare, state_machine,
+                  surfaces, telemetry, tools, tracing)
+from data.components import (asteroids, autopilot, ecs, laser, ship,
+                             snapshot, ufo)
+
+try:
+    from data.components import debris
+except ImportError:  # NumPy is missing, explosions have no debris
+    debris = None
 
 BOTTOM_Y_SHIFT = 10
 SIDE_MARGIN = 20
 FONT_SIZE = 70
 SPACING = 10
 SHIP_SPACING = 30
+REWIND_KEY = pg.K_BACKSPACE
 
 
 class Game(state_machine._State):
     """
     The game state
 
+    Args:
+        autopilot (bool): if True, the ship is steered by
+            `autopilot.Autopilot` instead of keyboard
+
     Attributes:
         end (bool): determine if player lost all lives
+        world (ecs.World): component tables of all game objects
         asteroids (asteroids.AsteroidsGroup): sprite group that contain all
             asteroids in it. It also provide some extra method
-        playerGroup (pygame.sprite.GroupSingle): group that holds ship
+        playerGroup (ship.PlayerGroup): group that holds ship
+        ufos (ufo.UfoGroup): UFOs and their lasers
         health (HealthBar): class tracking healths and drawing them
         score (Score): simple class that draw current score
+        rewind (snapshot.RewindBuffer): snapshots of previous ticks
+        rank (widget_tools.SimpleText): rank of the score on the board of
+            high scores, None until the score is stored
+        debris (debris.Debris): debris of explosions, None without NumPy
+        pilot (autopilot.Autopilot): pilot of spawned ships, None if the
+            ship is steered by keyboard
 
     """
-    def __init__(self):
+    def __init__(self, autopilot=False):
         super().__init__()
+        self.autopilot = autopilot
         self.end = False
+        self.rewind = snapshot.RewindBuffer()
+        self.handlers.bind(pg.KEYDOWN, self.fire, pg.K_SPACE)
 
-        self.asteroids = asteroids.AsteroidsGroup()
-        self.asteroids.next_level()
-        self.playerGroup = pg.sprite.GroupSingle()
+    def startup(self, now, persistant):
+        """
+        Create asteroids, health bar, score and spawn the ship, start music
+        of the game and telemetry session
+        """
+        super().startup(now, persistant)
+        audio.music('Above')
+        telemetry.start_session()
+        self.end = False
+        self.rewind.clear()
+        self.world = ecs.World()
+        self.asteroids = asteroids.AsteroidsGroup(self.world,
+                                                  prepare.WRAP_AROUND,
+                                                  prepare.VECTOR_ASTEROIDS)
+        self.next_level()
+        self.playerGroup = ship.PlayerGroup(self.world, prepare.WRAP_AROUND)
+        self.ufos = ufo.UfoGroup(self.scheduler, self.asteroids, self.world,
+                                 prepare.WRAP_AROUND)
+        self.pilot = None
+        if self.autopilot:
+            self.pilot = autopilot.Autopilot(self.asteroids, self.ufos)
         self.health = HealthBar(prepare.SHIP['lives'])
         self.score = Score()
+        self.rank = None
+        self.debris = debris.Debris() if debris is not None else None
         self.spawn()
 
     def spawn(self):
         """
         Spawn the ship and consume one health
         """
-        self.ship = ship.Ship()
+        self.ship = ship.Ship(self.scheduler, self.world, prepare.WRAP_AROUND,
+                              self.pilot)
         self.health.lost()
         self.playerGroup.add(self.ship)
+        self.ufos.watch(self.ship)
 
-    def get_event(self, event):
+    def fire(self, event):
         """
-        Circulate events to restart object or ship depending on `end` value
+        Notify the ship about request to shoot, unless the game ended
         """
-        if self.end:
-            self.restart.get_event(event)
-        elif event.type == pg.KEYDOWN and event.key == pg.K_SPACE:
+        if not self.end:
             self.ship.space_pressed()
 
+    @tracing.traced
     def draw(self, surface):
         """
         Draw all game's objects
         """
         surface.fill(prepare.BACKGROUND_COLOR)
-        if not self.end:
-            self.ship.draw(surface)
-        self.asteroids.draw(surface)
+        self.world.draw(surface)
+        self.asteroids.draw_outlines(surface)
+        if self.debris is not None:
+            self.debris.draw(surface)
         self.score.draw(surface)
         self.health.draw(surface)
+        if self.end and self.rank is not None:
+            self.rank.draw(surface)
 
+    @tracing.traced
     def update(self, now):
         """
-        Check ship and health, start next level if needed and check colision
+        Check ship and health, start next level if needed, bounce asteroids,
+        let UFOs decide and check colision
+
+        While `REWIND_KEY` is held, snapshots from `rewind` are restored
+        instead. Otherwise snapshot of the new state is stored.
         """
+        self.now = now
+        if inputs.current.pressed(REWIND_KEY) and self.rewind:
+            snapshot.restore(self, self.rewind.pop())
+            return
         if self.playerGroup.__len__() == 0:
             if self.health.healths > 0:
                 self.spawn()
-            else:
+            elif not self.end:
                 self.end = True
+                self.ufos.clear()
+                self.submit_score()
+                telemetry.end_session(finished=True, score=self.score.score,
+                                      **surfaces.usage())
         else:
             if self.asteroids.__len__() == 0:
-                self.asteroids.next_level()
-            self.ship.update(now)
-            self.asteroids.update()
+                self.next_level()
+            self.ship.update(tools.TIME_STEP)
+            self.world.step(tools.TIME_STEP)
+            self.asteroids.bounce()
+            self.ufos.think()
             self.check_collide()
+        if self.debris is not None:
+            self.debris.update(tools.TIME_STEP)
+        self.rewind.push(snapshot.capture(self))
+
+    def next_level(self):
+        """
+        Spawn asteroids of the next round
+        """
+        self.asteroids.next_level()
+        if telemetry.session is not None:
+            telemetry.session.rounds = self.asteroids.round_level
 
+    def submit_score(self):
+        """
+        Store the score in high scores and show its rank
+
+        The score is stored once per game, even if the end of the game is
+        rewound and reached again. Games played by the autopilot are not
+        stored, so soak runs don't fill the board.
+        """
+        if (self.autopilot or self.rank is not None or
+                highscores.store is None):
+            return
+        rank = highscores.store.submit(prepare.PLAYER_NAME, self.score.score,
+                                       self.asteroids.round_level)
+        self.rank = widget_tools.SimpleText('ARCADECLASSIC', FONT_SIZE,
+                                            'Rank {}'.format(rank))
+
+    def explode(self, asteroid):
+        """
+        Destroy asteroid with sound and burst of debris
+        """
+        if self.debris is not None:
+            self.debris.explode(asteroid)
+        asteroid.kill()
+        audio.play(audio.BREAK)
+
+    @tracing.traced
     def check_collide(self):
         """
         Check for collisions
 
-        Add 100 score if asteroid was destroyed.
+        Add 100 score if asteroid was destroyed and score of UFO if UFO was
+        destroyed by the ship. Each laser destroys only the first object on
+        its path. Lasers are swept along their path, so they do not pass
+        through small asteroids between ticks. UFOs and their lasers destroy
+        asteroids too, without score. Destroyed asteroids burst into debris.
         """
-        for asteroid in pg.sprite.groupcollide(
-                self.asteroids,
-                self.ship.ship_lasers,
-                1,
-                1):
+        world, step = self.world, tools.TIME_STEP
+        destroyed = {}
+        for shot, asteroid in world.swept_collisions(laser.COLLIDER,
+                                                     asteroids.COLLIDER, step):
+            if shot.alive():
+                shot.kill()
+                destroyed[asteroid] = None
+        for asteroid in destroyed:
+            self.explode(asteroid)
             self.score.add_score(100)
-
-        if not self.ship.immortal:
-            pg.sprite.groupcollide(self.playerGroup, self.asteroids, 1, 0)
+            if telemetry.session is not None:
+                telemetry.session.destroyed[asteroid.level] += 1
+
+        for shot, saucer in world.swept_collisions(laser.COLLIDER,
+                                                   ufo.COLLIDER, step):
+            if shot.alive() and saucer.alive():
+                shot.kill()
+                saucer.kill()
+                self.score.add_score(saucer.score)
+                audio.play(audio.EXPLOSION)
+
+        destroyed = {}
+        for shot, asteroid in world.swept_collisions(ufo.LASER_COLLIDER,
+                                                     asteroids.COLLIDER, step):
+            if shot.alive():
+                shot.kill()
+                destroyed[asteroid] = None
+        for saucer, asteroid in world.collisions(ufo.COLLIDER,
+                                                 asteroids.COLLIDER):
+            saucer.kill()
+            destroyed[asteroid] = None
+        for asteroid in destroyed:
+            self.explode(asteroid)
+
+        if self.ship.immortal:
+            return
+        alive = self.ship.alive()
+        if (world.collisions(ship.COLLIDER, asteroids.COLLIDER) or
+                world.swept_collisions(ufo.LASER_COLLIDER, ship.COLLIDER,
+                                       step)):
+            self.ship.kill()
+            audio.play(audio.EXPLOSION)
+        for saucer, player in world.collisions(ufo.COLLIDER, ship.COLLIDER):
+            saucer.kill()
+            self.ship.kill()
+            audio.play(audio.EXPLOSION)
+        if alive and not self.ship.alive():
+            telemetry.event('death', round=self.asteroids.round_level,
+                            score=self.score.score)
+            if telemetry.session is not None:
+                telemetry.session.deaths += 1
 
 
 class Restart(state_machine._State):
@@ -123,27 +269,51 @@ class HealthBar:
         healths (int): initial number of healths. One health have to be lost
             because of spawning the ship
 
+    Attributes:
+        rect (pygame.Rect): rect of ship icon
+        area (pygame.Rect): area of `image` with the icon, when the icon is
+            taken from atlas
+        slots (:obj:`list` of :obj:`tuple`): positions of all ship icons
+        positions (:obj:`list` of :obj:`tuple`): positions of drawn icons
+
     """
     def __init__(self, healths):
         self.healths = healths
         self.image = prepare.GTX['ship_icon']
+        self.rect = self.image.get_rect()
+        self.area = None
+        region = atlas.lookup('ship_icon')
+        if region is not None:
+            self.image, self.area = region.page, region.area
 
         y = prepare.SCREEN_SIZE[1] - BOTTOM_Y_SHIFT - FONT_SIZE - SPACING
         x = prepare.SCREEN_SIZE[0] - SIDE_MARGIN
-        x_shift = - SHIP_SPACING - prepare.GTX['ship_icon'].get_size()[0]
-        self.positions = [(x + i * x_shift, y) for i in range(self.healths)]
-        self.positions = list(reversed(self.positions))
+        x_shift = - SHIP_SPACING - self.rect.width
+        self.slots = [(x + i * x_shift, y) for i in range(self.healths)]
+        self.slots = list(reversed(self.slots))
+        self.positions = self.slots
 
     def draw(self, surface):
         for position in self.positions:
-            surface.blit(self.image, self.image.get_rect(bottomright=position))
+            self.rect.bottomright = position
+            surfaces.blit(surface, self.image, self.rect, self.area)
 
     def lost(self):
         """
         Deincrement healths and remove one ship icon
         """
-        self.positions = self.positions[1:]
-        self.healths -= 1
+        self.set_healths(self.healths - 1)
+
+    def set_healths(self, healths):
+        """
+        Set number of healths and show corresponding number of ship icons
+
+        Args:
+            healths (int): new number of healths
+
+        """
+        self.healths = healths
+        self.positions = self.slots[len(self.slots) - max(0, healths):]
 
 
 class Score(widget_tools.SimpleText):
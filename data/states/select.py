@@ -13,7 +13,7 @@ Attributes:
 import pygame as pg
 
 from data.states import widget_tools
-from data import prepare, state_machine
+from data import audio, prepare, state_machine, tracing
 
 HEADER_MARGIN_TOP = 150
 OPTIONS_FONT_SIZE = 100
@@ -33,6 +33,7 @@ class Select(state_machine._ControlingState):
     `done` to True, also set `next` according to command states's
     `require_higher_level_to`.
     """
+    @tracing.traced
     def startup(self, now, persist):
         """
         Create option state and subcommands
@@ -41,7 +42,8 @@ class Select(state_machine._ControlingState):
                       'PLAY': state_machine.CommandState('GAME'),
                       'CONTROLS': state_machine.CommandState('CONTROLS'),
                       'QUIT': state_machine.CommandState('QUIT')}
-        self.state_machine.setup_states(state_dict, 'OPTIONS')
+        super().startup(now, persist)
+        self.state_machine.setup_states(state_dict, 'OPTIONS', now)
 
 
 class OptionItem(widget_tools.SimpleText):
@@ -87,6 +89,8 @@ class Options(state_machine._State):
         header (widget_tools.SimpleText): header
 
     """
+    idle = True
+
     def __init__(self, options):
         super().__init__()
         self.option_items = [OptionItem(x, index * OPTIONS_SPACING)
@@ -104,6 +108,9 @@ class Options(state_machine._State):
                 prepare.CAPTION,
                 header_center
         )
+        self.handlers.bind(pg.KEYDOWN, self.confirm, pg.K_RETURN)
+        self.handlers.bind(pg.KEYDOWN, self.select_previous, pg.K_UP)
+        self.handlers.bind(pg.KEYDOWN, self.select_next, pg.K_DOWN)
 
     def set_highline(self, new_index):
         """
@@ -114,6 +121,8 @@ class Options(state_machine._State):
 
         """
         if 0 <= new_index <= len(self.option_items):
+            if new_index != self.active_index:
+                audio.play(audio.MENU)
             self.option_items[self.active_index].is_selected(False)
             self.active_index = new_index
             self.option_items[self.active_index].is_selected(True)
@@ -127,18 +136,22 @@ class Options(state_machine._State):
     def update(self, now):
         pass
 
-    def get_event(self, event):
+    def confirm(self, event):
+        """
+        Done itself and set selected item as the next state
+        """
+        self.next = self.option_items[self.active_index].text
+        self.done = True
+
+    def select_previous(self, event):
+        """
+        Select the item above the active one
+        """
+        self.set_highline(max(0, self.active_index - 1))
+
+    def select_next(self, event):
         """
-        Set new active item according to user event.
+        Select the item below the active one
         """
-        new_index = self.active_index
-        if event.type == pg.KEYDOWN:
-            if event.key == pg.K_RETURN:
-                self.next = self.option_items[self.active_index].text
-                self.done = True
-            elif event.key == pg.K_UP:
-                new_index = max(0, self.active_index - 1)
-            elif event.key == pg.K_DOWN:
-                new_index = min(len(self.option_items) - 1,
-                                self.active_index + 1)
-            self.set_highline(new_index)
+        self.set_highline(min(len(self.option_items) - 1,
+                              self.active_index + 1))
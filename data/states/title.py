@@ -10,7 +10,7 @@ Attributes:
 import pygame as pg
 
 from data.states import widget_tools
-from data import prepare, state_machine
+from data import audio, prepare, state_machine
 
 ANY_KEY_Y = 100
 
@@ -28,9 +28,12 @@ class Title(state_machine._State):
         any_key (widget_tools.AnyKey): blinking 'any key' text
 
     """
+    idle = True
+
     def __init__(self):
         super().__init__()
         self.next = 'SELECT'
+        self.handlers.bind(pg.KEYDOWN, self.key_pressed)
 
         self.header_text = widget_tools.SimpleText(
                 'ARCADECLASSIC',
@@ -49,16 +52,31 @@ class Title(state_machine._State):
                 any_key_center,
         )
 
-    def get_event(self, event):
+    def key_pressed(self, event):
         """
         If key press detected, done itself to start 'SELECT' state
         """
-        self.done = event.type == pg.KEYDOWN
+        self.done = True
 
     def draw(self, surface):
         surface.fill(prepare.BACKGROUND_COLOR)
         self.header_text.draw(surface)
         self.any_key.draw(surface)
 
+    def startup(self, now, persistant):
+        """
+        Start blinking of `any_key` and music of menus
+        """
+        super().startup(now, persistant)
+        self.any_key.start(self.scheduler)
+        audio.music('Painting')
+
+    def cleanup(self):
+        """
+        Stop blinking of `any_key`
+        """
+        self.any_key.stop()
+        return super().cleanup()
+
     def update(self, now):
-        self.any_key.update(now)
+        pass
@@ -8,7 +8,7 @@ Attributes:
 
 import pygame as pg
 
-from data import prepare, tools
+from data import prepare, scheduler, surfaces
 
 ANY_KEY_BLINK_TIME = 350
 
@@ -38,7 +38,9 @@ class SimpleText:
         """
         Update image and rectangle
         """
-        self.image = render_font(self.font, self.size, self.text, self.color)
+        self.image = surfaces.track(
+                render_font(self.font, self.size, self.text, self.color),
+                type(self).__name__, 'text')
         self.rect = self.image.get_rect(center=self.position)
 
     def draw(self, surface):
@@ -49,7 +51,7 @@ class SimpleText:
             surface (pygame.Surface): screen surface
 
         """
-        surface.blit(self.image, self.rect)
+        surfaces.blit(surface, self.image, self.rect)
 
 
 class AnyKey(SimpleText):
@@ -66,24 +68,38 @@ class AnyKey(SimpleText):
 
     Attributes:
         visible (bool): determine if text is visible right now
-        timer (tools.Timer): timer calls callback every
-            `ANY_KEY_BLINK_TIME`
+        timer (data.scheduler.ScheduledCall): call of `toggle` every
+            `ANY_KEY_BLINK_TIME`, None if blinking is stopped
 
     """
     def __init__(self, font, size, position, color=(255, 255, 255)):
         super().__init__(font, size, 'Press any key', position, color)
         self.visible = True
-        self.timer = tools.Timer(ANY_KEY_BLINK_TIME, self.toggle)
+        self.timer = None
 
-    def update(self, now):
+    def start(self, state_scheduler):
         """
-        Check tick if enought time passed to toogle visibility
+        Start blinking
 
         Args:
-            now (int): actual time
+            state_scheduler (data.scheduler.Scheduler): scheduler of the state
+                that shows the text
 
         """
-        self.timer.check_tick(now)
+        self.stop()
+        self.timer = state_scheduler.call_later(ANY_KEY_BLINK_TIME,
+                                                self.toggle,
+                                                repeat=scheduler.FOREVER)
+
+    def stop(self):
+        """
+        Stop blinking and leave the text visible
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.visible:
+            self.toggle(0)
 
     def toggle(self, tick_count):
         """
@@ -93,7 +109,7 @@ class AnyKey(SimpleText):
 
         Args:
             tick_count (int): number of how many times method was called -
-                required arguments by timer
+                required arguments by scheduler
 
         """
         if self.visible:
@@ -120,7 +136,7 @@ class SimpleImage:
         """
         Draw image
         """
-        surface.blit(self.image, self.rect)
+        surfaces.blit(surface, self.image, self.rect)
 
 
 def change_pos(position, x, y):
@@ -143,6 +159,8 @@ def render_font(font, size, text, color=(255, 255, 255)):
     """
     Return surface with rendered font, size and message
 
+    The surface is converted to the display format with per-pixel alpha.
+
     Args:
         font (src): name of the font
         size (int): size of the text
@@ -154,4 +172,4 @@ def render_font(font, size, text, color=(255, 255, 255)):
 
     """
     font = pg.font.Font(prepare.FONT_PATHS[font], size)
-    return font.render(text, 1, color)
+    return surfaces.convert(font.render(text, 1, color), alpha=True)
@@ -0,0 +1,464 @@
+"""
+Surfaces in the display pixel format and audit of blits
+
+Blitting surface whose pixel format differs from the display converts every
+pixel on every blit. All surfaces of the program should be created and loaded
+through this module, so they match the display format, with per-pixel alpha
+only where it is needed and with RLE acceleration of colorkeyed images.
+Before the display is set, surfaces are left as they are and they have to be
+converted later by `convert`.
+
+Audit mode counts blits by pixel format of the source surface each frame.
+Draw methods blit through `blit` and `blits`, so their blits are counted.
+
+Positions and images are in logical units of `prepare.SCREEN_SIZE`. When the
+display is smaller (see `prepare.RENDER_SCALE`), `blit` and `blits` move
+destinations by `scale` and draw scaled copies of sources. Copies are made
+once and kept while the source exists, areas of atlas pages are scaled with
+their pages. Surfaces changed in place have to be passed to `invalidate`.
+
+Pixel memory of surfaces is owned by SDL, so `tracemalloc` does not see it.
+Accounting mode tracks bytes of pixels of surfaces registered by `track`
+(and by `new`, `convert` and `load` given an owner) until they are garbage
+collected, summed by owner and purpose. When the total exceeds the budget,
+eviction callbacks are called to drop caches, like scaled copies and pools
+of killed sprites (see `add_evictor`), least recently used entries first.
+
+Attributes:
+    audit (BlitAudit): audit of the current run, None if audit is disabled
+    accountant (SurfaceAccountant): accounting of surface memory of the
+        current run, None if accounting is disabled
+    scale (float): ratio of the display size to the logical size
+
+"""
+
+import collections
+import weakref
+
+import pygame as pg
+
+audit = None
+accountant = None
+scale = 1
+
+_scaled = weakref.WeakKeyDictionary()
+_evictors = []
+
+
+def display_ready():
+    """
+    Return True if display surface exists and surfaces can be converted
+    """
+    return pg.display.get_surface() is not None
+
+
+def convert(surface, alpha=False, colorkey=None, owner=None,
+            purpose='image'):
+    """
+    Return surface converted to the display format
+
+    Args:
+        surface (pygame.Surface): surface to be converted
+        alpha (bool): if True, per-pixel alpha is kept
+        colorkey (:obj:`tuple` of :obj:`int`): color to be transparent, the
+            surface is RLE accelerated
+        owner (str): if given, the surface is tracked, see `track`
+        purpose (str): see `track`
+
+    Returns:
+        pygame.Surface: new surface, or `surface` itself if display is not set
+
+    """
+    if display_ready():
+        surface = surface.convert_alpha() if alpha else surface.convert()
+    if colorkey is not None:
+        surface.set_colorkey(colorkey, pg.RLEACCEL)
+    if owner is not None:
+        track(surface, owner, purpose)
+    return surface
+
+
+def new(size, alpha=False, colorkey=None, owner=None, purpose='image'):
+    """
+    Create surface in the display format
+
+    Args:
+        size (:obj:`tuple` of :obj:`int`): width and height
+        alpha (bool): if True, surface has per-pixel alpha
+        colorkey (:obj:`tuple` of :obj:`int`): see `convert`
+        owner (str): see `convert`
+        purpose (str): see `convert`
+
+    Returns:
+        pygame.Surface
+
+    """
+    surface = pg.Surface(size, pg.SRCALPHA if alpha else 0)
+    return convert(surface, alpha, colorkey, owner, purpose)
+
+
+def load(fullpath, colorkey, owner=None, purpose='image'):
+    """
+    Load image file in the display format
+
+    If image doesn't have alpha, it gets given `colorkey`.
+
+    Args:
+        fullpath (str): path to image
+        colorkey (:obj:`tuple` of :obj:`int`): color to be transparent
+        owner (str): see `convert`
+        purpose (str): see `convert`
+
+    Returns:
+        pygame.Surface
+
+    """
+    image = pg.image.load(fullpath)
+    if image.get_flags() & pg.SRCALPHA:
+        return convert(image, alpha=True, owner=owner, purpose=purpose)
+    return convert(image, colorkey=colorkey, owner=owner, purpose=purpose)
+
+
+def describe(surface):
+    """
+    Return name of the pixel format of the surface
+
+    Formats that differ from the display format are marked as 'slow'.
+
+    Returns:
+        str: for example '32bit alpha' or '24bit colorkey rle slow'
+
+    """
+    flags = surface.get_flags()
+    name = ['{}bit'.format(surface.get_bitsize())]
+    if flags & pg.SRCALPHA:
+        name.append('alpha')
+    if surface.get_colorkey() is not None:
+        name.append('colorkey')
+    if flags & (pg.RLEACCEL | pg.RLEACCELOK):
+        name.append('rle')
+    display = pg.display.get_surface()
+    if display is not None and (
+            surface.get_bitsize() != display.get_bitsize() or
+            surface.get_masks()[:3] != display.get_masks()[:3]):
+        name.append('slow')
+    return ' '.join(name)
+
+
+class BlitAudit:
+    """
+    Counts of blits by pixel format of the source surface
+
+    Attributes:
+        frame (collections.Counter): counts of the current frame
+        last (collections.Counter): counts of the previous frame
+        total (collections.Counter): counts of all finished frames
+        frames (int): number of finished frames
+
+    """
+    def __init__(self):
+        self.frame = collections.Counter()
+        self.last = collections.Counter()
+        self.total = collections.Counter()
+        self.frames = 0
+
+    def count(self, source):
+        """
+        Count one blit of `source`
+        """
+        self.frame[describe(source)] += 1
+
+    def end_frame(self):
+        """
+        Move counts of the current frame to `last` and `total`
+        """
+        self.total.update(self.frame)
+        self.last, self.frame = self.frame, collections.Counter()
+        self.frames += 1
+
+    def report(self):
+        """
+        Return average numbers of blits per frame as text
+        """
+        lines = ['blits per frame ({} frames)'.format(self.frames)]
+        for name, count in self.total.most_common():
+            lines.append('{:>10.1f}  {}'.format(count / max(1, self.frames),
+                                                name))
+        return '\n'.join(lines)
+
+
+def enable_audit():
+    """
+    Start counting blits made by `blit` and `blits`
+
+    Returns:
+        BlitAudit: the new audit
+
+    """
+    global audit
+    audit = BlitAudit()
+    return audit
+
+
+class SurfaceAccountant:
+    """
+    Pixel memory of tracked surfaces by owner and purpose
+
+    Size of surface is its pitch times its height, RLE copies and SDL
+    bookkeeping are not counted. Surface is counted from `track` until it
+    is garbage collected. Budget should leave room for caches, surfaces in
+    use can not be evicted and evicted caches are rebuilt when needed.
+
+    Args:
+        budget (int): bytes above which eviction callbacks are called, None
+            for no budget
+
+    Attributes:
+        bytes (collections.Counter): bytes of live surfaces keyed by (owner,
+            purpose)
+        counts (collections.Counter): numbers of live surfaces keyed by
+            (owner, purpose)
+        total (int): bytes of all live surfaces
+        peak (int): the largest `total`
+        evictions (int): number of calls of eviction callbacks that freed
+            some bytes
+
+    """
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.bytes = collections.Counter()
+        self.counts = collections.Counter()
+        self.total = 0
+        self.peak = 0
+        self.evictions = 0
+        self._evictors = []
+        self._tracked = weakref.WeakKeyDictionary()
+        self._evicting = False
+
+    def add_evictor(self, callback):
+        """
+        Register `callback` called with the excess of bytes over the budget
+
+        Callbacks are called in order of registration until the total fits
+        the budget.
+        """
+        self._evictors.append(callback)
+
+    def track(self, surface, owner, purpose):
+        """
+        Count `surface` under `owner` and `purpose`, a surface is counted
+        once
+        """
+        if surface in self._tracked:
+            return
+        key = (owner, purpose)
+        size = surface.get_pitch() * surface.get_height()
+        self._tracked[surface] = key
+        finalizer = weakref.finalize(surface, self._release, key, size)
+        finalizer.atexit = False
+        self.bytes[key] += size
+        self.counts[key] += 1
+        self.total += size
+        if self.total > self.peak:
+            self.peak = self.total
+        if self.budget is not None and self.total > self.budget:
+            self.evict()
+
+    def _release(self, key, size):
+        self.bytes[key] -= size
+        self.counts[key] -= 1
+        self.total -= size
+
+    def evict(self):
+        """
+        Call eviction callbacks until the total fits the budget
+        """
+        if self._evicting:
+            return
+        self._evicting = True
+        try:
+            for callback in self._evictors:
+                if self.total <= self.budget:
+                    break
+                before = self.total
+                callback(self.total - self.budget)
+                if self.total < before:
+                    self.evictions += 1
+        finally:
+            self._evicting = False
+
+    def usage(self):
+        """
+        Return totals as fields of telemetry event
+        """
+        return {'surface_bytes': self.total, 'surface_peak': self.peak,
+                'surface_evictions': self.evictions}
+
+    def report(self):
+        """
+        Return bytes of live surfaces by owner and purpose as text
+        """
+        lines = ['surface memory {:.1f} KiB (peak {:.1f} KiB, {} '
+                 'evictions)'.format(self.total / 1024, self.peak / 1024,
+                                     self.evictions)]
+        for (owner, purpose), size in self.bytes.most_common():
+            if self.counts[owner, purpose]:
+                lines.append('{:>10.1f} KiB {:>6}  {} {}'.format(
+                        size / 1024, self.counts[owner, purpose], owner,
+                        purpose))
+        return '\n'.join(lines)
+
+
+def enable_accounting(budget=None):
+    """
+    Start accounting of surface memory, scaled copies are evicted first,
+    then caches registered by `add_evictor`
+
+    Args:
+        budget (int): see `SurfaceAccountant`
+
+    Returns:
+        SurfaceAccountant: the new accountant
+
+    """
+    global accountant
+    accountant = SurfaceAccountant(budget)
+    accountant.add_evictor(_evict_scaled)
+    for callback in _evictors:
+        accountant.add_evictor(callback)
+    return accountant
+
+
+def add_evictor(callback):
+    """
+    Register eviction callback of a cache holding surfaces
+
+    The callback is added to every accountant enabled later and to the
+    current one. See `SurfaceAccountant.add_evictor`.
+    """
+    _evictors.append(callback)
+    if accountant is not None:
+        accountant.add_evictor(callback)
+
+
+def track(surface, owner, purpose='image'):
+    """
+    Count `surface` in accounting of surface memory, if it is enabled
+
+    Args:
+        surface (pygame.Surface): the surface
+        owner (str): name of class (or module) that created it
+        purpose (str): what the surface is for, like 'rotation' or 'text'
+
+    Returns:
+        pygame.Surface: `surface`
+
+    """
+    if accountant is not None:
+        accountant.track(surface, owner, purpose)
+    return surface
+
+
+def usage():
+    """
+    Return totals of surface memory as fields of telemetry event, empty if
+    accounting is disabled
+    """
+    return accountant.usage() if accountant is not None else {}
+
+
+def _evict_scaled(excess):
+    """
+    Drop the least recently used scaled copies until `excess` bytes are
+    freed
+    """
+    for source, copy in list(_scaled.items()):
+        if excess <= 0:
+            break
+        excess -= copy.get_pitch() * copy.get_height()
+        del _scaled[source]
+
+
+def set_scale(value):
+    """
+    Set `scale` of drawing and drop scaled copies of the previous one
+    """
+    global scale
+    scale = value
+    _scaled.clear()
+
+
+def invalidate(source):
+    """
+    Drop scaled copy of `source`, callers that change pixels of a surface in
+    place call it, so the next blit scales the changed pixels
+    """
+    _scaled.pop(source, None)
+
+
+def scaled(source):
+    """
+    Return copy of `source` scaled by `scale`
+
+    Copy of image with colorkey is not smoothed, so the colorkey stays
+    exact. The copy is cached and its alpha follows alpha of `source`.
+    While accounting is enabled, used copy moves to the end of the cache,
+    so copies are evicted in order of their last use.
+    """
+    copy = _scaled.get(source)
+    if copy is not None and accountant is not None:
+        _scaled[source] = _scaled.pop(source)
+    elif copy is None:
+        width, height = source.get_size()
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        colorkey = source.get_colorkey()
+        if colorkey is None:
+            copy = pg.transform.smoothscale(source, size)
+        else:
+            copy = pg.transform.scale(source, size)
+            copy.set_colorkey(colorkey, pg.RLEACCEL)
+        _scaled[source] = track(copy, 'surfaces', 'scaled')
+    alpha = source.get_alpha()
+    if copy.get_alpha() != alpha:
+        copy.set_alpha(alpha)
+    return copy
+
+
+def _scale_blit(source, dest, area=None):
+    """
+    Return arguments of blit scaled by `scale`
+    """
+    dest = (round(dest[0] * scale), round(dest[1] * scale))
+    if area is not None:
+        x, y, width, height = area
+        left, top = round(x * scale), round(y * scale)
+        area = (left, top, round((x + width) * scale) - left,
+                round((y + height) * scale) - top)
+    return scaled(source), dest, area
+
+
+def blit(target, source, dest, area=None):
+    """
+    Blit `area` of `source` on `target` at `dest`, the blit is counted by
+    audit
+    """
+    if audit is not None:
+        audit.count(source)
+    if scale != 1:
+        return target.blit(*_scale_blit(source, dest, area))
+    return target.blit(source, dest, area)
+
+
+def blits(target, sequence):
+    """
+    Blit sequence of (source, dest) or (source, dest, area) on `target` in
+    one call
+
+    Blits are counted by audit.
+    """
+    if audit is not None:
+        for item in sequence:
+            audit.count(item[0])
+    if scale != 1:
+        sequence = [_scale_blit(*item) for item in sequence]
+    target.blits(sequence, False)
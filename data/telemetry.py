@@ -0,0 +1,308 @@
+"""
+Session metrics written to JSON Lines file by a background thread
+
+The game loop never touches the disk. Events are appended to a bounded
+`collections.deque`, appending and popping of deque are atomic, so the game
+loop and the writer thread share it without locks. When the queue is full,
+new events are dropped and counted instead of waiting for the writer. The
+writer thread wakes every `BATCH_INTERVAL`, writes all queued events as one
+batch, syncs the file every `SYNC_INTERVAL` and rotates it when it is larger
+than `MAX_BYTES`.
+
+Metrics of one game are aggregated in memory by `session` and written as one
+event when the game ends. Frame times are counted in histogram of fixed
+buckets, so recording of a frame does not allocate and percentiles are
+computed without sorting.
+
+When telemetry is disabled, `writer` and `session` are None and `event`
+does nothing.
+
+Attributes:
+    QUEUE_SIZE (int): maximum number of events waiting for the writer
+    BATCH_INTERVAL (float): delay in seconds between batches of the writer
+    SYNC_INTERVAL (float): minimal delay in seconds between syncs of the file
+    MAX_BYTES (int): size of the file at which it is rotated
+    BACKUPS (int): number of kept rotated files, named with suffixes '.1'
+        (the newest) to '.`BACKUPS`'
+    FRAME_BUCKET (float): width of a bucket of frame time histogram in
+        milliseconds
+    FRAME_BUCKETS (int): number of buckets, longer frames share the last one
+    PERCENTILES (tuple): reported percentiles of frame time
+    writer (Writer): writer of the current run, None if telemetry is
+        disabled
+    session (Session): metrics of the running game, None outside of game
+
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+
+QUEUE_SIZE = 4096
+BATCH_INTERVAL = 0.5
+SYNC_INTERVAL = 5.0
+MAX_BYTES = 1 << 20
+BACKUPS = 3
+FRAME_BUCKET = 0.25
+FRAME_BUCKETS = 400
+PERCENTILES = (50, 90, 99)
+
+writer = None
+session = None
+
+
+class Writer:
+    """
+    Background thread writing queued events into JSON Lines file
+
+    Args:
+        path (str): path to the file, events are appended to it
+        queue_size (int): maximum number of queued events
+        max_bytes (int): size of the file at which it is rotated
+        backups (int): number of kept rotated files
+
+    Attributes:
+        queue (collections.deque): events waiting for the writer
+        dropped (int): number of events dropped because the queue was full
+        written (int): number of written events
+
+    """
+    def __init__(self, path, queue_size=QUEUE_SIZE, max_bytes=MAX_BYTES,
+                 backups=BACKUPS):
+        self.path = path
+        self.queue_size = queue_size
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue = collections.deque()
+        self.dropped = 0
+        self.written = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'a')
+        self._synced = time.monotonic()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run,
+                                        name='telemetry', daemon=True)
+
+    def start(self):
+        """
+        Start the thread
+        """
+        self._thread.start()
+
+    def put(self, event):
+        """
+        Queue event, it is dropped if the queue is full
+
+        Returns:
+            bool: True if the event was queued
+
+        """
+        if len(self.queue) >= self.queue_size:
+            self.dropped += 1
+            return False
+        self.queue.append(event)
+        return True
+
+    def _run(self):
+        while not self._stopping.wait(BATCH_INTERVAL):
+            self.write_batch()
+        self.write_batch()
+        self.sync()
+        self.file.close()
+
+    def write_batch(self):
+        """
+        Write all queued events, sync and rotate the file if it is time
+
+        Returns:
+            int: number of written events
+
+        """
+        lines = []
+        queue = self.queue
+        while queue:
+            lines.append(json.dumps(queue.popleft(), separators=(',', ':')))
+        if lines:
+            self.file.write('\n'.join(lines) + '\n')
+            self.written += len(lines)
+        if time.monotonic() - self._synced >= SYNC_INTERVAL:
+            self.sync()
+        if self.file.tell() >= self.max_bytes:
+            self.rotate()
+        return len(lines)
+
+    def sync(self):
+        """
+        Flush the file to disk
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._synced = time.monotonic()
+
+    def rotate(self):
+        """
+        Move the file to the first backup and start a new one
+        """
+        self.sync()
+        self.file.close()
+        for number in range(self.backups - 1, 0, -1):
+            older = '{}.{}'.format(self.path, number)
+            if os.path.exists(older):
+                os.replace(older, '{}.{}'.format(self.path, number + 1))
+        if self.backups > 0:
+            os.replace(self.path, self.path + '.1')
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, 'a')
+
+    def stop(self):
+        """
+        Write remaining events and wait for the thread to end
+
+        Number of dropped events is written as the last event.
+        """
+        if self.dropped:
+            self.queue.append({'event': 'dropped', 'time': time.time(),
+                               'count': self.dropped})
+        self._stopping.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        elif not self.file.closed:
+            self.write_batch()
+            self.sync()
+            self.file.close()
+
+
+class Session:
+    """
+    Metrics of one game
+
+    Attributes:
+        rounds (int): the last reached round
+        destroyed (collections.Counter): numbers of destroyed asteroids keyed
+            by their levels
+        deaths (int): number of lost ships
+        frames (list): histogram of frame times, see `FRAME_BUCKET`
+        longest (float): the longest frame time in milliseconds
+
+    """
+    def __init__(self):
+        self.started = time.time()
+        self.rounds = 0
+        self.destroyed = collections.Counter()
+        self.deaths = 0
+        self.frames = [0] * FRAME_BUCKETS
+        self.longest = 0.0
+
+    def frame(self, frame_time_ms):
+        """
+        Count frame which took `frame_time_ms` milliseconds
+        """
+        self.frames[min(int(frame_time_ms / FRAME_BUCKET),
+                        FRAME_BUCKETS - 1)] += 1
+        if frame_time_ms > self.longest:
+            self.longest = frame_time_ms
+
+    def percentile(self, percent):
+        """
+        Return upper bound of frame time of `percent` percent of frames
+
+        Frames longer than the histogram are bounded by the longest frame.
+
+        Returns:
+            float: the time in milliseconds, 0.0 if no frame was counted
+
+        """
+        total = sum(self.frames)
+        if not total:
+            return 0.0
+        needed = percent * total / 100
+        counted = 0
+        for bucket, count in enumerate(self.frames):
+            counted += count
+            if counted >= needed:
+                break
+        if bucket == FRAME_BUCKETS - 1:
+            return self.longest
+        return min((bucket + 1) * FRAME_BUCKET, self.longest)
+
+    def summary(self, **fields):
+        """
+        Return the session as event, `fields` are added to it
+        """
+        summary = {
+                'event': 'session',
+                'time': time.time(),
+                'duration': time.time() - self.started,
+                'rounds': self.rounds,
+                'destroyed': {str(level): count for level, count
+                              in sorted(self.destroyed.items())},
+                'deaths': self.deaths,
+                'frames': sum(self.frames),
+                'frame_ms': {'p{}'.format(percent): self.percentile(percent)
+                             for percent in PERCENTILES},
+                'longest_frame_ms': self.longest,
+        }
+        summary.update(fields)
+        return summary
+
+
+def enable(path):
+    """
+    Start the writer thread
+
+    Returns:
+        Writer: the new writer, None if the file can not be opened
+
+    """
+    global writer
+    try:
+        writer = Writer(path)
+    except OSError:
+        writer = None
+        return None
+    writer.start()
+    return writer
+
+
+def disable():
+    """
+    Stop the writer, queued events are written before it ends
+    """
+    global writer
+    end_session(finished=False)
+    if writer is not None:
+        writer.stop()
+    writer = None
+
+
+def event(kind, **fields):
+    """
+    Queue event `kind` with `fields` if telemetry is enabled
+    """
+    if writer is not None:
+        fields['event'] = kind
+        fields['time'] = time.time()
+        writer.put(fields)
+
+
+def start_session():
+    """
+    Start collecting metrics of a game if telemetry is enabled
+    """
+    global session
+    session = Session() if writer is not None else None
+
+
+def end_session(**fields):
+    """
+    Queue summary of the running session with `fields` and end it
+    """
+    global session
+    if session is not None and writer is not None:
+        writer.put(session.summary(dropped=writer.dropped, **fields))
+    session = None
@@ -2,21 +2,33 @@
 Top class and useful tools
 
 Module contain Control class, that control program and information flow. In
-this class is the main loop. Besides that other useful tools such as timer and
-loading loading function can be found here.
+this class is the main loop. Besides that other useful tools such as loading
+functions can be found here.
 
 Attributes:
-    TIME_PER_UPDATE (int): Delay (in milliseconds) between updates during
-        program. This variable specifies the FPS of the program.
+    TICK_RATE (int): number of simulation updates per second. Physics is
+        expressed in per-second units, so it can be changed without changing
+        the gameplay.
+    TIME_PER_UPDATE (float): Delay (in milliseconds) between updates during
+        program.
+    TIME_STEP (float): Delay (in seconds) between updates, time step of the
+        physics.
+    MAX_IDLE_WAIT (int): the longest wait (in milliseconds) for an event
+        while the active state is idle.
 
 """
 
 import os
+import time
 import pygame as pg
 
-from data import state_machine
+from data import (allocations, audio, inputs, state_machine, surfaces,
+                  telemetry, tracing)
 
-TIME_PER_UPDATE = 16
+TICK_RATE = 60
+TIME_PER_UPDATE = 1000 / TICK_RATE
+TIME_STEP = 1 / TICK_RATE
+MAX_IDLE_WAIT = 1000
 
 
 class Control:
@@ -38,6 +50,10 @@ class Control:
         now (int): time of updating states
         state_machine (state_machine.StateMachine): control class that notify
             all states
+        governor (quality.Governor): governor of quality of visual effects,
+            None if quality is fixed
+        soak (data.soak.Soak): driver of soak run, it ends the loop when the
+            run is finished. None outside of soak run
     """
     def __init__(self, caption):
         self.screen = pg.display.get_surface()
@@ -47,134 +63,110 @@ class Control:
         self.fps = 60.0  #: programs fps
         self.now = 0.0
         self.state_machine = state_machine.StateMachine()
+        self.governor = None
+        self.soak = None
+        self._waited = None
+        inputs.allow_events()
 
+    @tracing.traced
     def update(self):
         """
-        Notify EventManager to update active state.
+        Notify EventManager to update active state and play sounds
+        triggered during the update.
 
         End main loop if StateMachine quit.
         """
         self.now = pg.time.get_ticks()
         self.state_machine.update(self.now)
+        if audio.engine is not None:
+            audio.engine.flush()
         if self.state_machine.quit or self.state_machine.done:
             self.done = True
 
+    @tracing.traced
     def draw(self):
         """
         Make StateMachine to notify active state to draw itself
         """
-        if not self.state_machine.quit and not self.state_machine.done:
-            self.state_machine.draw(self.screen)
+        if self.state_machine.quit or self.state_machine.done:
+            return
+        if not self.state_machine.draw(self.screen):
+            return
+        with tracing.span('pg.display.flip'):
             pg.display.flip()
+        if surfaces.audit is not None:
+            surfaces.audit.end_frame()
+        if allocations.tracker is not None:
+            allocations.tracker.end_frame()
 
+    @tracing.traced
     def event_loop(self):
         """
         Make StateMachine to notify active state about key events
+
+        Keyboard state is sampled once here, all updates of the frame use
+        the same `inputs.current`. Event that ended `wait` goes first.
         """
-        for event in pg.event.get():
+        events = pg.event.get()
+        if self._waited is not None:
+            events.insert(0, self._waited)
+            self._waited = None
+        for event in events:
             if event.type == pg.QUIT:
                 self.done = True
             self.state_machine.get_event(event)
+        inputs.sample()
 
-    def main(self):
+    def wait(self):
         """
-        Main loop for entire program.
-
-        Generate all action, update program more then once.
+        Sleep until the next event or the nearest scheduled call of states,
+        but at most `MAX_IDLE_WAIT`
         """
-        lag = 0.0
-        while not self.done:
-            lag += self.clock.tick(self.fps)
-            self.event_loop()
-            while lag >= TIME_PER_UPDATE:
-                self.update()
-                lag -= TIME_PER_UPDATE
-            self.draw()
-
-
-class Timer:
-    """
-    Very simple timer
-
-    Timer call callback when delay is higher then given limit. Timer have to be
-    initialized first. See `check_tick`.
-
-    Note:
-        `__init__` method doesn't fully initialize the class, see `check_tick`.
-    Args:
-        delay (int): minimal delay (in milliseconds) between callback calls.
-        callback (function): specify a function of one argument. The
-            argument (int) is the number of calls before.
-        ticks (int): maximum callback calls. If `ticks` is set to -1, this
-            mechanic is disabled. If `ticks` is set to 0, timer disable
-            itself (see `check_tick`).
-        init_callback (bool): if True, first `check_tick` also run the callback
-            as if the timer was already initialized (see `check_ticks`).
-
-    Attributes:
-        tick_count (int): store number of previously called callbacks
-        timer (int): time when last callback was used
-        done (bool): determine if class is done or not
-
-    """
-    def __init__(self, delay, callback, ticks=-1, init_callback=False):
-        self.delay = delay
-        self.ticks = ticks
-        self.tick_count = 0
-        self.timer = None
-        self.done = False
-        self.init_callback = init_callback
-        self.callback = callback
+        timeout = MAX_IDLE_WAIT
+        deadline = self.state_machine.next_deadline()
+        if deadline is not None:
+            timeout = min(timeout, deadline - pg.time.get_ticks())
+        event = pg.event.wait(max(1, timeout))
+        if event.type != pg.NOEVENT:
+            self._waited = event
 
-    def check_tick(self, now):
+    def main(self):
         """
-        Check if time delay is sufficient to call the callback
-
-        When first called, class initiate itself and doesn't call the callback.
-        This behavior can be changed by `init_callback` argument in __init__.
-        If delay between last call is big enought, callback is called. Callback
-        is called always once even if delay is big enougt.
+        Main loop for entire program.
 
-        Args:
-            now (int): actual time
+        Generate all action, update program more then once. Time of work on
+        each frame is measured for `governor`, `telemetry.session` and
+        `soak`.
 
+        While the active state is idle, the loop sleeps in `wait` instead of
+        running at full rate and makes one update after waking up.
         """
-        if self.ticks == 0:
-            self.done = True
-        elif not self.timer and not self.done:
-            self.timer = now
-            if self.init_callback:
-                self.tick_count += 1
-                self.callback(self.tick_count)
-        elif not self.done and self.delay <= now - self.timer:
-            self.tick_count += 1
-            self.timer = now
-            self.callback(self.tick_count)
-            if self.tick_count >= self.ticks and self.ticks is not -1:
+        lag = 0.0
+        while not self.done:
+            if self.state_machine.idle:
+                with tracing.span('Control.wait'):
+                    self.wait()
+                self.clock.tick()
+                lag = TIME_PER_UPDATE
+            else:
+                with tracing.span('Control.tick'):
+                    lag += self.clock.tick(self.fps)
+            start = time.perf_counter()
+            with tracing.span('frame'):
+                self.event_loop()
+                while lag >= TIME_PER_UPDATE:
+                    self.update()
+                    lag -= TIME_PER_UPDATE
+                self.draw()
+            frame_time = (time.perf_counter() - start) * 1000
+            if self.governor is not None:
+                self.governor.record(frame_time)
+            if telemetry.session is not None:
+                telemetry.session.frame(frame_time)
+            if self.soak is not None and self.soak.frame(frame_time):
                 self.done = True
 
 
-def _gtx_value_fce(colorkey, fullpath):
-    """
-    Load image file by given path and turn it into pygame Surface
-
-    If image doesn't have alpha, it is created with given `colorkey`.
-
-    Args:
-        colorkey (:obj:`list` of :obj:`int`): color to be transparent
-        fullpath(str): path to image
-
-    Returns:
-        pygame.Surface: surface with enabled alpha
-
-    """
-    img = pg.image.load(fullpath)
-    if img.get_alpha():
-        return img.convert_alpha()
-    else:
-        return img.convert().set_colorkey(colorkey)
-
-
 def _get_paths_with_filter(directory, accept, fce=None):
     """
     Return a dict of objects made using filepaths from specified directory
@@ -240,9 +232,10 @@ def load_all_gtx(directory, accept=('.png'), colorkey=(255, 0, 255)):
     Return directory of loaded images
 
     The function is modification of `_get_paths_with_filter`. For more details
-    see its documentation. For more information about dict values see
-    `_gtx_value_fce`.
+    see its documentation. Images are loaded in the display format, see
+    `surfaces.load`.
     """
     return _get_paths_with_filter(directory,
                                   accept,
-                                  fce=lambda x: _gtx_value_fce(colorkey, x))
+                                  fce=lambda x: surfaces.load(x, colorkey,
+                                                              owner='GTX'))
@@ -0,0 +1,137 @@
+"""
+Spans of frame phases exported as Chrome trace events
+
+Functions decorated by `traced` and blocks in `span` are recorded as spans
+(complete events with start and duration) into in-memory buffer of `tracer`.
+Nested spans nest in the viewer. Buffer is exported as Chrome trace-event
+JSON, that can be opened in Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+When tracing is disabled, decorated function only checks that `tracer` is
+None.
+
+Attributes:
+    BUFFER_SIZE (int): maximum number of kept spans, the oldest are dropped
+    tracer (Tracer): tracer of the current run, None if tracing is disabled
+
+"""
+
+import collections
+import contextlib
+import functools
+import json
+import os
+import time
+
+BUFFER_SIZE = 1000000
+
+tracer = None
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    """
+    Context manager that records one span into tracer
+    """
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.spans.append((self.name, self.start,
+                                  time.perf_counter_ns() - self.start))
+        return False
+
+
+class Tracer:
+    """
+    Buffer of recorded spans
+
+    Args:
+        buffer_size (int): maximum number of kept spans
+
+    Attributes:
+        spans (collections.deque): tuples (name, start, duration), times are
+            in nanoseconds
+
+    """
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self.spans = collections.deque(maxlen=buffer_size)
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name):
+        """
+        Return context manager that records span `name`
+        """
+        return _Span(self, name)
+
+    def events(self):
+        """
+        Return spans as list of Chrome trace events (in microseconds)
+        """
+        origin = self.origin
+        pid = os.getpid()
+        return [{'name': name, 'ph': 'X', 'pid': pid, 'tid': 0,
+                 'ts': (start - origin) / 1000, 'dur': duration / 1000}
+                for name, start, duration in self.spans]
+
+    def export(self, path):
+        """
+        Write spans into JSON file in Chrome trace-event format
+        """
+        with open(path, 'w') as output:
+            json.dump({'traceEvents': self.events(),
+                       'displayTimeUnit': 'ms'}, output)
+
+
+def enable(buffer_size=BUFFER_SIZE):
+    """
+    Start recording spans
+
+    Returns:
+        Tracer: the new tracer
+
+    """
+    global tracer
+    tracer = Tracer(buffer_size)
+    return tracer
+
+
+def disable():
+    """
+    Stop recording spans and drop the tracer
+    """
+    global tracer
+    tracer = None
+
+
+def span(name):
+    """
+    Return context manager that records span `name` if tracing is enabled
+    """
+    if tracer is None:
+        return _NO_SPAN
+    return _Span(tracer, name)
+
+
+def traced(function):
+    """
+    Decorator that records every call of the function as a span
+
+    Span is named by qualified name of the function.
+    """
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if tracer is None:
+            return function(*args, **kwargs)
+        with _Span(tracer, name):
+            return function(*args, **kwargs)
+    return wrapper
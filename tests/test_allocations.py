@@ -0,0 +1,88 @@
+"""
+Testing of allocations module.
+"""
+
+import inspect
+import unittest
+
+from data import allocations
+
+
+class Allocator:
+    """
+    Class whose method keeps allocated objects.
+    """
+    def __init__(self):
+        self.kept = []
+
+    def allocate(self):
+        self.kept.append([object() for i in range(100)])
+
+
+class Ticker:
+    """
+    Class whose method makes a tuple every tick and keeps none.
+    """
+    def tick(self, ticks):
+        for i in range(ticks):
+            corners = (i,) * 32
+        return corners[0]
+
+
+class TestAllocationTracker(unittest.TestCase):
+    """
+    Tests of AllocationTracker class.
+    """
+    def setUp(self):
+        self.tracker = allocations.enable(top=3)
+
+    def tearDown(self):
+        allocations.disable()
+
+    def test_allocations_are_attributed_to_lines_and_classes(self):
+        """
+        Allocations inside phase are counted per frame by line and class
+        """
+        allocator = Allocator()
+        for i in range(2):
+            with allocations.phase(('GAME', 'update')):
+                with allocations.phase(('GAME', 'nested')):
+                    allocator.allocate()
+            self.tracker.end_frame()
+
+        self.assertEqual(2, self.tracker.frames)
+        self.assertEqual([('GAME', 'update')], list(self.tracker.peaks))
+        (phase, filename, lineno), size = self.tracker.size.most_common(1)[0]
+        self.assertEqual(('GAME', 'update'), phase)
+        self.assertEqual('Allocator', self.tracker.owner(filename, lineno))
+        self.assertGreaterEqual(self.tracker.blocks[phase, filename, lineno],
+                                200)
+        self.assertIn('Allocator', self.tracker.report())
+
+    def test_transient_allocations_are_attributed(self):
+        """
+        Tuple made and dropped every tick shows under its line and class,
+        although nothing is kept after the phase
+        """
+        ticker = Ticker()
+        with allocations.phase(('GAME', 'update')):
+            ticker.tick(100)
+        self.tracker.end_frame()
+
+        lines, first = inspect.getsourcelines(Ticker.tick)
+        lineno = first + lines.index('            corners = (i,) * 32\n')
+        key = (('GAME', 'update'), __file__, lineno)
+        self.assertEqual(0, self.tracker.size[key])
+        self.assertGreaterEqual(self.tracker.transient[key],
+                                50 * 32 * 8)
+        self.assertEqual('Ticker', self.tracker.owner(__file__, lineno))
+        self.assertIn('corners = (i,) * 32', self.tracker.report())
+
+    def test_phase_is_noop_when_disabled(self):
+        """
+        Without tracker, phase returns reusable empty context manager
+        """
+        allocations.disable()
+        self.assertIs(allocations.phase(('GAME', 'draw')),
+                      allocations.phase(('GAME', 'update')))
+        allocations.enable()
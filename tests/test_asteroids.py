@@ -2,16 +2,22 @@
 Testing of asteroid package.
 """
 
+import gc
+import tracemalloc
 import unittest
+from unittest.mock import patch
+import numpy as np
 from pygame import Surface
 
-from data import prepare
-from data.components import asteroids
+from data import prepare, tools
+from data.components import asteroids, ecs
 
 FAKE_GTX = {
         'asteroid': Surface((1, 1))  # fake asteroid image
 }
 FRAGMENTS = 3
+DT = tools.TIME_STEP
+TICKS = 1000
 
 
 class TestAsteroids(unittest.TestCase):
@@ -58,3 +64,95 @@ class TestAsteroids(unittest.TestCase):
                     else:
                         self.assertEqual(0, fragments)
             self.assertEqual(0, len(self.group))
+
+
+class TestVectorAsteroids(unittest.TestCase):
+    """
+    Tests of AsteroidsGroup with vector asteroids.
+    """
+    @classmethod
+    def setUpClass(self):
+        asteroids.prepare.GTX = FAKE_GTX
+        asteroids.FRAGMENTS = (FRAGMENTS, FRAGMENTS)
+
+    def setUp(self):
+        self.world = ecs.World()
+        self.group = asteroids.AsteroidsGroup(self.world, vector=True)
+
+    def test_fragments_split_outline(self):
+        """
+        Fragments are wedges of the outline, they have no images
+        """
+        self.group.create_asteroids(1, 1, (400, 400))
+        rock = self.group.sprites()[0]
+        self.assertIsNone(rock.image)
+        self.assertEqual(0, len(self.world.render_layers))
+        rock.kill()
+        self.assertEqual(FRAGMENTS, len(self.group))
+        for fragment in self.group:
+            self.assertEqual(2, fragment.level)
+            self.assertLessEqual(fragment.bounding, rock.bounding)
+            self.assertIsNone(fragment.image)
+
+    def test_hulls_decide_collisions(self):
+        """
+        Diamonds whose rects overlap collide only if their hulls overlap
+        """
+        diamond = np.array(((20, 0), (0, -20), (-20, 0), (0, 20)),
+                           dtype=float)
+        first = self.group.new_asteroid(2, (400, 400), diamond)
+        second = self.group.new_asteroid(2, (430, 430), diamond)
+        self.group.add(first, second)
+        self.assertTrue(first.rect.colliderect(second.rect))
+        self.assertNotIn((first, second), self.pairs())
+
+        second.x = second.y = 415
+        second.update_rect()
+        self.assertIn((first, second), self.pairs())
+
+    def pairs(self):
+        return self.world.collisions(asteroids.COLLIDER, asteroids.COLLIDER)
+
+
+class TestSteadyUpdate(unittest.TestCase):
+    """
+    Allocation regression test of moving asteroids.
+    """
+    @classmethod
+    def setUpClass(self):
+        asteroids.prepare.GTX = {'asteroid': Surface((40, 40))}
+
+    def setUp(self):
+        self.world = ecs.World()
+        self.group = asteroids.AsteroidsGroup(self.world)
+        self.group.create_asteroids(20, 2)
+        self.asteroids = self.group.sprites()
+        for i in range(10):
+            self.tick()
+
+    def tick(self):
+        self.world.step(DT)
+        for asteroid in self.asteroids:
+            asteroid.update(DT)
+
+    def test_steady_tick_allocates_nothing(self):
+        """
+        Steady tick leaves no new objects and skips allocating helpers
+        """
+        with patch.object(asteroids.Asteroid, 'update_image') as image, \
+                patch.object(asteroids.Asteroid, 'get_position') as pos:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                self.tick()
+                memory = tracemalloc.get_traced_memory()[0]
+                for i in range(TICKS):
+                    self.tick()
+                # less than a byte per tick, pygame and freelists may keep
+                # few blocks once
+                self.assertLess(tracemalloc.get_traced_memory()[0] - memory,
+                                TICKS)
+            finally:
+                tracemalloc.stop()
+        image.assert_not_called()
+        pos.assert_not_called()
@@ -0,0 +1,83 @@
+"""
+Testing of atlas module.
+"""
+
+import unittest
+import pygame as pg
+
+from data import atlas
+from data.components import components
+
+COLORS = [(255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 128)]
+
+
+class AtlasSprite(components._MovingSprite):
+    """
+    Sprite whose image is taken from atlas by its color.
+    """
+    def region(self):
+        return atlas.lookup(self.color)
+
+
+class TestAtlas(unittest.TestCase):
+    """
+    Tests of Atlas class and drawing sprites from it.
+    """
+    def setUp(self):
+        self.images = {}
+        for index, color in enumerate(COLORS):
+            image = pg.Surface((30 + index * 10, 20 + index * 15), pg.SRCALPHA)
+            image.fill(color)
+            self.images[color] = image
+        self.atlas = atlas.Atlas(page_size=(64, 64))
+        self.atlas.pack(self.images)
+
+    def tearDown(self):
+        atlas.current = None
+
+    def test_images_are_copied_without_overlap(self):
+        """
+        Every image has own area with exact copy of its pixels
+        """
+        self.assertEqual(len(COLORS), len(self.atlas))
+        regions = [self.atlas[color] for color in COLORS]
+        for i, region in enumerate(regions):
+            self.assertEqual(self.images[COLORS[i]].get_size(),
+                             region.area.size)
+            self.assertEqual(COLORS[i], region.surface.get_at((0, 0)))
+            self.assertEqual(COLORS[i], region.page.get_at(
+                    (region.area.right - 1, region.area.bottom - 1)))
+            for other in regions[i + 1:]:
+                if other.page is region.page:
+                    self.assertFalse(region.area.colliderect(other.area))
+
+    def test_sprite_uses_region(self):
+        """
+        Sprite with pre-baked image draws an area of the atlas page
+        """
+        atlas.current = self.atlas
+        sprite = AtlasSprite(pg.Surface((5, 5)), (100, 100))
+        sprite.update_color(COLORS[1])
+        sprite.update_image()
+        region = self.atlas[COLORS[1]]
+        self.assertIs(region.page, sprite.image)
+        self.assertEqual(region.area, sprite.area)
+        self.assertEqual(region.area.size, sprite.rect.size)
+        self.assertEqual((100, 100), sprite.rect.center)
+
+        sprite.update_color((1, 2, 3))
+        sprite.update_image()
+        self.assertIsNone(sprite.area)
+        self.assertEqual((5, 5), sprite.image.get_size())
+
+    def test_opaque_images_get_pages_without_alpha(self):
+        """
+        Opaque bakers are packed into own pages without per-pixel alpha
+        """
+        built = atlas.build(lambda: self.images,
+                            opaque=(lambda: {'opaque': pg.Surface((8, 8))},))
+        opaque = built['opaque']
+        self.assertFalse(opaque.page.get_flags() & pg.SRCALPHA)
+        for color in COLORS:
+            self.assertIsNot(opaque.page, built[color].page)
+            self.assertTrue(built[color].page.get_flags() & pg.SRCALPHA)
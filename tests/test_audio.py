@@ -0,0 +1,101 @@
+"""
+Testing of audio module.
+"""
+
+import unittest
+
+from data import audio
+
+
+class FakeChannel:
+    """
+    Channel that plays until `finish` is called.
+    """
+    def __init__(self):
+        self.sound = None
+        self.plays = 0
+
+    def play(self, sound):
+        self.sound = sound
+        self.plays += 1
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def get_busy(self):
+        return self.sound is not None
+
+    def stop(self):
+        self.sound = None
+
+    finish = stop
+
+
+class TestAudioEngine(unittest.TestCase):
+    """
+    Tests of AudioEngine class.
+    """
+    def setUp(self):
+        self.channels = [FakeChannel() for i in range(4)]
+        names = (audio.LASER, audio.BREAK, audio.THRUST, audio.EXPLOSION)
+        self.engine = audio.AudioEngine({name: name for name in names},
+                                        self.channels)
+
+    def playing(self, name):
+        return sum(channel.sound == name for channel in self.channels)
+
+    def test_burst_is_merged_into_one_voice(self):
+        """
+        Identical triggers of one tick start one voice with the loudest volume
+        """
+        for i in range(40):
+            self.engine.play(audio.BREAK, volume=i / 40)
+        self.assertEqual(1, self.engine.flush())
+        self.assertEqual(1, self.playing(audio.BREAK))
+        self.assertEqual(39 / 40, self.channels[0].volume)
+        self.assertEqual(0, self.engine.flush())
+
+    def test_voice_limit(self):
+        """
+        Sound at its limit restarts its oldest voice or waits for its end
+        """
+        limit = audio.VOICES[audio.LASER][0]
+        for i in range(limit + 2):
+            self.engine.play(audio.LASER)
+            self.engine.flush()
+        self.assertEqual(limit, self.playing(audio.LASER))
+        self.assertEqual(2, self.channels[0].plays)
+
+        for i in range(3):
+            self.engine.play(audio.THRUST)
+            self.engine.flush()
+        self.assertEqual(1, self.playing(audio.THRUST))
+        self.assertEqual(2, self.engine.dropped)
+
+    def test_higher_priority_steals_voice(self):
+        """
+        Full pool gives the lowest priority voice to more important sound
+        """
+        self.engine.play(audio.THRUST)
+        self.engine.flush()
+        for name in (audio.BREAK, audio.LASER, audio.LASER):
+            self.engine.play(name)
+            self.engine.flush()
+        self.assertNotIn(None, [channel.sound for channel in self.channels])
+
+        self.engine.play(audio.EXPLOSION)
+        self.engine.flush()
+        self.assertEqual(0, self.playing(audio.THRUST))
+        self.assertEqual(1, self.playing(audio.EXPLOSION))
+
+        self.engine.play(audio.THRUST)
+        self.engine.flush()
+        self.assertEqual(0, self.playing(audio.THRUST))
+        self.assertEqual(1, self.engine.dropped)
+
+    def test_unknown_sound_is_ignored(self):
+        """
+        Triggers of sounds that were not loaded are ignored
+        """
+        self.engine.play('missing')
+        self.assertEqual(0, self.engine.flush())
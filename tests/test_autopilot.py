@@ -0,0 +1,103 @@
+"""
+Testing of autopilot module.
+"""
+
+import random
+import unittest
+from pygame import K_LEFT, K_RIGHT, K_UP, Surface
+
+from data import inputs, scheduler, tools
+from data.components import asteroids, autopilot, ecs, ship
+
+FAKE_GTX = {
+        'asteroid': Surface((64, 64)),  # fake asteroid image
+        'ship': Surface((4, 4)),  # fake ship image
+}
+DT = tools.TIME_STEP
+
+
+class Keys(dict):
+    """
+    Keyboard state with given pressed keys
+    """
+    def __missing__(self, key):
+        return False
+
+
+class TestAutopilot(unittest.TestCase):
+    """
+    Tests of Autopilot class.
+    """
+    @classmethod
+    def setUpClass(self):
+        asteroids.prepare.GTX = FAKE_GTX
+
+    def setUp(self):
+        random.seed(1)
+        self.scheduler = scheduler.Scheduler()
+        self.world = ecs.World()
+        self.asteroids = asteroids.AsteroidsGroup(self.world)
+        self.pilot = autopilot.Autopilot(self.asteroids)
+        self.ship = ship.Ship(self.scheduler, self.world, pilot=self.pilot)
+        ship.PlayerGroup(self.world).add(self.ship)
+
+    def place(self, x, y):
+        asteroid = self.asteroids.new_asteroid(2, (x, y))
+        asteroid.x, asteroid.y = x, y
+        asteroid.dx = asteroid.dy = 0
+        asteroid.update_rect()
+        self.asteroids.add(asteroid)
+        return asteroid
+
+    def test_no_target(self):
+        """
+        Without asteroids the pilot does nothing
+        """
+        self.assertEqual(inputs.IDLE, self.pilot.command(self.ship))
+
+    def test_turns_toward_target_and_fires(self):
+        """
+        The ship turns to the side of the target and fires when it points
+        at it, then waits `FIRE_INTERVAL` updates
+        """
+        self.place(self.ship.x, self.ship.y + 300)  # below, ship points up
+        command = self.pilot.command(self.ship)
+        self.assertIn(command.turn, (ship.Ship.LEFT, ship.Ship.RIGHT))
+        self.assertFalse(command.fire)
+
+        shots = []
+        for i in range(3 * tools.TICK_RATE):
+            self.ship.update(DT)
+            shots.append(len(self.ship.ship_lasers))
+            self.world.step(DT)
+        self.assertAlmostEqual(270, self.ship.rotation,
+                               delta=autopilot.AIM_TOLERANCE)
+        self.assertGreater(max(shots), 0)
+
+    def test_thrusts_toward_distant_target(self):
+        """
+        Aimed ship accelerates toward target farther than
+        `THRUST_DISTANCE`
+        """
+        self.place(self.ship.x, self.ship.y - autopilot.THRUST_DISTANCE * 2)
+        command = self.pilot.command(self.ship)
+        self.assertEqual(0, command.turn)
+        self.assertTrue(command.thrust)
+        self.assertTrue(command.fire)
+
+
+class TestKeyboard(unittest.TestCase):
+    """
+    Tests of keyboard pilot.
+    """
+    def tearDown(self):
+        inputs.current = inputs.KeySnapshot(0, inputs._Released())
+
+    def test_opposite_keys_cancel(self):
+        """
+        Left and right keys together don't turn the ship
+        """
+        keys = Keys({K_LEFT: True, K_RIGHT: True, K_UP: True})
+        inputs.current = inputs.KeySnapshot(1, keys)
+        self.assertEqual(inputs.Command(0, True, False),
+                         inputs.Keyboard().command(ship.Ship))
@@ -0,0 +1,117 @@
+"""
+Testing of broadphase module.
+"""
+
+import random
+import unittest
+from pygame import Surface
+
+from data.components import broadphase, components
+
+
+def circle(position, size, dx=0, dy=0):
+    sprite = components._MovingSprite(Surface((size, size)), position)
+    sprite.dx, sprite.dy = dx, dy
+    return sprite
+
+
+class TestSweepAndPrune(unittest.TestCase):
+    """
+    Tests of SweepAndPrune class.
+    """
+    def setUp(self):
+        self.sweep = broadphase.SweepAndPrune()
+
+    def test_pairs_match_brute_force(self):
+        """
+        Reported pairs are the same as pairs found by testing every pair
+        """
+        random.seed(1)
+        sprites = [circle((random.uniform(0, 300), random.uniform(0, 300)),
+                          random.choice((4, 8, 16)))
+                   for i in range(100)]
+        for sprite in sprites:
+            self.sweep.add(sprite)
+        for sprite in sprites[::3]:
+            self.sweep.remove(sprite)
+        alive = [sprite for sprite in sprites if sprite in self.sweep.members]
+
+        expected = {frozenset((first, second))
+                    for i, first in enumerate(alive)
+                    for second in alive[i + 1:]
+                    if first.rect.colliderect(second.rect)}
+        found = {frozenset(pair) for pair in self.sweep.pairs()}
+        self.assertTrue(expected)
+        self.assertEqual(expected, found)
+        self.assertEqual(len(alive), len(self.sweep.order))
+
+    def test_queries_match_brute_force(self):
+        """
+        Radius and nearest queries find the same members as full scans
+        """
+        random.seed(2)
+        sprites = [circle((random.uniform(0, 600), random.uniform(0, 300)),
+                          random.choice((4, 8, 16, 32)))
+                   for i in range(200)]
+        for sprite in sprites:
+            self.sweep.add(sprite)
+        for sprite in sprites[::4]:
+            self.sweep.remove(sprite)
+        alive = [sprite for sprite in sprites if sprite in self.sweep.members]
+
+        def distance(sprite, x, y):
+            return ((sprite.x - x) ** 2 + (sprite.y - y) ** 2) ** 0.5
+
+        for x, y in ((0, 0), (300, 150), (590, 10), (-50, 400)):
+            expected = {sprite for sprite in alive
+                        if distance(sprite, x, y) < 40 + sprite.radius}
+            self.assertEqual(expected, set(self.sweep.within(x, y, 40)))
+
+            nearest = min(alive,
+                          key=lambda sprite: distance(sprite, x, y) -
+                          sprite.radius)
+            found, gap = self.sweep.nearest(x, y)
+            self.assertAlmostEqual(distance(nearest, x, y) - nearest.radius,
+                                   gap)
+        self.assertEqual((None, 1),
+                         broadphase.SweepAndPrune().nearest(0, 0, 1))
+
+    def test_nearest_after_removals(self):
+        """
+        Nearest member is found when removals are pending since the last
+        sorting and a member was added after them
+        """
+        sprites = [circle((i * 50, 0), 8) for i in range(10)]
+        for sprite in sprites:
+            self.sweep.add(sprite)
+        self.sweep.pairs()
+        self.sweep.remove(sprites[0])
+        self.sweep.remove(sprites[1])
+        added = circle((800, 0), 8)
+        self.sweep.add(added)
+        found, gap = self.sweep.nearest(1000, 0)
+        self.assertIs(added, found)
+        self.assertAlmostEqual(200 - added.radius, gap)
+
+    def test_bounce_keeps_momentum(self):
+        """
+        Approaching circles bounce, momentum stays, separating ones don't
+        """
+        components.ENERGY_REMAINS = 1
+        left = circle((100, 100), 10, dx=50, dy=10)
+        right = circle((108, 100), 20, dx=-20)
+        self.sweep.add(left)
+        self.sweep.add(right)
+        mass = [sprite.radius ** 2 for sprite in (left, right)]
+
+        def momentum():
+            return (mass[0] * left.dx + mass[1] * right.dx,
+                    mass[0] * left.dy + mass[1] * right.dy)
+
+        before = momentum()
+        self.assertEqual(1, self.sweep.bounce())
+        for expected, value in zip(before, momentum()):
+            self.assertAlmostEqual(expected, value)
+        self.assertLess(left.dx, 0)
+        self.assertEqual(10, left.dy)
+        self.assertEqual(0, self.sweep.bounce())
@@ -6,10 +6,12 @@ import unittest
 from unittest.mock import patch
 from pygame import Surface
 
-from data import prepare
+from data import prepare, surfaces
 from data.components import components
 
 FRAMES = 50
+DT = 1 / 60
+LIFETIME = FRAMES * DT
 
 # changes in acceleration each update
 ACCELERATION_STEPS = [
@@ -34,7 +36,7 @@ class FrameBasedSprite(components._FrameBasedSprite):
     """
     Child of uninstantiable _FrameBasedSprite.
     """
-    def make_changes(self, frame):
+    def make_changes(self, dt):
         pass
 
 
@@ -44,7 +46,7 @@ class TestFrameBasedSprite(unittest.TestCase):
     """
     def setUp(self):
         self.sprite = FrameBasedSprite(
-                FRAMES,
+                LIFETIME,
                 Surface((100, 100)),
                 prepare.SCREEN_RECT.center)
 
@@ -55,13 +57,14 @@ class TestFrameBasedSprite(unittest.TestCase):
         _FrameBasedSprite change every update, then it `kill()`s itself
         """
         for i in range(1, FRAMES):
-            self.sprite.update()
+            self.sprite.update(DT)
             self.assertEqual(i, len(mock_make_changes.call_args_list))
-            mock_make_changes.assert_called_with(i)
+            mock_make_changes.assert_called_with(DT)
+            self.assertAlmostEqual(i * DT, self.sprite.age)
         mock_make_changes.reset_mock()
         mock_kill.assert_not_called()
 
-        self.sprite.update()
+        self.sprite.update(DT)
         mock_kill.assert_called_once_with()
         mock_make_changes.assert_not_called()
 
@@ -82,12 +85,25 @@ class TestMovingSprite(unittest.TestCase):
         components.ENERGY_LOSS = 0
         self.sprite.dx, self.sprite.dy = 500, 500
         for i in range(10):
-            self.sprite.update()
+            self.sprite.update(1)
             for positions in zip(self.sprite.get_position(),
                                  prepare.SCREEN_SIZE):
                 self.assertGreaterEqual(positions[0], 0)
                 self.assertLessEqual(positions[0], positions[1])
 
+    def test_wrapping_around_the_edges(self):
+        """
+        Wrapped _MovingSprite stays in the screen even with huge velocity
+        """
+        self.sprite.wrap = True
+        self.sprite.dx, self.sprite.dy = 5000.5, -3333
+        x, y = self.sprite.get_position()
+        self.sprite.update(1)
+        self.assertAlmostEqual((x + 5000.5) % prepare.SCREEN_SIZE[0],
+                               self.sprite.x)
+        self.assertAlmostEqual((y + 3333) % prepare.SCREEN_SIZE[1],
+                               self.sprite.y)
+
     def test_acceleration(self):
         """
         _MovingSprite accelerate correctly
@@ -104,5 +120,86 @@ class TestMovingSprite(unittest.TestCase):
         initial_position = self.sprite.get_position()
         for step in SPEED_STEPS:
             self.sprite.dx, self.sprite.dy = step['dx'], step['dy']
-            self.sprite.update()
+            self.sprite.update(1)
         self.assertEqual(initial_position, self.sprite.get_position())
+
+
+class TestScaledImage(unittest.TestCase):
+    """
+    Tests of sprite images drawn at other scale.
+    """
+    def tearDown(self):
+        surfaces.set_scale(1)
+
+    def test_recolored_image_is_drawn(self):
+        """
+        Image filled with new color in place is drawn in the new color
+        """
+        surfaces.set_scale(0.5)
+        screen = Surface((8, 8))
+        sprite = FrameBasedSprite(LIFETIME, Surface((8, 8)), (4, 4))
+        for color in ((255, 0, 0), (0, 255, 0)):
+            sprite.update_color(color)
+            sprite.update_image()
+            surfaces.blit(screen, sprite.image, (0, 0))
+            self.assertEqual(color, tuple(screen.get_at((1, 1)))[:3])
+
+
+class TestSpritePool(unittest.TestCase):
+    """
+    Tests of SpritePool used by _FrameBasedSprite subclasses.
+    """
+    def setUp(self):
+        FrameBasedSprite.pool = components.SpritePool(capacity=1)
+
+    def tearDown(self):
+        surfaces.accountant = None
+
+    def spawn(self):
+        return FrameBasedSprite.spawn(LIFETIME, Surface((1, 1)), (0, 0))
+
+    def test_killed_sprite_is_reused(self):
+        """
+        Killed sprite is reinitialised by the next spawn
+        """
+        sprite = self.spawn()
+        for i in range(FRAMES):
+            sprite.update(DT)
+        self.assertEqual((0, 1), (FrameBasedSprite.pool.live,
+                                  FrameBasedSprite.pool.free_count))
+
+        self.assertIs(sprite, self.spawn())
+        self.assertEqual(0, sprite.age)
+        self.assertEqual((0, 0), sprite.get_position())
+        self.assertEqual((1, 0), (FrameBasedSprite.pool.live,
+                                  FrameBasedSprite.pool.free_count))
+
+    def test_capacity(self):
+        """
+        Pool keeps at most `capacity` sprites, double kill is ignored
+        """
+        sprites = [self.spawn() for i in range(3)]
+        for sprite in sprites + sprites:
+            sprite.kill()
+        self.assertEqual((0, 1), (FrameBasedSprite.pool.live,
+                                  FrameBasedSprite.pool.free_count))
+
+    def test_eviction_drops_oldest_released(self):
+        """
+        Exceeded surface budget drops sprites released the longest ago
+        """
+        pool = FrameBasedSprite.pool = components.SpritePool(capacity=3)
+        accountant = surfaces.enable_accounting()
+        accountant.add_evictor(pool.evict)
+        sprites = [FrameBasedSprite.spawn(LIFETIME, Surface((8, 8)), (0, 0))
+                   for i in range(3)]
+        for sprite in sprites:
+            sprite.kill()
+        released = [id(sprite) for sprite in sprites]
+        del sprites, sprite
+
+        accountant.budget = accountant.total - 1
+        accountant.evict()
+        self.assertEqual(released[1:], [id(sprite) for sprite in pool.free])
+        self.assertLessEqual(accountant.total, accountant.budget)
+        self.assertEqual(1, accountant.evictions)
@@ -0,0 +1,75 @@
+"""
+Testing of debris module.
+"""
+
+import random
+import unittest
+import pygame as pg
+
+from data import quality
+from data.components import debris
+
+
+class TestDebris(unittest.TestCase):
+    """
+    Tests of Debris class.
+    """
+    def setUp(self):
+        self.debris = debris.Debris(capacity=100)
+
+    def tearDown(self):
+        quality.current = quality.LEVELS[0]
+
+    def test_points_expire(self):
+        """
+        Points are removed after their lifetime, older points first
+        """
+        self.debris.burst((50, 50), 10)
+        self.debris.lifetime[:5] = 0.1
+        self.debris.update(0.05)
+        self.assertEqual(10, len(self.debris))
+        self.debris.update(0.05)
+        self.assertEqual(5, len(self.debris))
+        self.debris.update(debris.LIFETIME[1])
+        self.assertEqual(0, len(self.debris))
+
+    def test_full_layer_drops_oldest(self):
+        """
+        Burst over the capacity replaces the oldest points
+        """
+        self.debris.burst((0, 0), 80)
+        self.debris.burst((10, 10), 50)
+        self.assertEqual(100, len(self.debris))
+        self.assertEqual((0, 0), tuple(self.debris.position[49]))
+        self.assertEqual((10, 10), tuple(self.debris.position[50]))
+
+    def test_quality_and_random_numbers(self):
+        """
+        Lower quality bursts fewer points, bursts don't consume numbers of
+        the game random generator
+        """
+        random.seed(3)
+        quality.current = quality.LEVELS[-1]
+        self.assertEqual(10, self.debris.burst((0, 0), 100))
+        self.assertEqual(random.random(), random.Random(3).random())
+
+    def test_draw_blends_points(self):
+        """
+        New point is drawn in its color, fading point is blended with the
+        background, points out of the surface are skipped
+        """
+        for depth in (16, 32):
+            surface = pg.Surface((20, 20), 0, depth)
+            surface.fill((0, 0, 200))
+            self.debris.clear()
+            self.debris.burst((5, 5), 1, (250, 250, 0))
+            self.debris.burst((8, 8), 1, (250, 250, 0))
+            self.debris.burst((40, 5), 1)
+            self.debris.velocity[:3] = 0
+            self.debris.age[1] = self.debris.lifetime[1] / 2
+            self.debris.draw(surface)
+            for position, expected in (((5, 5), (250, 250, 0)),
+                                       ((8, 8), (125, 125, 100)),
+                                       ((19, 5), (0, 0, 200))):
+                for got, value in zip(surface.get_at(position), expected):
+                    self.assertAlmostEqual(value, got, delta=10)
@@ -0,0 +1,174 @@
+"""
+Testing of ecs module.
+"""
+
+import unittest
+from pygame import Surface
+
+from data import prepare
+from data.components import components, ecs
+
+FRAMES = 5
+DT = 0.1
+LIFETIME = FRAMES * DT
+COLLIDER = ecs.collider('test')
+
+
+class FrameBasedSprite(components._FrameBasedSprite):
+    """
+    Child of uninstantiable _FrameBasedSprite.
+    """
+    def make_changes(self, dt):
+        self.alpha = self.age * 100
+
+
+class Group(ecs.EntityGroup):
+    COMPONENTS = (ecs.TRANSFORM, ecs.VELOCITY, ecs.LIFETIME, ecs.ANIMATION,
+                  ecs.render(0), COLLIDER)
+
+
+class TestWorld(unittest.TestCase):
+    """
+    Tests of World class and EntityGroup.
+    """
+    def setUp(self):
+        self.world = ecs.World()
+        self.group = Group(self.world)
+        self.sprite = FrameBasedSprite(LIFETIME, Surface((2, 2)),
+                                       prepare.SCREEN_RECT.center)
+        self.group.add(self.sprite)
+
+    def test_systems_match_sprite_update(self):
+        """
+        World step moves and animates entity the same way as `update` does
+        """
+        twin = FrameBasedSprite(LIFETIME, Surface((2, 2)),
+                                prepare.SCREEN_RECT.center)
+        for sprite in (self.sprite, twin):
+            sprite.dx, sprite.dy = 3, -2
+        for i in range(FRAMES - 1):
+            self.world.step(DT)
+            twin.update(DT)
+        self.assertEqual(twin.get_position(), self.sprite.get_position())
+        self.assertEqual(twin.alpha, self.sprite.alpha)
+
+    def test_killed_entity_leaves_world(self):
+        """
+        Entity is removed from all tables at the end of its life
+        """
+        for i in range(FRAMES):
+            self.assertIn(self.sprite, self.world)
+            self.world.step(DT)
+        self.assertNotIn(self.sprite, self.world)
+        self.assertEqual(0, len(self.group))
+        self.assertTrue(all(not table for table
+                            in self.world.tables.values()))
+
+    def test_collisions(self):
+        """
+        Overlapping entities of two collider tables are reported as pairs
+        """
+        far = FrameBasedSprite(LIFETIME, Surface((2, 2)), (0, 0))
+        near = FrameBasedSprite(LIFETIME, Surface((2, 2)),
+                                prepare.SCREEN_RECT.center)
+        other_kind = ecs.collider('other')
+        self.world.add(far, (other_kind,))
+        self.world.add(near, (other_kind,))
+        self.assertEqual([(self.sprite, near)],
+                         self.world.collisions(COLLIDER, other_kind))
+
+
+class TestWrappedWorld(unittest.TestCase):
+    """
+    Tests of entities that wrap around the edges.
+    """
+    def setUp(self):
+        self.world = ecs.World()
+        self.group = Group(self.world, wrap=True)
+
+    def test_straddling_entity_collides_on_both_sides(self):
+        """
+        Entity overlapping the left edge hits entity at the right edge
+        """
+        edge = FrameBasedSprite(LIFETIME, Surface((10, 10)),
+                                (0, prepare.SCREEN_RECT.centery))
+        other = FrameBasedSprite(LIFETIME, Surface((10, 10)),
+                                 (prepare.SCREEN_RECT.right - 2,
+                                  prepare.SCREEN_RECT.centery))
+        self.group.add(edge)
+        self.world.add(other, (ecs.collider('other'),))
+        self.assertEqual([edge], list(self.world.straddling()))
+        self.assertEqual([(edge, other)],
+                         self.world.collisions(COLLIDER,
+                                               ecs.collider('other')))
+
+
+class TestSweptCollisions(unittest.TestCase):
+    """
+    Tests of swept collisions of fast entities.
+    """
+    def setUp(self):
+        self.world = ecs.World()
+        self.target = components._MovingSprite(Surface((4, 4)), (100, 100))
+        self.world.add(self.target, (ecs.collider('target'),))
+
+    def shoot(self, position, dx, dy):
+        shot = components._MovingSprite(Surface((2, 2)), position)
+        shot.dx, shot.dy = dx, dy
+        self.world.add(shot, (COLLIDER,))
+        return shot
+
+    def test_fast_entity_does_not_tunnel(self):
+        """
+        Entity that jumped over the circle during the step still hits it
+        """
+        shot = self.shoot((150, 101), 600, 0)
+        self.assertEqual([], self.world.collisions(COLLIDER,
+                                                   ecs.collider('target')))
+        self.assertEqual([(shot, self.target)],
+                         self.world.swept_collisions(COLLIDER,
+                                                     ecs.collider('target'),
+                                                     0.1))
+
+    def test_passing_entity_misses(self):
+        """
+        Entity whose path passes beside the circle does not hit it
+        """
+        self.shoot((150, 110), 600, 0)
+        self.assertEqual([],
+                         self.world.swept_collisions(COLLIDER,
+                                                     ecs.collider('target'),
+                                                     0.1))
+
+    def test_hits_are_ordered_along_the_path(self):
+        """
+        Circle met first along the path (from x = 90) is reported first
+        """
+        near = components._MovingSprite(Surface((4, 4)), (130, 100))
+        self.world.add(near, (ecs.collider('target'),))
+        shot = self.shoot((150, 100), 600, 0)
+        self.assertEqual([(shot, self.target), (shot, near)],
+                         self.world.swept_collisions(COLLIDER,
+                                                     ecs.collider('target'),
+                                                     0.1))
+
+    def test_fast_target_crossing_the_path(self):
+        """
+        Target that crossed the path earlier in the step, away from its
+        current position, is hit
+        """
+        self.target.dx = 600
+        shot = self.shoot((70, 130), 0, -600)
+        self.assertEqual([(shot, self.target)],
+                         self.world.swept_collisions(COLLIDER,
+                                                     ecs.collider('target'),
+                                                     0.1))
+
+    def test_sweep_circle(self):
+        """
+        Segment touching the circle returns the closest fraction
+        """
+        self.assertAlmostEqual(0.5, ecs.sweep_circle((0, 0), (10, 0),
+                                                     (5, 1), 2))
+        self.assertIsNone(ecs.sweep_circle((0, 0), (10, 0), (5, 3), 2))
+        self.assertEqual(0.0, ecs.sweep_circle((0, 0), (0, 0), (1, 0), 2))
@@ -0,0 +1,130 @@
+"""
+Testing of highscores module.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from data import highscores
+
+
+class TestHighScores(unittest.TestCase):
+    """
+    Tests of HighScores class.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'scores')
+        self.store = highscores.HighScores(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def reopen(self):
+        self.store.close()
+        self.store = highscores.HighScores(self.path)
+
+    def test_ranks_and_top(self):
+        """
+        Better scores rank higher, equal scores keep order of submission
+        """
+        self.assertEqual(1, self.store.submit('A', 500, 2, when=1))
+        self.assertEqual(2, self.store.submit('B', 100, 1, when=2))
+        self.assertEqual(1, self.store.submit('C', 900, 3, when=3))
+        self.assertEqual(4, self.store.submit('D', 100, 1, when=4))
+        self.assertEqual(5, self.store.rank(100))
+        self.assertEqual(1, self.store.rank(1000))
+
+        self.assertEqual(['C', 'A', 'B', 'D'],
+                         [entry.name for entry in self.store.top()])
+        self.assertEqual(highscores.Entry('C', 900, 3, 3),
+                         self.store.top(1)[0])
+
+    def test_scores_persist(self):
+        """
+        Reopened store has all scores, also after it grew
+        """
+        number = highscores.INITIAL_CAPACITY + 10
+        for score in range(number):
+            self.store.submit('P', score, 1)
+        self.reopen()
+        self.assertEqual(number, len(self.store))
+        self.assertEqual([number - 1, number - 2],
+                         [entry.score for entry in self.store.top(2)])
+
+    def test_long_name_is_cut(self):
+        """
+        Name longer than `NAME_SIZE` bytes is stored shortened
+        """
+        self.store.submit('X' * 40, 1, 1)
+        self.assertEqual('X' * highscores.NAME_SIZE,
+                         self.store.top()[0].name)
+
+    def test_journal_restores_lost_record(self):
+        """
+        Record missing in the data file after a crash is restored from the
+        journal
+        """
+        self.store.submit('A', 300, 1)
+        self.store.submit('B', 700, 2)
+        self.store.sync()
+        self.store.map[highscores.HEADER.size:] = bytes(
+                len(self.store.map) - highscores.HEADER.size)
+        highscores.HEADER.pack_into(self.store.map, 0, highscores.MAGIC,
+                                    highscores.VERSION,
+                                    highscores.RECORD.size, 0,
+                                    self.store.capacity)
+        self.store.journal.close()
+        self.store.journal = None
+        self.reopen()
+        self.assertEqual(['B', 'A'],
+                         [entry.name for entry in self.store.top()])
+
+    def test_torn_journal_entry_is_ignored(self):
+        """
+        Half-written entry at the end of the journal is dropped
+        """
+        self.store.submit('A', 300, 1)
+        self.store.sync()
+        self.store.journal.write(b'\x01' * (highscores.RECORD.size // 2))
+        self.store.journal.flush()
+        self.store.journal.close()
+        self.store.journal = None
+        self.reopen()
+        self.assertEqual(1, len(self.store))
+        self.assertEqual(0, os.path.getsize(self.store.journal_path))
+        self.assertEqual(2, self.store.submit('B', 100, 1))
+
+    def test_submit_does_not_wait_for_disk(self):
+        """
+        Rank and board are known while the journal sync is still running,
+        the score is stored when the writer is done
+        """
+        synced = threading.Event()
+        with mock.patch.object(highscores.os, 'fsync',
+                               lambda fd: synced.wait(5)):
+            self.assertEqual(1, self.store.submit('A', 300, 1))
+            self.assertEqual(1, self.store.submit('B', 400, 1))
+            self.assertEqual(['B', 'A'],
+                             [entry.name for entry in self.store.top()])
+            self.assertEqual(2, len(self.store.pending))
+            synced.set()
+            self.store.sync()
+        self.assertEqual({}, self.store.pending)
+        self.reopen()
+        self.assertEqual(['B', 'A'],
+                         [entry.name for entry in self.store.top()])
+
+    def test_unknown_file_is_rejected(self):
+        """
+        File of other format is not opened as store
+        """
+        other = os.path.join(self.directory.name, 'other')
+        with open(other, 'wb') as file:
+            file.write(b'x' * 100)
+        self.assertIsNone(highscores.open_store(other))
+        self.assertIsNone(highscores.store)
@@ -0,0 +1,36 @@
+"""
+Testing of inputs module.
+"""
+
+import unittest
+import pygame as pg
+
+from data import inputs
+
+
+class TestDispatcher(unittest.TestCase):
+    """
+    Tests of Dispatcher class.
+    """
+    def setUp(self):
+        self.dispatcher = inputs.Dispatcher()
+        self.calls = []
+        self.dispatcher.bind(pg.KEYDOWN, lambda e: self.calls.append('any'))
+        self.dispatcher.bind(pg.KEYDOWN, lambda e: self.calls.append('space'),
+                             pg.K_SPACE)
+
+    def test_specific_key_takes_precedence(self):
+        """
+        Handler bound to the key is used instead of handler for any key
+        """
+        for key in (pg.K_SPACE, pg.K_a):
+            self.dispatcher.dispatch(pg.event.Event(pg.KEYDOWN, key=key))
+        self.assertEqual(['space', 'any'], self.calls)
+
+    def test_unbound_event_is_ignored(self):
+        """
+        Events without handler are not dispatched
+        """
+        event = pg.event.Event(pg.KEYUP, key=pg.K_SPACE)
+        self.assertFalse(self.dispatcher.dispatch(event))
+        self.assertEqual([], self.calls)
@@ -0,0 +1,65 @@
+"""
+Testing of polygons module.
+"""
+
+import random
+import unittest
+import numpy as np
+
+from data.components import polygons
+
+
+def square(x, y, size):
+    return np.array(((x, y), (x + size, y), (x + size, y + size),
+                     (x, y + size)), dtype=float)
+
+
+class TestPolygons(unittest.TestCase):
+    """
+    Tests of polygon helpers.
+    """
+    def setUp(self):
+        random.seed(5)
+
+    def test_generated_outline(self):
+        """
+        Outline fits its radius and its hull contains all vertices (moved
+        a little to the origin, so they are not on the edges)
+        """
+        outline = polygons.generate(50)
+        self.assertEqual((polygons.VERTICES, 2), outline.shape)
+        self.assertLessEqual(polygons.bounding_radius(outline), 50)
+        hull = polygons.hull(outline)
+        self.assertLessEqual(len(hull), len(outline))
+        for vertex in outline:
+            self.assertTrue(polygons.overlap(hull, 0.999 * vertex[None]))
+
+    def test_overlap(self):
+        """
+        Overlapping squares touch, diagonal gap separates triangles whose
+        bounding boxes overlap
+        """
+        self.assertTrue(polygons.overlap(square(0, 0, 10), square(5, 5, 10)))
+        self.assertFalse(polygons.overlap(square(0, 0, 10),
+                                          square(11, 0, 10)))
+        first = np.array(((0, 0), (10, 0), (0, 10)), dtype=float)
+        second = np.array(((10, 10), (10, 2), (2, 10)), dtype=float)
+        self.assertFalse(polygons.overlap(first, second))
+        self.assertTrue(polygons.overlap(first, second - 2))
+
+    def test_split_covers_outline(self):
+        """
+        Every vertex of the outline is in a wedge, wedges are centered
+        """
+        outline = polygons.generate(50)
+        wedges = polygons.split(outline, 3)
+        self.assertEqual(3, len(wedges))
+        vertices = set()
+        for wedge, (x, y) in wedges:
+            self.assertGreaterEqual(len(wedge), 3)
+            np.testing.assert_allclose((0, 0), wedge.mean(axis=0),
+                                       atol=1e-9)
+            vertices.update(map(tuple, np.round(wedge + (x, y), 6).tolist()))
+        self.assertTrue(set(map(tuple, np.round(outline, 6).tolist())) <=
+                        vertices)
+        self.assertEqual(3, len(polygons.split(outline[:3], 10)))
@@ -0,0 +1,122 @@
+"""
+Testing of quality module.
+"""
+
+import random
+import unittest
+
+from data import prepare, quality
+from data.components import ship
+
+BUDGET = 16.0
+SLOW = BUDGET * 1.5
+FAST = BUDGET * 0.1
+DT = 1 / 60
+
+
+class TestGovernor(unittest.TestCase):
+    """
+    Tests of Governor class.
+    """
+    def setUp(self):
+        self.governor = quality.Governor(BUDGET)
+
+    def tearDown(self):
+        quality.current = quality.LEVELS[0]
+
+    def record(self, frame_time, frames):
+        return [self.governor.record(frame_time) for i in range(frames)]
+
+    def test_slow_frames_lower_quality(self):
+        """
+        Quality is lowered one level after DEGRADE_FRAMES slow frames
+        """
+        changes = self.record(SLOW, quality.DEGRADE_FRAMES)
+        self.assertEqual(changes.count(True), 1)
+        self.assertTrue(changes[-1])
+        self.assertEqual(self.governor.level, 1)
+        self.assertIs(quality.current, quality.LEVELS[1])
+
+        self.record(SLOW, quality.DEGRADE_FRAMES * len(quality.LEVELS))
+        self.assertEqual(self.governor.level, len(quality.LEVELS) - 1)
+
+    def test_recovery_is_slower_than_degradation(self):
+        """
+        Quality returns only after RECOVER_FRAMES fast frames
+        """
+        self.governor.set_level(2)
+        changes = self.record(FAST, quality.RECOVER_FRAMES)
+        self.assertEqual(changes.count(True), 1)
+        self.assertEqual(self.governor.level, 1)
+        self.record(FAST, quality.RECOVER_FRAMES * 2)
+        self.assertEqual(self.governor.level, 0)
+        self.assertIs(quality.current, quality.LEVELS[0])
+
+    def test_frames_between_thresholds_keep_level(self):
+        """
+        Frames within the band between thresholds change nothing
+        """
+        self.governor.set_level(1)
+        middle = BUDGET * (quality.DEGRADE_RATIO +
+                           quality.RECOVER_RATIO) / 2
+        changes = self.record(middle, quality.RECOVER_FRAMES * 2)
+        self.assertNotIn(True, changes)
+        self.assertEqual(self.governor.level, 1)
+
+    def test_single_spike_is_ignored(self):
+        """
+        One long frame doesn't lower quality
+        """
+        self.record(FAST, 10)
+        self.record(BUDGET * 5, 1)
+        changes = self.record(FAST, quality.DEGRADE_FRAMES)
+        self.assertNotIn(True, changes)
+        self.assertEqual(self.governor.level, 0)
+
+
+class TestSmokeQuality(unittest.TestCase):
+    """
+    Tests of smoke on different quality levels.
+    """
+    def setUp(self):
+        self.jet = ship.ShipPoint(100, 100, 90, 0, 0)
+
+    def tearDown(self):
+        quality.current = quality.LEVELS[0]
+
+    def emitted(self, level):
+        quality.current = quality.LEVELS[level]
+        generator = ship.SmokeGenerator()
+        for i in range(60):
+            generator.emit(DT, self.jet)
+        return generator
+
+    def test_lower_quality_emits_less_smoke(self):
+        """
+        Number of particles follows quality level
+        """
+        counts = [len(self.emitted(level))
+                  for level in range(len(quality.LEVELS))]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertLess(counts[-1], counts[0])
+
+    def test_smoke_does_not_change_game_random_numbers(self):
+        """
+        Emitting smoke doesn't consume numbers of the game random generator
+        """
+        for level in range(len(quality.LEVELS)):
+            random.seed(7)
+            self.emitted(level)
+            self.assertEqual(random.random(), random.Random(7).random())
+
+    def test_shorter_lifetime_reaches_end_color(self):
+        """
+        Particle with shorter lifetime still changes to the end color
+        """
+        quality.current = quality.LEVELS[-1]
+        particle = ship.SmokeParticle(self.jet)
+        ticks = int(particle.lifetime / DT)
+        for i in range(ticks):
+            particle.make_changes(DT)
+        for color, end in zip(particle.color, prepare.SMOKE['end_color']):
+            self.assertAlmostEqual(color, end, delta=20)
@@ -0,0 +1,51 @@
+"""
+Testing of scheduler module.
+"""
+
+import unittest
+
+from data import scheduler
+
+
+class TestScheduler(unittest.TestCase):
+    """
+    Tests of Scheduler class.
+    """
+    def setUp(self):
+        self.scheduler = scheduler.Scheduler()
+        self.calls = []
+
+    def callback(self, count):
+        self.calls.append((self.scheduler.tick, count))
+
+    def test_tick_domain(self):
+        """
+        Callback is called after given number of ticks, given times
+        """
+        self.scheduler.call_in_ticks(3, self.callback, repeat=2)
+        made = [self.scheduler.advance(0) for i in range(10)]
+        self.assertEqual([(3, 1), (6, 2)], self.calls)
+        self.assertEqual([0, 0, 1, 0, 0, 1, 0, 0, 0, 0], made)
+
+    def test_time_domain(self):
+        """
+        Late callback is called once and next delay starts from that moment
+        """
+        call = self.scheduler.call_later(100, self.callback,
+                                         repeat=scheduler.FOREVER)
+        for now in (50, 100, 150, 450, 500, 550):
+            self.scheduler.advance(now)
+        self.assertEqual([(2, 1), (4, 2), (6, 3)], self.calls)
+        self.assertEqual(650, self.scheduler.next_deadline())
+        self.assertFalse(call.done)
+
+    def test_cancel(self):
+        """
+        Cancelled callback is never called
+        """
+        call = self.scheduler.call_later(10, self.callback)
+        call.cancel()
+        self.scheduler.advance(20)
+        self.assertEqual([], self.calls)
+        self.assertTrue(call.done)
+        self.assertIsNone(self.scheduler.next_deadline())
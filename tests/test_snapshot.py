@@ -0,0 +1,116 @@
+"""
+Testing of snapshot module.
+"""
+
+import random
+import unittest
+from pygame import Surface
+
+from data import scheduler
+from data.components import asteroids, ecs, ship, snapshot, ufo
+
+FAKE_GTX = {
+        'asteroid': Surface((8, 8)),  # fake asteroid image
+        'ship': Surface((4, 4)),  # fake ship image
+}
+
+
+class FakeScore:
+    score = 0
+
+    def update_text(self):
+        pass
+
+
+class FakeHealthBar:
+    healths = 3
+
+    def set_healths(self, healths):
+        self.healths = healths
+
+
+class FakeGame:
+    """
+    Object with the same attributes as `Game` that snapshot uses.
+    """
+    def __init__(self):
+        self.end = False
+        self.scheduler = scheduler.Scheduler()
+        self.score = FakeScore()
+        self.health = FakeHealthBar()
+        self.world = ecs.World()
+        self.asteroids = asteroids.AsteroidsGroup(self.world)
+        self.ship = ship.Ship(self.scheduler, self.world)
+        self.playerGroup = ship.PlayerGroup(self.world)
+        self.playerGroup.add(self.ship)
+        self.ufos = ufo.UfoGroup(self.scheduler, self.asteroids, self.world)
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Tests of capture and restore functions.
+    """
+    @classmethod
+    def setUpClass(self):
+        asteroids.prepare.GTX = FAKE_GTX
+
+    def setUp(self):
+        self.game = FakeGame()
+        self.game.asteroids.next_level()
+        self.game.asteroids.create_asteroids(4, 2)
+        self.game.ship.space_pressed()
+        self.game.ufos.spawn(small=True)
+
+    def test_restore_previous_state(self):
+        """
+        Restoring snapshot brings back positions, score and random state
+        """
+        before = snapshot.capture(self.game)
+        expected = random.random()
+        positions = sorted(a.get_position() for a in self.game.asteroids)
+        saucer = self.game.ufos.sprites()[0].get_position()
+
+        for i in range(10):
+            self.game.asteroids.update(1 / 60)
+        self.game.asteroids.sprites()[0].kill()
+        self.game.score.score = 500
+        self.game.ship.ship_lasers.empty()
+        self.game.ufos.sprites()[0].kill()
+
+        snapshot.restore(self.game, before)
+        self.assertEqual(positions,
+                         sorted(a.get_position() for a in self.game.asteroids))
+        self.assertEqual(0, self.game.score.score)
+        self.assertEqual(1, len(self.game.ship.ship_lasers))
+        self.assertEqual([saucer], [sprite.get_position()
+                                    for sprite in self.game.ufos])
+        self.assertEqual(before, snapshot.capture(self.game))
+        self.assertEqual(expected, random.random())
+
+
+class TestRewindBuffer(unittest.TestCase):
+    """
+    Tests of RewindBuffer class.
+    """
+    def test_snapshots_are_returned_in_reverse_order(self):
+        """
+        Buffer returns the newest snapshots first, including length changes
+        """
+        buffer = snapshot.RewindBuffer()
+        pushed = [bytes([i % 7]) * (10 + i // 3) for i in range(20)]
+        for data in pushed:
+            buffer.push(data)
+        self.assertEqual(len(pushed), len(buffer))
+        self.assertEqual(list(reversed(pushed)),
+                         [buffer.pop() for i in range(len(pushed))])
+        self.assertIsNone(buffer.pop())
+
+    def test_oldest_snapshots_are_dropped(self):
+        """
+        Buffer never holds more than `capacity` snapshots
+        """
+        buffer = snapshot.RewindBuffer(seconds=0.1)
+        for i in range(buffer.capacity * 2):
+            buffer.push(bytes([i]))
+        self.assertEqual(buffer.capacity, len(buffer))
+        self.assertEqual(bytes([buffer.capacity * 2 - 1]), buffer.pop())
@@ -0,0 +1,69 @@
+"""
+Testing of soak module.
+"""
+
+import io
+import types
+import unittest
+
+from data import soak
+
+
+class FakeGroup(list):
+    """
+    Group of sprites with round level.
+    """
+    round_level = 1
+    shots = ()
+
+
+def fake_game():
+    player = types.SimpleNamespace(ship_lasers=[], smoke_generator=[])
+    return types.SimpleNamespace(
+            world=[], scheduler=[], ship=player, debris=None,
+            asteroids=FakeGroup(), ufos=FakeGroup(), end=False, done=False,
+            next=None)
+
+
+class TestSoak(unittest.TestCase):
+    """
+    Tests of Soak class.
+    """
+    def setUp(self):
+        self.game = fake_game()
+        self.output = io.StringIO()
+        self.soak = soak.Soak(self.game, 3, interval=1000,
+                              output=self.output)
+
+    def test_rounds_and_restart(self):
+        """
+        Ended game is restarted, the run ends when more than `rounds`
+        rounds were started, then it reports
+        """
+        self.assertFalse(self.soak.frame(16.0))
+        self.game.asteroids.round_level = 2
+        self.game.end = True
+        self.assertFalse(self.soak.frame(16.0))
+        self.assertEqual(('GAME', True), (self.game.next, self.game.done))
+
+        self.game.world, self.game.end = [], False
+        self.game.asteroids.round_level = 1
+        self.assertFalse(self.soak.frame(16.0))
+        self.assertEqual(0, self.soak.reports)
+        self.game.asteroids.round_level = 2
+        self.assertTrue(self.soak.frame(16.0))
+        self.assertEqual((2, 4, 1),
+                         (self.soak.games, self.soak.rounds_played,
+                          self.soak.reports))
+        self.assertIn('games 2 rounds 4 frames 4', self.output.getvalue())
+
+    def test_report_resets_frames(self):
+        """
+        Every report covers frames since the previous one
+        """
+        for i in range(10):
+            self.soak.frame(20.0)
+        report = self.soak.report()
+        self.assertEqual(10, report['frames'])
+        self.assertEqual(20.0, report['longest_frame_ms'])
+        self.assertEqual(0, self.soak.report()['frames'])
@@ -0,0 +1,87 @@
+"""
+Testing of state_machine module.
+"""
+
+import unittest
+import pygame as pg
+
+from data import inputs, scheduler, state_machine
+
+
+class Menu(state_machine._State):
+    """
+    Idle state that counts its draws and toggles on timer.
+    """
+    idle = True
+
+    def __init__(self):
+        super().__init__()
+        self.draws = 0
+
+    def startup(self, now, persistant):
+        super().startup(now, persistant)
+        self.scheduler.call_later(100, lambda count: None,
+                                  repeat=scheduler.FOREVER)
+
+    def draw(self, surface):
+        self.draws += 1
+
+    def update(self, now):
+        pass
+
+
+class Controling(state_machine._ControlingState):
+    """
+    Controling state with `Menu` as low-level state.
+    """
+    def startup(self, now, persistant):
+        super().startup(now, persistant)
+        self.state_machine.setup_states({'MENU': Menu()}, 'MENU', now)
+
+
+class TestIdleState(unittest.TestCase):
+    """
+    Tests of drawing of idle states.
+    """
+    def setUp(self):
+        self.machine = state_machine.StateMachine()
+        self.machine.setup_states({'CONTROLING': Controling()}, 'CONTROLING')
+        self.menu = self.machine.state.state_machine.state
+
+    def test_idle_state_is_drawn_after_change(self):
+        """
+        Idle state is drawn after startup, events and scheduled calls only
+        """
+        self.assertFalse(self.machine.idle)
+        self.assertTrue(self.machine.draw(None))
+        self.assertTrue(self.machine.idle)
+        for now in (10, 20, 30):
+            self.machine.update(now)
+            self.assertFalse(self.machine.draw(None))
+        self.assertEqual(1, self.menu.draws)
+
+        self.machine.get_event(pg.event.Event(pg.KEYDOWN, key=pg.K_a))
+        self.assertTrue(self.machine.draw(None))
+        self.machine.update(100)
+        self.assertTrue(self.machine.draw(None))
+        self.assertEqual(3, self.menu.draws)
+
+    def test_exposed_window_is_drawn(self):
+        """
+        Idle state is drawn again when the window is uncovered or restored
+        """
+        self.machine.draw(None)
+        for event_type in inputs.EXPOSE_EVENTS:
+            self.assertIn(event_type, inputs.ALLOWED_EVENTS)
+            self.machine.get_event(pg.event.Event(event_type))
+            self.assertFalse(self.machine.idle)
+            self.assertTrue(self.machine.draw(None))
+        self.assertEqual(3, self.menu.draws)
+
+    def test_deadline_of_low_level_machine(self):
+        """
+        Deadline of low-level scheduler is reported by the top machine
+        """
+        self.assertEqual(100, self.machine.next_deadline())
+        self.machine.update(150)
+        self.assertEqual(250, self.machine.next_deadline())
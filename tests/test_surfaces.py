@@ -0,0 +1,140 @@
+"""
+Testing of surfaces module.
+"""
+
+import os
+import unittest
+import pygame as pg
+
+from data import surfaces
+
+COLORKEY = (255, 0, 255)
+
+
+class TestSurfaces(unittest.TestCase):
+    """
+    Tests of surface factory and blit audit.
+    """
+    @classmethod
+    def setUpClass(self):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pg.display.init()
+        self.screen = pg.display.set_mode((16, 16))
+
+    @classmethod
+    def tearDownClass(self):
+        surfaces.audit = None
+        pg.display.quit()
+
+    def tearDown(self):
+        surfaces.accountant = None
+        surfaces.set_scale(1)
+
+    def test_created_surfaces_match_display(self):
+        """
+        Factory surfaces have display format, colorkey is RLE accelerated
+        """
+        plain = surfaces.new((4, 4))
+        keyed = surfaces.new((4, 4), colorkey=COLORKEY)
+        self.assertEqual(self.screen.get_bitsize(), plain.get_bitsize())
+        self.assertNotIn('slow', surfaces.describe(plain))
+        self.assertEqual(COLORKEY + (255,), keyed.get_colorkey())
+        self.assertIn('rle', surfaces.describe(keyed))
+        self.assertTrue(surfaces.new((4, 4), alpha=True).get_flags() &
+                        pg.SRCALPHA)
+
+    def test_audit_counts_blits_by_format(self):
+        """
+        Audit counts blits of the frame and marks foreign formats as slow
+        """
+        audit = surfaces.enable_audit()
+        foreign = pg.Surface((4, 4), 0, 8)
+        native = surfaces.new((4, 4))
+        surfaces.blit(self.screen, foreign, (0, 0))
+        surfaces.blits(self.screen, [(native, (0, 0)), (native, (4, 4))])
+        audit.end_frame()
+        self.assertEqual({surfaces.describe(foreign): 1,
+                          surfaces.describe(native): 2}, audit.last)
+        self.assertIn('slow', surfaces.describe(foreign))
+        self.assertEqual(1, audit.frames)
+        self.assertFalse(audit.frame)
+
+    def test_scaled_blits(self):
+        """
+        Logical positions and areas are scaled, scaled copies are cached
+        """
+        surfaces.set_scale(0.5)
+        target = pg.Surface((16, 16))
+        page = surfaces.new((8, 8))
+        page.fill((255, 0, 0))
+        page.fill((0, 255, 0), (4, 0, 4, 8))
+        surfaces.blit(target, page, (4, 4), pg.Rect(4, 0, 4, 8))
+        self.assertEqual((0, 255, 0), target.get_at((2, 2))[:3])
+        self.assertEqual((0, 255, 0), target.get_at((3, 5))[:3])
+        self.assertEqual((0, 0, 0), target.get_at((4, 2))[:3])
+
+        surfaces.blits(target, [(page, (16, 16))])
+        self.assertEqual((255, 0, 0), target.get_at((8, 8))[:3])
+        self.assertIs(surfaces.scaled(page), surfaces.scaled(page))
+        self.assertEqual((4, 4), surfaces.scaled(page).get_size())
+
+    def test_invalidated_copy_is_scaled_again(self):
+        """
+        Source changed in place and invalidated is blitted with new pixels
+        """
+        surfaces.set_scale(0.5)
+        source = surfaces.new((8, 8))
+        for color in ((255, 0, 0), (0, 255, 0)):
+            source.fill(color)
+            surfaces.invalidate(source)
+            surfaces.blit(self.screen, source, (0, 0))
+            self.assertEqual(color, tuple(self.screen.get_at((1, 1)))[:3])
+
+    def test_accounting_by_owner(self):
+        """
+        Tracked surfaces are counted by owner and purpose until they are
+        collected, every surface once
+        """
+        accountant = surfaces.enable_accounting()
+        image = surfaces.new((10, 10), owner='Test')
+        text = surfaces.track(pg.Surface((5, 5)), 'Test', 'text')
+        surfaces.track(text, 'Other', 'text')
+        size = image.get_pitch() * 10
+        self.assertEqual(size, accountant.bytes['Test', 'image'])
+        self.assertEqual(1, accountant.counts['Test', 'text'])
+        self.assertEqual(size + text.get_pitch() * 5, accountant.total)
+        del image
+        self.assertEqual(0, accountant.bytes['Test', 'image'])
+        self.assertEqual(accountant.total, accountant.bytes['Test', 'text'])
+        self.assertGreater(accountant.peak, accountant.total)
+        self.assertIn('Test text', accountant.report())
+        self.assertEqual(accountant.total, surfaces.usage()['surface_bytes'])
+
+    def test_budget_evicts_scaled_copies(self):
+        """
+        Exceeded budget drops the least recently used scaled copies
+        """
+        surfaces.set_scale(0.5)
+        sources = [surfaces.new((16, 16)) for i in range(3)]
+        copy = surfaces.scaled(sources[0]).get_pitch() * 8
+        surfaces.set_scale(0.5)
+        accountant = surfaces.enable_accounting(budget=2 * copy)
+        for source in sources[:2]:
+            surfaces.scaled(source)
+        surfaces.scaled(sources[0])
+        surfaces.scaled(sources[2])
+        self.assertEqual(2 * copy, accountant.total)
+        self.assertEqual(1, accountant.evictions)
+        self.assertNotIn(sources[1], surfaces._scaled)
+        self.assertIn(sources[0], surfaces._scaled)
+        self.assertIn(sources[2], surfaces._scaled)
+
+    def test_eviction_freeing_nothing_is_not_counted(self):
+        """
+        Budget exceeded by surfaces in use calls evictors, but without
+        freed bytes no eviction is counted
+        """
+        accountant = surfaces.enable_accounting(budget=1)
+        image = surfaces.new((4, 4), owner='Test')
+        self.assertEqual(image.get_pitch() * 4, accountant.total)
+        self.assertEqual(0, accountant.evictions)
@@ -0,0 +1,106 @@
+"""
+Testing of telemetry module.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from data import telemetry
+
+
+class TestWriter(unittest.TestCase):
+    """
+    Tests of Writer class.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'telemetry.jsonl')
+
+    def tearDown(self):
+        telemetry.disable()
+        self.directory.cleanup()
+
+    def read(self, path=None):
+        with open(path or self.path) as lines:
+            return [json.loads(line) for line in lines]
+
+    def test_full_queue_drops_events(self):
+        """
+        Events over the queue size are counted, not queued
+        """
+        writer = telemetry.Writer(self.path, queue_size=3)
+        queued = [writer.put({'event': i}) for i in range(5)]
+        self.assertEqual([True] * 3 + [False] * 2, queued)
+        self.assertEqual(2, writer.dropped)
+        writer.stop()
+        events = self.read()
+        self.assertEqual([0, 1, 2, 'dropped'],
+                         [event['event'] for event in events])
+        self.assertEqual(2, events[-1]['count'])
+
+    def test_rotation(self):
+        """
+        File larger than `max_bytes` is moved to backups, the oldest backup
+        is removed
+        """
+        writer = telemetry.Writer(self.path, max_bytes=100, backups=2)
+        for batch in range(4):
+            writer.put({'event': 'batch', 'number': batch,
+                        'padding': 'x' * 100})
+            writer.write_batch()
+        writer.stop()
+        self.assertEqual(3, self.read(self.path + '.1')[0]['number'])
+        self.assertEqual(2, self.read(self.path + '.2')[0]['number'])
+        self.assertFalse(os.path.exists(self.path + '.3'))
+        self.assertEqual([], self.read())
+
+    def test_thread_writes_session(self):
+        """
+        Events and summary of the session are written by the thread
+        """
+        telemetry.enable(self.path)
+        telemetry.start_session()
+        telemetry.session.destroyed[1] += 2
+        telemetry.event('death', round=1)
+        telemetry.end_session(finished=True)
+        telemetry.start_session()
+        telemetry.disable()
+        self.assertIsNone(telemetry.writer)
+        self.assertIsNone(telemetry.session)
+
+        death, first, second = self.read()
+        self.assertEqual(('death', 1), (death['event'], death['round']))
+        self.assertEqual({'1': 2}, first['destroyed'])
+        self.assertTrue(first['finished'])
+        self.assertFalse(second['finished'])
+
+    def test_disabled(self):
+        """
+        Without writer nothing is collected
+        """
+        telemetry.start_session()
+        telemetry.event('death')
+        self.assertIsNone(telemetry.session)
+
+
+class TestSession(unittest.TestCase):
+    """
+    Tests of Session class.
+    """
+    def test_percentiles(self):
+        """
+        Percentiles are upper bounds of buckets, limited by the longest frame
+        """
+        session = telemetry.Session()
+        self.assertEqual(0.0, session.percentile(50))
+        for i in range(98):
+            session.frame(16.1)
+        session.frame(40.0)
+        session.frame(1000.0)
+        bucket = telemetry.FRAME_BUCKET
+        self.assertAlmostEqual(16.0 + bucket, session.percentile(50))
+        self.assertAlmostEqual(40.0 + bucket, session.percentile(99))
+        self.assertEqual(1000.0, session.percentile(100))
+        self.assertEqual(100, session.summary()['frames'])
@@ -0,0 +1,55 @@
+"""
+Testing of tracing module.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from data import tracing
+
+
+class Traced:
+    """
+    Class with traced method.
+    """
+    @tracing.traced
+    def work(self, value):
+        with tracing.span('inner'):
+            return value * 2
+
+
+class TestTracer(unittest.TestCase):
+    """
+    Tests of spans and their export.
+    """
+    def tearDown(self):
+        tracing.disable()
+
+    def test_disabled_tracing_records_nothing(self):
+        """
+        Decorated method works the same without tracer
+        """
+        self.assertEqual(4, Traced().work(2))
+        self.assertIsNone(tracing.tracer)
+
+    def test_nested_spans_are_exported(self):
+        """
+        Inner span lies inside the outer one in exported trace events
+        """
+        tracer = tracing.enable()
+        self.assertEqual(6, Traced().work(3))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            tracer.export(path)
+            with open(path) as trace:
+                events = json.load(trace)['traceEvents']
+
+        inner, outer = events
+        self.assertEqual(('inner', 'Traced.work'),
+                         (inner['name'], outer['name']))
+        self.assertEqual('X', outer['ph'])
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertLessEqual(inner['ts'] + inner['dur'],
+                             outer['ts'] + outer['dur'])
@@ -0,0 +1,153 @@
+"""
+Testing of ufo module.
+"""
+
+import math
+import random
+import unittest
+from pygame import Surface
+
+from data import scheduler, tools
+from data.components import asteroids, components, ecs, ship, ufo
+
+FAKE_GTX = {
+        'asteroid': Surface((64, 64)),  # fake asteroid image
+        'ship': Surface((4, 4)),  # fake ship image
+}
+DT = tools.TIME_STEP
+
+
+def target(position, dx=0, dy=0):
+    sprite = components._MovingSprite(Surface((4, 4)), position)
+    sprite.dx, sprite.dy = dx, dy
+    return sprite
+
+
+class TestIntercept(unittest.TestCase):
+    """
+    Tests of intercept function.
+    """
+    def test_standing_target(self):
+        """
+        Shot is aimed straight at standing target, 90 degrees is up
+        """
+        shooter = target((100, 100))
+        self.assertAlmostEqual(0, ufo.intercept(shooter, target((200, 100)),
+                                                500))
+        self.assertAlmostEqual(90, ufo.intercept(shooter, target((100, 0)),
+                                                 500))
+
+    def test_shot_meets_moving_target(self):
+        """
+        Shot fired in returned direction reaches the moving target
+        """
+        speed = 500
+        shooter = target((100, 400))
+        moving = target((600, 100), dx=-150, dy=80)
+        radians = math.radians(ufo.intercept(shooter, moving, speed))
+        closest = math.inf
+        for tick in range(1, 3000):
+            time = tick / 1000
+            shot = (shooter.x + speed * math.cos(radians) * time,
+                    shooter.y - speed * math.sin(radians) * time)
+            aim = (moving.x + moving.dx * time, moving.y - moving.dy * time)
+            closest = min(closest, math.dist(shot, aim))
+        self.assertLess(closest, 1)
+
+
+class TestUfoGroup(unittest.TestCase):
+    """
+    Tests of UfoGroup class.
+    """
+    @classmethod
+    def setUpClass(self):
+        asteroids.prepare.GTX = FAKE_GTX
+
+    def setUp(self):
+        random.seed(3)
+        self.scheduler = scheduler.Scheduler()
+        self.world = ecs.World()
+        self.asteroids = asteroids.AsteroidsGroup(self.world)
+        self.ufos = ufo.UfoGroup(self.scheduler, self.asteroids, self.world)
+        self.ship = ship.Ship(self.scheduler, self.world)
+        ship.PlayerGroup(self.world).add(self.ship)
+
+    def advance(self, ticks):
+        for i in range(ticks):
+            self.scheduler.advance(0)
+
+    def test_ufo_emerges_when_ship_is_idle(self):
+        """
+        UFO appears `SPAWN_TIME` after the last acceleration of the ship
+        """
+        wait = round(ufo.SPAWN_TIME * tools.TICK_RATE)
+        self.ufos.watch(self.ship)
+        self.advance(wait // 2)
+        self.ship.last_thrust = self.scheduler.tick
+        self.advance(wait - 1)
+        self.assertEqual(0, len(self.ufos))
+        self.advance(1)
+        self.assertEqual(1, len(self.ufos))
+
+    def test_decisions_keep_budget(self):
+        """
+        Decisions are spread over ticks, examined asteroids fit the budget
+        """
+        for i in range(300):
+            self.asteroids.add(asteroids.Asteroid(
+                    2, (random.uniform(0, 1600), random.uniform(0, 836)),
+                    self.asteroids.fragment_asteroid))
+        self.ufos.watch(self.ship)
+        for i in range(8):
+            self.ufos.spawn()
+        decisions = {saucer: [] for saucer in self.ufos}
+
+        for i in range(ufo.THINK_TICKS * 20):
+            self.scheduler.advance(0)
+            self.asteroids.bounce()
+            thought = {saucer: saucer.thought for saucer in self.ufos}
+            spent = self.ufos.think()
+            made = [saucer for saucer in self.ufos
+                    if saucer.thought != thought[saucer]]
+            self.assertTrue(spent <= ufo.AI_BUDGET or len(made) == 1)
+            for saucer in made:
+                decisions[saucer].append(self.scheduler.tick)
+
+        for ticks in decisions.values():
+            self.assertTrue(ticks)
+            gaps = [second - first for first, second in zip(ticks, ticks[1:])]
+            self.assertGreaterEqual(min(gaps, default=ufo.THINK_TICKS),
+                                    ufo.THINK_TICKS)
+
+    def test_ufo_steers_away_from_asteroid(self):
+        """
+        UFO on collision course turns away and keeps its speed
+        """
+        rock = asteroids.Asteroid(2, (400, 300),
+                                  self.asteroids.fragment_asteroid)
+        rock.dx = rock.dy = 0
+        self.asteroids.add(rock)
+        saucer = ufo.Ufo(False, (300, 305), 0, self.scheduler,
+                         self.ufos.shots)
+        self.ufos.add(saucer)
+        self.asteroids.bounce()
+        self.ufos.think()
+        self.assertLess(saucer.dy, 0)
+        self.assertAlmostEqual(ufo.prepare.BIG_UFO['speed'],
+                               math.hypot(saucer.dx, saucer.dy))
+
+    def test_ufo_fires_at_ship(self):
+        """
+        UFO with target shoots lasers on its timer
+        """
+        self.ufos.watch(self.ship)
+        saucer = self.ufos.spawn(small=True)
+        self.ufos.think()
+        self.assertIsNotNone(saucer.aim)
+        self.advance(round(tools.TICK_RATE /
+                           ufo.prepare.SMALL_UFO['shots_per_second']))
+        self.assertEqual(1, len(self.ufos.shots))
+
+        saucer.kill()
+        self.assertTrue(saucer.fire_timer.cancelled)
+        self.assertEqual(0, len(self.ufos.queue))